@@ -1,11 +1,39 @@
-import random
 from datetime import UTC, datetime
-from decimal import Decimal
+
+import numpy as np
 
 from core.logging import get_logger
 
+from .goal_cache import GoalEvaluationCache, round_significant
+from .monte_carlo import (
+    DEFAULT_SIMULATIONS,
+    SAMPLERS,
+    SIMULATION_MODELS,
+    WILSON_Z,
+    analytic_success_probabilities,
+    child_seed,
+    future_values,
+    importance_success_probabilities,
+    simulate_monthly_success_probabilities,
+    simulate_regime_success_probabilities,
+    simulate_success_probabilities,
+    simulation_rng,
+    simulation_seed,
+    wilson_interval,
+)
+from .qmc import sobol_normals
+
 logger = get_logger(__name__)
 
+# Success probability boundaries between the unrealistic / at_risk / on_track statuses
+AT_RISK_PROBABILITY = 0.40
+ON_TRACK_PROBABILITY = 0.75
+STATUS_THRESHOLDS = np.array([AT_RISK_PROBABILITY, ON_TRACK_PROBABILITY])
+
+# Goals whose interval lies within this distance of 0 or 1 are re-estimated by
+# importance sampling, so the rare outcome gets a useful relative precision
+TAIL_PROBABILITY = 0.05
+
 
 def evaluate_goals(
     goals: list[dict],
@@ -13,6 +41,16 @@ def evaluate_goals(
     base_currency: str,
     current_savings: float = 0.0,
     expected_return: float = 0.07,
+    num_simulations: int = DEFAULT_SIMULATIONS,
+    rng: np.random.Generator | None = None,
+    model: str = "monthly",
+    monthly_income: float | None = None,
+    seed: str | None = None,
+    batch_size: int | None = None,
+    sampler: str = "pseudo",
+    cache: GoalEvaluationCache | None = None,
+    user_id: str | None = None,
+    tail_paths: int = 0,
 ) -> list[dict]:
     """
     Evaluate goal feasibility using Monte Carlo simulation and Future Value calculation.
@@ -23,90 +61,318 @@ def evaluate_goals(
         base_currency: User's base currency
         current_savings: Current amount saved towards goals
         expected_return: Expected annual return rate (default 7%)
+        num_simulations: Monte Carlo paths per goal (the maximum, with batch_size)
+        rng: Random generator for the simulation (a fresh unseeded one by default)
+        model: Simulation model, one of monte_carlo.SIMULATION_MODELS ("analytic" is exact
+            and reports zero simulations and a zero-width interval)
+        monthly_income: Monthly income, used by the "regime" model to apply income
+            and expense shocks (defaults to monthly_savings, i.e. no expenses)
+        seed: Seed for a deterministic simulation (takes precedence over rng), so
+            identical inputs give identical probabilities
+        batch_size: Simulate in batches of this many paths, stopping for a goal once
+            its confidence interval no longer crosses a status threshold (default:
+            all num_simulations paths at once)
+        sampler: Normal draw sampler, one of monte_carlo.SAMPLERS ("sobol" needs
+            the "annual" model)
+        cache: Reuse and store per-goal simulation results in this cache
+        user_id: Owner of the goals, so the cache can invalidate them per user
+        tail_paths: Importance-sampling paths for goals whose probability is within
+            TAIL_PROBABILITY of 0 or 1 ("annual" and "monthly" models; 0 disables)
+
+    Returns:
+        List of dicts with goal_id, status, projected_value, success_probability,
+        success_interval (95% interval), tail_probability (probability of the less
+        likely outcome, to 3 significant digits), simulations and goal_pressure
+    """
+    user = {"goals": goals, "monthly_savings": monthly_savings, "current_savings": current_savings}
+    if monthly_income is not None:
+        user["monthly_income"] = monthly_income
+    if seed is not None:
+        user["seed"] = seed
+    if user_id is not None:
+        user["user_id"] = user_id
+    return evaluate_goals_batch(
+        [user], expected_return, num_simulations, rng, model, batch_size, sampler, cache, tail_paths
+    )[0]
+
+
+def evaluate_goals_batch(
+    users: list[dict],
+    expected_return: float = 0.07,
+    num_simulations: int = DEFAULT_SIMULATIONS,
+    rng: np.random.Generator | None = None,
+    model: str = "monthly",
+    batch_size: int | None = None,
+    sampler: str = "pseudo",
+    cache: GoalEvaluationCache | None = None,
+    tail_paths: int = 0,
+) -> list[list[dict]]:
+    """
+    Evaluate the goals of many users in one vectorized simulation.
+
+    Args:
+        users: List of dicts with 'goals', 'monthly_savings', 'current_savings' and
+            optionally 'monthly_income', 'seed' and 'user_id' (same meaning as the
+            evaluate_goals arguments). Users without a seed draw from rng.
 
     Returns:
-        List of dicts with goal_id, status, projected_value, success_probability, goal_pressure
+        One evaluate_goals result list per user, in input order
     """
+    if model not in SIMULATION_MODELS:
+        raise ValueError(f"Unknown goal simulation model: {model}")
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown goal simulation sampler: {sampler}")
+    if sampler == "sobol" and model not in ("annual", "analytic"):
+        raise ValueError(f"Sobol sampling is only available for the annual model, not {model}")
 
-    results = []
+    now = datetime.now(UTC)
+    rows = []  # (user index, goal, months remaining)
 
-    for goal in goals:
-        goal_id = goal.get("id")
-        target_amount = Decimal(str(goal.get("target_amount", 0)))
-        target_date = goal.get("target_date")
+    for index, user in enumerate(users):
+        for goal in user["goals"]:
+            target_date = goal.get("target_date")
 
-        if not target_date:
-            continue
+            if not target_date:
+                continue
 
-        if isinstance(target_date, str):
-            target_date = datetime.fromisoformat(target_date.replace("Z", "+00:00")).date()
+            if isinstance(target_date, str):
+                target_date = datetime.fromisoformat(target_date.replace("Z", "+00:00")).date()
 
-        months_remaining = max(
-            1,
-            (target_date.year - datetime.now(UTC).year) * 12 + (target_date.month - datetime.now(UTC).month),
-        )
+            months_remaining = max(1, (target_date.year - now.year) * 12 + (target_date.month - now.month))
+            rows.append((index, goal, months_remaining))
 
-        # Calculate Future Value using compound interest formula
-        # FV = current_savings*(1+r)^t + contribution * ((1+r)^t - 1)/r
-        monthly_rate = expected_return / 12.0
+    results: list[list[dict]] = [[] for _ in users]
+    if not rows:
+        return results
 
-        if monthly_rate > 0:
-            future_value_savings = float(
-                Decimal(str(current_savings)) * Decimal(str((1 + monthly_rate) ** months_remaining))
+    current_savings = np.array([float(users[index]["current_savings"]) for index, _, _ in rows])
+    monthly_savings = np.array([float(users[index]["monthly_savings"]) for index, _, _ in rows])
+    target_amounts = np.array([float(goal.get("target_amount", 0)) for _, goal, _ in rows])
+    months = np.array([months_remaining for _, _, months_remaining in rows], dtype=np.float64)
+
+    # Deterministic projection at the expected return (no compounding for non-positive rates)
+    monthly_rate = expected_return / 12.0
+    projected_values = future_values(current_savings, monthly_savings, months, max(monthly_rate, 0.0))
+
+    # Each user simulates from its own stream, and all of a user's goals share the
+    # same draws (common random numbers), so a goal's probability depends only on
+    # its own inputs and the seed, not on the other goals or users in the batch.
+    # A seeded user draws every sequential-sampling batch from its own child
+    # stream, so where a batch starts does not depend on how much earlier ones drew.
+    rng = rng or np.random.default_rng()
+    user_index = np.array([index for index, _, _ in rows])
+    user_seeds = {
+        index: simulation_seed(users[index]["seed"]) if users[index].get("seed") is not None else None
+        for index in np.unique(user_index)
+    }
+
+    def batch_seed(index: int, batch: int) -> np.random.SeedSequence | None:
+        return None if user_seeds[index] is None else child_seed(user_seeds[index], batch)
+
+    def batch_rng(index: int, batch: int) -> np.random.Generator:
+        seed = batch_seed(index, batch)
+        return rng if seed is None else np.random.default_rng(seed)
+
+    def simulate_successes(users_to_simulate: np.ndarray, paths: int, batch: int) -> np.ndarray:
+        """Success counts over the next `paths` paths for every sampled goal of the given users."""
+        successes = np.zeros(len(rows))
+        if model in ("annual", "analytic"):
+            if sampler == "sobol":
+                standard_normals = np.stack(
+                    [sobol_normals(paths, batch_rng(index, batch)) for index in users_to_simulate]
+                )
+            else:
+                standard_normals = np.stack(
+                    [batch_rng(index, batch).standard_normal(paths) for index in users_to_simulate]
+                )
+            goal_rows = np.isin(user_index, users_to_simulate) & sampled
+            successes[goal_rows] = paths * simulate_success_probabilities(
+                current_savings[goal_rows],
+                monthly_savings[goal_rows],
+                target_amounts[goal_rows],
+                months[goal_rows],
+                expected_return=expected_return,
+                standard_normals=standard_normals,
+                normals_index=np.searchsorted(users_to_simulate, user_index[goal_rows]),
             )
-            future_value_contributions = float(
-                Decimal(str(monthly_savings))
-                * Decimal(str(((1 + monthly_rate) ** months_remaining - 1) / monthly_rate))
+            return successes
+
+        for index in users_to_simulate:
+            user_rows = (user_index == index) & sampled
+            user = users[index]
+            if model == "regime":
+                # Regime returns replace expected_return: goals see the market the DQN was trained on
+                savings = float(user["monthly_savings"])
+                income = float(user.get("monthly_income", max(savings, 0.0)))
+                probabilities = simulate_regime_success_probabilities(
+                    float(user["current_savings"]),
+                    income,
+                    income - savings,
+                    target_amounts[user_rows],
+                    months[user_rows],
+                    num_simulations=paths,
+                    rng=rng,
+                    seed=batch_seed(index, batch),
+                )
+            else:
+                probabilities = simulate_monthly_success_probabilities(
+                    float(user["current_savings"]),
+                    float(user["monthly_savings"]),
+                    target_amounts[user_rows],
+                    months[user_rows],
+                    expected_return=expected_return,
+                    num_simulations=paths,
+                    rng=rng,
+                    seed=batch_seed(index, batch),
+                )
+            successes[user_rows] = paths * probabilities
+        return successes
+
+    # Goals whose inputs match a cached evaluation reuse its sampled figures. Cached
+    # goals drop out of the simulation, which shortens the user's longest sampled
+    # horizon; batch and block streams keep every remaining goal's paths unchanged,
+    # so a re-simulated goal gets the result it would have had alongside them.
+    # Regime paths span the longest horizon, so there a user's goals are only
+    # reused when all of them hit.
+    cached = np.zeros(len(rows), dtype=bool)
+    success_probabilities = np.empty(len(rows))
+    interval_low = np.empty(len(rows))
+    interval_high = np.empty(len(rows))
+    trials = np.zeros(len(rows))
+    cache_keys = []
+    if cache is not None and cache.enabled:
+        simulation_params = (model, sampler, num_simulations, batch_size, expected_return)
+        for row, (index, goal, months_remaining) in enumerate(rows):
+            user = users[index]
+            key = (
+                goal.get("id"),
+                target_amounts[row],
+                str(goal.get("target_date")),
+                months_remaining,
+                round_significant(float(user["current_savings"])),
+                round_significant(float(user["monthly_savings"])),
+                round_significant(float(user.get("monthly_income", 0.0))) if model == "regime" else None,
+                user.get("seed"),
+                simulation_params,
+                tail_paths,
             )
-            projected_value = future_value_savings + future_value_contributions
-        else:
-            projected_value = current_savings + (monthly_savings * months_remaining)
+            cache_keys.append(key)
+            hit = cache.get(key)
+            if hit is not None:
+                cached[row] = True
+                success_probabilities[row] = hit["success_probability"]
+                interval_low[row], interval_high[row] = hit["success_interval"]
+                trials[row] = hit["simulations"]
+        if model == "regime":
+            cached &= ~np.isin(user_index, user_index[~cached])
+            trials[~cached] = 0
 
-        # Monte Carlo simulation with 500 runs
-        num_simulations = 500
-        successful_runs = 0
+    # The analytic model solves goals with non-negative savings exactly; the rest
+    # (not monotone in the return) fall back to the annual simulation below
+    exact = np.zeros(len(rows), dtype=bool)
+    if model == "analytic":
+        exact = (current_savings >= 0) & (monthly_savings >= 0) & ~cached
+        success_probabilities[exact] = analytic_success_probabilities(
+            current_savings[exact],
+            monthly_savings[exact],
+            target_amounts[exact],
+            months[exact],
+            expected_return=expected_return,
+        )
+        interval_low[exact] = interval_high[exact] = success_probabilities[exact]
 
-        for _ in range(num_simulations):
-            # Simulate with random returns (normal distribution around expected return)
-            # Standard deviation of ~15% for stock market volatility
-            simulated_return = random.gauss(expected_return, 0.15)
-            simulated_monthly_rate = simulated_return / 12.0
+    # Sequential sampling: a goal stops once its interval lies between two status
+    # thresholds. A user keeps simulating all its goals while any is undecided, so
+    # the shared paths (and with a seed, the results) do not depend on stopping order.
+    batch_size = min(batch_size or num_simulations, num_simulations)
+    sampled = ~exact & ~cached
+    successes = np.zeros(len(rows))
+    active = sampled.copy()
+    batch = 0
+    while active.any():
+        paths = min(batch_size, num_simulations - int(trials[active].max()))
+        batch_successes = simulate_successes(np.unique(user_index[active]), paths, batch)
+        batch += 1
+        successes[active] += batch_successes[active]
+        trials[active] += paths
 
-            if simulated_monthly_rate > -0.05:  # Avoid extreme negative scenarios
-                sim_fv_savings = current_savings * ((1 + simulated_monthly_rate) ** months_remaining)
-                if simulated_monthly_rate != 0:
-                    sim_fv_contributions = monthly_savings * (
-                        ((1 + simulated_monthly_rate) ** months_remaining - 1) / simulated_monthly_rate
-                    )
-                else:
-                    sim_fv_contributions = monthly_savings * months_remaining
+        interval_low[sampled], interval_high[sampled] = wilson_interval(successes[sampled], trials[sampled])
+        crosses_threshold = (
+            (interval_low[:, None] < STATUS_THRESHOLDS) & (interval_high[:, None] >= STATUS_THRESHOLDS)
+        ).any(axis=1)
+        active &= crosses_threshold & (trials < num_simulations)
 
-                sim_total = sim_fv_savings + sim_fv_contributions
+    success_probabilities[sampled] = successes[sampled] / trials[sampled]
 
-                if sim_total >= float(target_amount):
-                    successful_runs += 1
+    # Near-certain or near-impossible goals: plain sampling saw few or no rare
+    # outcomes, so re-estimate them with importance sampling. The tilt is per goal,
+    # so a seeded goal draws from a stream of its own, derived from the seed and
+    # the goal id: the estimate does not depend on the sequential batches, the
+    # user's other goals or the other users in the chunk.
+    if tail_paths and model in ("annual", "monthly"):
+        tail = (
+            sampled
+            & (current_savings >= 0)
+            & (monthly_savings >= 0)
+            & ((interval_high <= TAIL_PROBABILITY) | (interval_low >= 1 - TAIL_PROBABILITY))
+        )
+        for row in np.flatnonzero(tail):
+            index, goal, _ = rows[row]
+            seed = users[index].get("seed")
+            goal_row = slice(row, row + 1)
+            probabilities, standard_errors = importance_success_probabilities(
+                current_savings[goal_row],
+                monthly_savings[goal_row],
+                target_amounts[goal_row],
+                months[goal_row],
+                expected_return=expected_return,
+                num_simulations=tail_paths,
+                rng=rng if seed is None else simulation_rng(f"{seed}:tail:{goal.get('id')}"),
+                model=model,
+            )
+            success_probabilities[goal_row] = np.clip(probabilities, 0.0, 1.0)
+            interval_low[goal_row] = np.clip(probabilities - WILSON_Z * standard_errors, 0.0, 1.0)
+            interval_high[goal_row] = np.clip(probabilities + WILSON_Z * standard_errors, 0.0, 1.0)
+            trials[goal_row] += tail_paths
+
+    for row in np.flatnonzero(~cached) if cache_keys else ():
+        index, goal, _ = rows[row]
+        cache.put(
+            cache_keys[row],
+            {
+                "success_probability": float(success_probabilities[row]),
+                "success_interval": (float(interval_low[row]), float(interval_high[row])),
+                "simulations": int(trials[row]),
+            },
+            user_id=users[index].get("user_id"),
+            goal_id=goal.get("id"),
+        )
 
-        success_probability = successful_runs / num_simulations
+    for row, (index, goal, months_remaining) in enumerate(rows):
+        success_probability = float(success_probabilities[row])
         goal_pressure = 1.0 - success_probability
 
         # Determine status based on success probability
-        if success_probability >= 0.75:
+        if success_probability >= ON_TRACK_PROBABILITY:
             status = "on_track"
-        elif success_probability >= 0.40:
+        elif success_probability >= AT_RISK_PROBABILITY:
             status = "at_risk"
         else:
             status = "unrealistic"
 
-        results.append(
+        results[index].append(
             {
-                "goal_id": goal_id,
+                "goal_id": goal.get("id"),
                 "goal_name": goal.get("name", "Unknown"),
                 "status": status,
-                "projected_value": round(projected_value, 2),
+                "projected_value": round(float(projected_values[row]), 2),
                 "success_probability": round(success_probability, 2),
+                "success_interval": [round(float(interval_low[row]), 3), round(float(interval_high[row]), 3)],
+                "tail_probability": round_significant(min(success_probability, 1.0 - success_probability), 3),
+                "simulations": int(trials[row]),
                 "goal_pressure": round(goal_pressure, 2),
-                "required_monthly_savings": round(float(target_amount) / months_remaining, 2),
-                "actual_monthly_savings": monthly_savings,
+                "required_monthly_savings": round(float(target_amounts[row]) / months_remaining, 2),
+                "actual_monthly_savings": users[index]["monthly_savings"],
             }
         )
 
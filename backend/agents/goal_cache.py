@@ -0,0 +1,119 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+
+# Savings inputs are rounded to this many significant digits in cache keys, so
+# small balance movements between refreshes reuse the previous simulation
+SAVINGS_KEY_DIGITS = 3
+
+
+def round_significant(value: float, digits: int = SAVINGS_KEY_DIGITS) -> float:
+    """
+    Round to a number of significant digits (0 stays 0).
+    """
+    if value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
+class GoalEvaluationCache:
+    """
+    Process-wide LRU cache of per-goal simulation results with a TTL.
+
+    Entries hold only the sampled figures (success probability, interval and
+    simulation count); deterministic fields are recomputed on every evaluation.
+    Goal, account and transaction writes invalidate the affected entries, and
+    the TTL bounds staleness for writes made by other processes.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, str | None, str | None, dict]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, max_entries: int, ttl_seconds: float) -> None:
+        """
+        Apply size and TTL settings (at app startup), dropping current entries.
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl_seconds = ttl_seconds
+            self._entries.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[3])
+
+    def put(self, key: Hashable, value: dict, user_id: str | None = None, goal_id: str | None = None) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl_seconds
+            self._entries[key] = (
+                expires_at,
+                str(user_id) if user_id is not None else None,
+                str(goal_id) if goal_id is not None else None,
+                dict(value),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop every entry of a user (their savings, balances or goals changed).
+        """
+        self._invalidate(lambda entry: entry[1] == str(user_id))
+
+    def invalidate_goal(self, goal_id: str) -> None:
+        """
+        Drop the entries of one goal.
+        """
+        self._invalidate(lambda entry: entry[2] == str(goal_id))
+
+    def _invalidate(self, matches: Callable[[tuple], bool]) -> None:
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if matches(entry)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+goal_evaluation_cache = GoalEvaluationCache()
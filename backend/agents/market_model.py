@@ -0,0 +1,130 @@
+import numpy as np
+
+# Market regimes of the RL environment, in index order used by the simulated arrays
+REGIMES = ("normal", "bull", "bear", "recession")
+
+# Transition weights from each regime (rows) to the next (columns), drawn when a regime ends
+REGIME_TRANSITION_WEIGHTS = np.array(
+    [
+        [0.5, 0.3, 0.15, 0.05],  # normal
+        [0.5, 0.2, 0.2, 0.1],  # bull
+        [0.5, 0.1, 0.3, 0.1],  # bear
+        [0.6, 0.1, 0.2, 0.1],  # recession
+    ]
+)
+
+# Monthly equity return mean/std and monthly debt return per regime
+REGIME_PARAMS = {
+    "normal": {"equity_mean": 0.07 / 12, "equity_std": 0.15 / 12, "debt": 0.04 / 12},
+    "bull": {"equity_mean": 0.12 / 12, "equity_std": 0.12 / 12, "debt": 0.035 / 12},
+    "bear": {"equity_mean": -0.05 / 12, "equity_std": 0.20 / 12, "debt": 0.045 / 12},
+    "recession": {"equity_mean": -0.15 / 12, "equity_std": 0.25 / 12, "debt": 0.03 / 12},
+}
+
+EQUITY_MEAN = np.array([REGIME_PARAMS[regime]["equity_mean"] for regime in REGIMES])
+EQUITY_STD = np.array([REGIME_PARAMS[regime]["equity_std"] for regime in REGIMES])
+DEBT_RETURN = np.array([REGIME_PARAMS[regime]["debt"] for regime in REGIMES])
+
+# A regime lasts a uniform whole number of months in this range (inclusive)
+REGIME_DURATION_MONTHS = (12, 36)
+
+# Monthly chance of an income/expense shock; the shock kind is then uniform over SHOCKS
+SHOCK_PROBABILITY = 0.05
+NO_SHOCK = 0
+SHOCKS = ("income_boost", "income_loss", "expense_spike")  # kinds 1, 2, 3
+SHOCK_MULTIPLIER_RANGES = {
+    "income_boost": (1.1, 1.3),  # Bonus or raise
+    "income_loss": (0.6, 0.8),  # Temporary income reduction
+    "expense_spike": (1.2, 1.5),  # Unexpected expense
+}
+
+
+def simulate_regimes(num_paths: int, num_months: int, rng: np.random.Generator, initial_regime: int = 0) -> np.ndarray:
+    """
+    Markov regime index for every month of every path, as a (paths x months) int array.
+
+    Mirrors FinancialEnv: a regime lasts a duration drawn from REGIME_DURATION_MONTHS,
+    then the next regime is drawn from REGIME_TRANSITION_WEIGHTS (possibly the same
+    one). The env switches on the step that completes the duration, so the initial
+    regime covers one month less than its draw. Only the loop over regime segments
+    is in Python (at most num_months / 12 + 1 of them); months are never iterated.
+    """
+    low, high = REGIME_DURATION_MONTHS
+    num_segments = num_months // low + 1
+
+    durations = rng.integers(low, high + 1, size=(num_paths, num_segments))
+    durations[:, 0] -= 1
+
+    # Regime of each segment, chained through the transition matrix
+    cumulative_weights = np.cumsum(REGIME_TRANSITION_WEIGHTS, axis=1)
+    cumulative_weights[:, -1] = 1.0
+    draws = rng.random((num_paths, num_segments))
+    segment_regimes = np.empty((num_paths, num_segments), dtype=np.int64)
+    segment_regimes[:, 0] = initial_regime
+    for segment in range(1, num_segments):
+        thresholds = cumulative_weights[segment_regimes[:, segment - 1]]
+        segment_regimes[:, segment] = (draws[:, segment, None] >= thresholds).sum(axis=1)
+
+    # Mark each segment start, then a running count gives every month's segment
+    starts = np.cumsum(durations, axis=1)[:, :-1]
+    markers = np.zeros((num_paths, num_months + 1), dtype=np.int64)
+    rows = np.broadcast_to(np.arange(num_paths)[:, None], starts.shape)
+    np.add.at(markers, (rows, np.minimum(starts, num_months)), 1)
+    segment_index = np.cumsum(markers[:, :num_months], axis=1)
+
+    return np.take_along_axis(segment_regimes, segment_index, axis=1)
+
+
+def simulate_market_returns(
+    regimes: np.ndarray, rng: np.random.Generator, equity_ratio: float = 1.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Monthly (equity, portfolio) returns for a regime matrix from simulate_regimes.
+
+    Equity returns are N(equity_mean, equity_std) of each month's regime; the
+    portfolio return blends them with the regime's debt return by equity_ratio,
+    as FinancialEnv does for its balance.
+    """
+    equity_returns = rng.standard_normal(regimes.shape)
+    equity_returns *= EQUITY_STD[regimes]
+    equity_returns += EQUITY_MEAN[regimes]
+    portfolio_returns = equity_ratio * equity_returns + (1 - equity_ratio) * DEBT_RETURN[regimes]
+    return equity_returns, portfolio_returns
+
+
+def simulate_shocks(num_paths: int, num_months: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Income/expense shocks for every month of every path.
+
+    Returns:
+        (kinds, multipliers): kinds is NO_SHOCK or 1 + the SHOCKS index, and
+        multipliers the factor applied to income (boost/loss) or expenses (spike)
+    """
+    shocked = rng.random((num_paths, num_months)) < SHOCK_PROBABILITY
+    kinds = np.where(shocked, rng.integers(1, len(SHOCKS) + 1, size=(num_paths, num_months)), NO_SHOCK)
+
+    low = np.ones(len(SHOCKS) + 1)
+    high = np.ones(len(SHOCKS) + 1)
+    for kind, shock in enumerate(SHOCKS, start=1):
+        low[kind], high[kind] = SHOCK_MULTIPLIER_RANGES[shock]
+    multipliers = rng.uniform(low[kinds], high[kinds])
+
+    return kinds, multipliers
+
+
+def simulate_contributions(
+    monthly_income: float,
+    monthly_expenses: float,
+    kinds: np.ndarray,
+    multipliers: np.ndarray,
+) -> np.ndarray:
+    """
+    Monthly savings (income - expenses) per path after persistent shocks.
+
+    Shocks compound like in FinancialEnv: each income shock rescales income for
+    every later month, and each expense spike rescales expenses.
+    """
+    is_expense = kinds == SHOCKS.index("expense_spike") + 1
+    income_factor = np.cumprod(np.where(is_expense, 1.0, multipliers), axis=1)
+    expense_factor = np.cumprod(np.where(is_expense, multipliers, 1.0), axis=1)
+    return monthly_income * income_factor - monthly_expenses * expense_factor
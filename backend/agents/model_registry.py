@@ -0,0 +1,129 @@
+import hashlib
+import time
+from collections import deque
+from datetime import UTC, datetime
+from pathlib import Path
+
+from core.logging import get_logger
+
+from .strategy_agent import StrategyAgent
+
+logger = get_logger(__name__)
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the strategy model.
+
+    The DQN weights are loaded once (at app startup) and the same StrategyAgent
+    is shared by every request, so refreshes only pay inference cost.
+    """
+
+    def __init__(self, latency_window: int = 1000):
+        self._agent: StrategyAgent | None = None
+        self.model_path: str | None = None
+        self.version: str | None = None
+        self.loaded_at: datetime | None = None
+        self.load_time_ms: float | None = None
+        self._latencies_ms: deque[float] = deque(maxlen=latency_window)
+        self._inference_count = 0
+
+    def load(self, model_path: str | None) -> StrategyAgent:
+        """
+        Load (or reload) the strategy model from disk.
+        """
+        start = time.perf_counter()
+        agent = StrategyAgent(model_path=model_path)
+        load_time_ms = (time.perf_counter() - start) * 1000
+
+        self._agent = agent
+        self.model_path = model_path
+        self.version = _model_version(model_path) if agent.dqn else "heuristic"
+        self.loaded_at = datetime.now(UTC)
+        self.load_time_ms = load_time_ms
+        self._latencies_ms.clear()
+        self._inference_count = 0
+
+        logger.info(f"Strategy model loaded: version={self.version} load_time_ms={load_time_ms:.1f}")
+        return agent
+
+    def get_agent(self, model_path: str | None = None) -> StrategyAgent:
+        """
+        Return the shared StrategyAgent, loading it on first use if startup did not.
+        """
+        if self._agent is None:
+            return self.load(model_path)
+        return self._agent
+
+    def get_strategy(
+        self,
+        risk_metrics: dict,
+        goal_evaluations: list[dict],
+        allocation: dict,
+        savings_rate: float,
+        model_path: str | None = None,
+    ) -> dict:
+        """
+        Run strategy inference on the shared agent and record its latency.
+        """
+        agent = self.get_agent(model_path)
+        start = time.perf_counter()
+        strategy = agent.get_strategy(risk_metrics, goal_evaluations, allocation, savings_rate)
+        self._latencies_ms.append((time.perf_counter() - start) * 1000)
+        self._inference_count += 1
+        return strategy
+
+    def get_strategies(
+        self,
+        risk_metrics: list[dict],
+        goal_evaluations: list[list[dict]],
+        allocations: list[dict],
+        savings_rates: list[float],
+        model_path: str | None = None,
+    ) -> list[dict]:
+        """
+        Run batched strategy inference (one forward pass) and record its latency.
+        """
+        agent = self.get_agent(model_path)
+        start = time.perf_counter()
+        strategies = agent.get_strategies(risk_metrics, goal_evaluations, allocations, savings_rates)
+        self._latencies_ms.append((time.perf_counter() - start) * 1000)
+        self._inference_count += 1
+        return strategies
+
+    def stats(self) -> dict:
+        """
+        Model metadata and inference latency percentiles over the recent window.
+        """
+        latencies = sorted(self._latencies_ms)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+
+        return {
+            "loaded": self._agent is not None,
+            "version": self.version,
+            "model_path": self.model_path,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "load_time_ms": round(self.load_time_ms, 3) if self.load_time_ms is not None else None,
+            "inference_count": self._inference_count,
+            "inference_latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+            },
+        }
+
+
+def _model_version(model_path: str | None) -> str | None:
+    """
+    Short content hash of the weights file, so a retrained model gets a new version.
+    """
+    if not model_path:
+        return None
+    return hashlib.sha256(Path(model_path).read_bytes()).hexdigest()[:12]
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,409 @@
+import hashlib
+
+import numpy as np
+
+from .market_model import simulate_contributions, simulate_market_returns, simulate_regimes, simulate_shocks
+from .qmc import normal_cdf
+
+# Simulation models: "annual" draws one return per path and compounds it as a
+# constant; "monthly" draws a return per month, so sequence-of-returns risk counts;
+# "regime" draws monthly returns and income/expense shocks from the RL env's market model;
+# "analytic" computes the "annual" model's probability exactly, without sampling
+SIMULATION_MODELS = ("annual", "monthly", "regime", "analytic")
+
+# Samplers for the standard normal draws: "pseudo" random numbers, or "sobol"
+# (scrambled Sobol quasi-random points, agents.qmc). Sobol points are generated
+# for one dimension, i.e. for the "annual" model's single draw per path.
+SAMPLERS = ("pseudo", "sobol")
+
+DEFAULT_SIMULATIONS = 10_000
+DEFAULT_VOLATILITY = 0.15  # Annual standard deviation, ~stock market volatility
+
+# Simulated monthly rates at or below this are treated as failed runs (extreme scenarios)
+MIN_MONTHLY_RATE = -0.05
+
+# Upper bound on goals x paths evaluated per block, to cap peak memory for large batches
+MAX_BLOCK_ELEMENTS = 2_000_000
+
+# Break-even search: upper bracket in standard deviations above the mean annual
+# return, and bisection steps (60 halvings reach float precision on the bracket)
+BREAK_EVEN_MAX_SIGMAS = 12.0
+BREAK_EVEN_ITERATIONS = 60
+
+# z-score of the confidence level used for success probability intervals (95%)
+WILSON_Z = 1.96
+
+# Paths per block of the monthly-step model. Fixed rather than derived from the
+# longest horizon, and with a seed every block draws from its own child stream, so
+# a seeded goal sees the same draws whatever other goals exist
+MONTHLY_PATH_BLOCK = 8192
+
+
+def simulation_seed(seed: str) -> np.random.SeedSequence:
+    """
+    Deterministic seed sequence for a seed string (e.g. a per-user simulation key).
+
+    The seed is hashed so that similar strings still give unrelated streams.
+    """
+    digest = hashlib.sha256(seed.encode()).digest()
+    return np.random.SeedSequence(int.from_bytes(digest, "big"))
+
+
+def child_seed(seed: np.random.SeedSequence, *key: int) -> np.random.SeedSequence:
+    """
+    Independent child stream of a seed sequence, identified by key (e.g. batch and block numbers).
+
+    Unlike SeedSequence.spawn, the child depends only on the key, not on how many
+    children were spawned before, so a block's draws do not depend on how many
+    numbers earlier blocks consumed.
+    """
+    return np.random.SeedSequence(seed.entropy, spawn_key=(*seed.spawn_key, *key))
+
+
+def simulation_rng(seed: str) -> np.random.Generator:
+    """
+    Deterministic generator for a seed string (e.g. a per-user simulation key).
+    """
+    return np.random.default_rng(simulation_seed(seed))
+
+
+def wilson_interval(successes: np.ndarray, trials: np.ndarray, z: float = WILSON_Z) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score interval for binomial success probabilities, elementwise.
+
+    Unlike the normal approximation it stays inside [0, 1] and keeps a non-zero
+    width at 0 or 100% observed successes.
+    """
+    trials = np.asarray(trials, dtype=np.float64)
+    p = np.asarray(successes, dtype=np.float64) / trials
+    z2 = z * z
+    center = (p + z2 / (2 * trials)) / (1 + z2 / trials)
+    half_width = z * np.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / (1 + z2 / trials)
+    return np.clip(center - half_width, 0.0, 1.0), np.clip(center + half_width, 0.0, 1.0)
+
+
+def future_values(
+    current_savings: np.ndarray | float,
+    monthly_savings: np.ndarray | float,
+    months: np.ndarray | float,
+    monthly_rate: np.ndarray | float,
+) -> np.ndarray:
+    """
+    Compound-interest future value, broadcast over any array arguments.
+
+    FV = current_savings * (1+r)^t + monthly_savings * ((1+r)^t - 1) / r,
+    using the r == 0 limit current_savings + monthly_savings * t.
+    """
+    growth = np.power(1.0 + monthly_rate, months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(monthly_rate != 0, (growth - 1.0) / monthly_rate, months)
+    return current_savings * growth + monthly_savings * annuity
+
+
+def simulate_success_probabilities(
+    current_savings: np.ndarray,
+    monthly_savings: np.ndarray,
+    target_amounts: np.ndarray,
+    months: np.ndarray,
+    expected_return: float = 0.07,
+    volatility: float = DEFAULT_VOLATILITY,
+    num_simulations: int = DEFAULT_SIMULATIONS,
+    rng: np.random.Generator | None = None,
+    standard_normals: np.ndarray | None = None,
+    normals_index: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Monte Carlo success probability for many goals at once.
+
+    Each simulated path draws one annual return from N(expected_return, volatility)
+    and compounds it monthly over the goal's horizon; a path succeeds if the
+    future value reaches the target. All goal arguments are 1-D arrays of the
+    same length (one entry per goal, possibly across users).
+
+    By default every goal gets fresh draws from rng. Alternatively pass a
+    (groups x num_simulations) matrix of standard normal draws and, per goal, the
+    row it reads (normals_index), e.g. one row per user so a user's goals share
+    common random numbers.
+
+    Returns:
+        Array of success probabilities, one per goal
+    """
+    rng = rng or np.random.default_rng()
+    current_savings, monthly_savings, target_amounts, months = (
+        np.asarray(values, dtype=np.float64) for values in (current_savings, monthly_savings, target_amounts, months)
+    )
+
+    num_goals = len(target_amounts)
+    probabilities = np.empty(num_goals)
+    if standard_normals is not None:
+        num_simulations = standard_normals.shape[1]
+    block = max(1, MAX_BLOCK_ELEMENTS // num_simulations)
+
+    for start in range(0, num_goals, block):
+        goals = slice(start, start + block)
+        if standard_normals is None:
+            annual_returns = rng.normal(expected_return, volatility, size=(len(target_amounts[goals]), num_simulations))
+        else:
+            annual_returns = expected_return + volatility * standard_normals[normals_index[goals]]
+        rates = annual_returns / 12.0
+        values = future_values(
+            current_savings[goals, None],
+            monthly_savings[goals, None],
+            months[goals, None],
+            rates,
+        )
+        success = (rates > MIN_MONTHLY_RATE) & (values >= target_amounts[goals, None])
+        probabilities[goals] = success.mean(axis=1)
+
+    return probabilities
+
+
+def break_even_returns(
+    current_savings: np.ndarray,
+    monthly_savings: np.ndarray,
+    target_amounts: np.ndarray,
+    months: np.ndarray,
+    expected_return: float = 0.07,
+    volatility: float = DEFAULT_VOLATILITY,
+) -> np.ndarray:
+    """
+    Lowest constant annual return at which each goal's future value reaches its target.
+
+    Found by vectorized bisection on future_values, bracketed by the
+    MIN_MONTHLY_RATE cut-off (returned when even that reaches the target) and
+    BREAK_EVEN_MAX_SIGMAS above the mean (inf when even that falls short).
+    Assumes non-negative savings, where the future value increases with the return.
+    """
+    current_savings, monthly_savings, target_amounts, months = (
+        np.asarray(values, dtype=np.float64) for values in (current_savings, monthly_savings, target_amounts, months)
+    )
+
+    def reaches_target(annual_returns: np.ndarray) -> np.ndarray:
+        return future_values(current_savings, monthly_savings, months, annual_returns / 12.0) >= target_amounts
+
+    low = np.full(len(target_amounts), 12.0 * MIN_MONTHLY_RATE)
+    high = np.full(len(target_amounts), expected_return + BREAK_EVEN_MAX_SIGMAS * volatility)
+    reached_at_low = reaches_target(low)
+    reached_at_high = reaches_target(high)
+
+    for _ in range(BREAK_EVEN_ITERATIONS):
+        middle = (low + high) / 2
+        reached = reaches_target(middle)
+        high = np.where(reached, middle, high)
+        low = np.where(reached, low, middle)
+
+    break_even = np.where(reached_at_low, 12.0 * MIN_MONTHLY_RATE, high)
+    return np.where(reached_at_high, break_even, np.inf)
+
+
+def analytic_success_probabilities(
+    current_savings: np.ndarray,
+    monthly_savings: np.ndarray,
+    target_amounts: np.ndarray,
+    months: np.ndarray,
+    expected_return: float = 0.07,
+    volatility: float = DEFAULT_VOLATILITY,
+) -> np.ndarray:
+    """
+    Exact success probability of the single-draw ("annual") model, for many goals at once.
+
+    With non-negative current and monthly savings the future value increases with
+    the annual return r, so a path succeeds exactly when r exceeds the break-even
+    return r* (and the MIN_MONTHLY_RATE cut-off), and
+    P(success) = 1 - Phi((r* - mean) / volatility).
+    Goals with negative savings are not monotone in r and must be simulated instead.
+
+    Returns:
+        Array of success probabilities, one per goal
+    """
+    break_even = break_even_returns(
+        current_savings, monthly_savings, target_amounts, months, expected_return, volatility
+    )
+    return 1.0 - normal_cdf((break_even - expected_return) / volatility)
+
+
+def importance_success_probabilities(
+    current_savings: np.ndarray,
+    monthly_savings: np.ndarray,
+    target_amounts: np.ndarray,
+    months: np.ndarray,
+    expected_return: float = 0.07,
+    volatility: float = DEFAULT_VOLATILITY,
+    num_simulations: int = 2_000,
+    rng: np.random.Generator | None = None,
+    model: str = "annual",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Importance-sampling success probability for goals far in the tails.
+
+    Plain Monte Carlo needs ~100/p paths to estimate a probability p with 10%
+    relative error. Here the standard normal draws are shifted so the mean
+    return sits at the goal's break-even return, where about half the paths
+    succeed, and each path is reweighted by the likelihood ratio
+    exp(-shift * sum(z) + n * shift^2 / 2) (n draws per path). The rare outcome
+    is what gets estimated (success when the break-even return is above the
+    mean, failure otherwise), where the weights are bounded, so the estimate is
+    unbiased and a small fixed budget resolves probabilities down to ~1e-10.
+
+    Supports the "annual" model (one draw per path) and the "monthly" model
+    (one draw per month, every month shifted alike). Each goal gets its own
+    paths, since the shift is per goal. Savings must be non-negative. The tilt
+    stops at the break-even bracket, so outcomes beyond it come out as 0 or 1.
+
+    Returns:
+        (probabilities, standard_errors), one entry per goal
+    """
+    rng = rng or np.random.default_rng()
+    current_savings, monthly_savings, target_amounts, months = (
+        np.asarray(values, dtype=np.float64) for values in (current_savings, monthly_savings, target_amounts, months)
+    )
+    break_even = break_even_returns(
+        current_savings, monthly_savings, target_amounts, months, expected_return, volatility
+    )
+    # Unreachable goals (inf) are tilted as far as the break-even bracket goes
+    shifts = np.clip((break_even - expected_return) / volatility, -BREAK_EVEN_MAX_SIGMAS, BREAK_EVEN_MAX_SIGMAS)
+
+    probabilities = np.empty(len(target_amounts))
+    standard_errors = np.empty(len(target_amounts))
+
+    if model == "annual":
+        z = rng.standard_normal((len(target_amounts), num_simulations)) + shifts[:, None]
+        weights = np.exp(-shifts[:, None] * z + shifts[:, None] ** 2 / 2)
+        rates = (expected_return + volatility * z) / 12.0
+        values = future_values(current_savings[:, None], monthly_savings[:, None], months[:, None], rates)
+        success = (rates > MIN_MONTHLY_RATE) & (values >= target_amounts[:, None])
+        weighted = np.where(success == (shifts[:, None] >= 0), weights, 0.0)
+        rare = weighted.mean(axis=1)
+        return np.where(shifts >= 0, rare, 1.0 - rare), weighted.std(axis=1) / np.sqrt(num_simulations)
+
+    if model != "monthly":
+        raise ValueError(f"Importance sampling is not available for the {model} model")
+
+    # Success is roughly "the average monthly return beats r* / 12", i.e. the mean of
+    # the horizon's monthly draws exceeds shift / sqrt(12): tilt every month by that
+    for goal, shift in enumerate(shifts / np.sqrt(12.0)):
+        horizon = int(months[goal])
+        z = rng.standard_normal((num_simulations, horizon)) + shift
+        weights = np.exp(-shift * z.sum(axis=1) + horizon * shift**2 / 2)
+        monthly_returns = expected_return / 12.0 + volatility / np.sqrt(12.0) * z
+        wealth = simulate_wealth_paths(current_savings[goal], monthly_savings[goal], monthly_returns)[:, -1]
+        weighted = np.where((wealth >= target_amounts[goal]) == (shift >= 0), weights, 0.0)
+        probabilities[goal] = weighted.mean() if shift >= 0 else 1.0 - weighted.mean()
+        standard_errors[goal] = weighted.std() / np.sqrt(num_simulations)
+
+    return probabilities, standard_errors
+
+
+def simulate_wealth_paths(
+    current_savings: float,
+    monthly_savings: np.ndarray | float,
+    monthly_returns: np.ndarray,
+) -> np.ndarray:
+    """
+    Wealth after each month for a (paths x months) matrix of monthly returns.
+
+    Applies W_t = W_{t-1} * (1 + r_t) + s_t from W_0 = current_savings, in closed
+    form: W_t = G_t * (current_savings + sum_{k<=t} s_k / G_k) with G_t the
+    cumulative growth factor, so there is no per-month Python loop. monthly_savings
+    is a constant s or a (paths x months) matrix of per-month contributions.
+    """
+    # In-place on two temporaries: this runs on every (paths x months) block
+    growth = np.add(1.0, monthly_returns)
+    np.cumprod(growth, axis=1, out=growth)
+    contributions = np.reciprocal(growth)
+    contributions *= monthly_savings
+    np.cumsum(contributions, axis=1, out=contributions)
+    contributions += current_savings
+    growth *= contributions
+    return growth
+
+
+def simulate_monthly_success_probabilities(
+    current_savings: float,
+    monthly_savings: float,
+    target_amounts: np.ndarray,
+    months: np.ndarray,
+    expected_return: float = 0.07,
+    volatility: float = DEFAULT_VOLATILITY,
+    num_simulations: int = DEFAULT_SIMULATIONS,
+    rng: np.random.Generator | None = None,
+    seed: np.random.SeedSequence | None = None,
+) -> np.ndarray:
+    """
+    Monte Carlo success probability for one user's goals with monthly-step returns.
+
+    Draws a single (paths x max_months) matrix of monthly returns from
+    N(expected_return/12, volatility/sqrt(12)) for the user; every goal reads the
+    wealth at its own horizon from the same paths (a prefix of each path), so
+    random generation is paid once per user and goals share common random numbers.
+    With a seed (which takes precedence over rng) each block of MONTHLY_PATH_BLOCK
+    paths draws from its own child stream, so a goal's paths are also the same
+    whichever other goals exist.
+
+    Returns:
+        Array of success probabilities, one per goal
+    """
+    rng = rng or np.random.default_rng()
+    target_amounts = np.asarray(target_amounts, dtype=np.float64)
+    horizon_index = np.asarray(months, dtype=np.int64) - 1
+
+    max_months = int(horizon_index.max()) + 1
+    successes = np.zeros(len(target_amounts))
+
+    for start in range(0, num_simulations, MONTHLY_PATH_BLOCK):
+        paths = min(MONTHLY_PATH_BLOCK, num_simulations - start)
+        block_rng = rng if seed is None else np.random.default_rng(child_seed(seed, start // MONTHLY_PATH_BLOCK))
+        # Drawn month-major: the first k months of every path do not depend on max_months
+        monthly_returns = block_rng.normal(
+            expected_return / 12.0, volatility / np.sqrt(12.0), size=(max_months, paths)
+        ).T
+        wealth = simulate_wealth_paths(current_savings, monthly_savings, monthly_returns)
+        successes += (wealth[:, horizon_index] >= target_amounts).sum(axis=0)
+
+    return successes / num_simulations
+
+
+def simulate_regime_success_probabilities(
+    current_savings: float,
+    monthly_income: float,
+    monthly_expenses: float,
+    target_amounts: np.ndarray,
+    months: np.ndarray,
+    equity_ratio: float = 1.0,
+    num_simulations: int = DEFAULT_SIMULATIONS,
+    rng: np.random.Generator | None = None,
+    seed: np.random.SeedSequence | None = None,
+) -> np.ndarray:
+    """
+    Monte Carlo success probability for one user's goals under the RL env's market model.
+
+    Each path follows Markov market regimes with regime-dependent monthly returns
+    and persistent income/expense shocks (agents.market_model, the dynamics the
+    DQN was trained on); goals share the paths like the "monthly" model. With a
+    seed each block draws from its own child stream, but the regime and shock
+    arrays span the longest horizon, so unlike the "monthly" model a goal's paths
+    change when a longer goal is added.
+
+    Returns:
+        Array of success probabilities, one per goal
+    """
+    rng = rng or np.random.default_rng()
+    target_amounts = np.asarray(target_amounts, dtype=np.float64)
+    horizon_index = np.asarray(months, dtype=np.int64) - 1
+
+    max_months = int(horizon_index.max()) + 1
+    successes = np.zeros(len(target_amounts))
+    # Several (paths x months) temporaries are alive at once here, so use smaller blocks
+    block = max(1, MAX_BLOCK_ELEMENTS // (4 * max_months))
+
+    for start in range(0, num_simulations, block):
+        paths = min(block, num_simulations - start)
+        block_rng = rng if seed is None else np.random.default_rng(child_seed(seed, start // block))
+        regimes = simulate_regimes(paths, max_months, block_rng)
+        _, monthly_returns = simulate_market_returns(regimes, block_rng, equity_ratio)
+        kinds, multipliers = simulate_shocks(paths, max_months, block_rng)
+        contributions = simulate_contributions(monthly_income, monthly_expenses, kinds, multipliers)
+        wealth = simulate_wealth_paths(current_savings, contributions, monthly_returns)
+        successes += (wealth[:, horizon_index] >= target_amounts).sum(axis=0)
+
+    return successes / num_simulations
@@ -0,0 +1,370 @@
+import calendar
+from collections.abc import Iterator
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Any
+
+from core.config import settings
+from core.logging import get_logger
+from models.enums import AccountType, RiskAppetite
+
+from .goal_agent import evaluate_goals, evaluate_goals_batch
+from .goal_cache import goal_evaluation_cache
+from .investment_agent import recommend_allocation
+from .model_registry import model_registry
+from .risk_agent import compute_risk_metrics_from_minor_units, to_minor_units
+
+logger = get_logger(__name__)
+
+# Deterministic agent stages, in execution order
+AGENT_STAGES = ("risk", "goals", "allocation", "strategy")
+
+# Cashflow windows: the risk agent's burn rate covers the last 60 days,
+# monthly income/expense figures the most recent 30
+CASHFLOW_WINDOW_DAYS = 60
+MONTHLY_WINDOW_DAYS = 30
+
+# Default annual return assumed for goal projections
+GOAL_EXPECTED_RETURN = 0.07
+
+
+def prepare_agent_inputs(inputs: dict) -> dict:
+    """
+    Convert loaded prognosis inputs into the plain-float structures the agents take.
+
+    Args:
+        inputs: Dict with 'accounts', 'cashflow' and 'goals' as returned by
+            prognosis_service.load_prognosis_inputs
+
+    Returns:
+        Dict with liquid_accounts, goals, monthly cashflow figures, the risk agent's
+        minor-unit totals (window_debits, liquid_balance and monthly_income_minor),
+        current_savings, goal_time_horizon and account summary counts
+    """
+    accounts = inputs["accounts"]
+    cashflow = inputs["cashflow"]
+    goals = inputs["goals"]
+
+    liquid_accounts = [
+        {
+            "id": acc["id"],
+            "balance": float(acc["balance"]),
+            "currency": acc["currency"],
+        }
+        for acc in accounts
+        if acc["type"] in [AccountType.BANK, AccountType.CASH]
+    ]
+
+    # Cashflow rows are pre-aggregated per window and currency by the loader
+    monthly_debits = Decimal("0")
+    monthly_credits = Decimal("0")
+    window_debits = 0
+    num_transactions = 0
+
+    for row in cashflow:
+        window_debits += to_minor_units(row["debits"])
+        num_transactions += row["count"]
+        if row["window_days"] == MONTHLY_WINDOW_DAYS:
+            monthly_debits += row["debits"]
+            monthly_credits += row["credits"]
+
+    goal_dicts = [
+        {
+            "id": g["id"],
+            "name": g["name"],
+            "target_amount": float(g["target_amount"]),
+            "target_date": g["target_date"],
+            "priority": g["priority"].value,
+        }
+        for g in goals
+    ]
+
+    return {
+        "liquid_accounts": liquid_accounts,
+        "goals": goal_dicts,
+        "monthly_income": float(monthly_credits),
+        "monthly_expenses": float(monthly_debits),
+        "monthly_savings": float(monthly_credits - monthly_debits),
+        "window_debits": window_debits,
+        "liquid_balance": sum(
+            to_minor_units(acc["balance"]) for acc in accounts if acc["type"] in [AccountType.BANK, AccountType.CASH]
+        ),
+        "monthly_income_minor": to_minor_units(monthly_credits),
+        # Calculate total current savings (sum of liquid accounts)
+        "current_savings": sum(acc.get("balance", 0) for acc in liquid_accounts),
+        "goal_time_horizon": goal_time_horizon(goals),
+        "total_balance": float(sum(acc["balance"] for acc in accounts)),
+        "num_accounts": len(accounts),
+        "num_transactions": num_transactions,
+    }
+
+
+def goal_time_horizon(goals: list[dict]) -> int:
+    """
+    Years to the nearest goal (10 without goals), at least 1.
+    """
+    if not goals:
+        return 10
+    now = datetime.now(UTC)
+    nearest_goal_months = min(
+        max(1, (g["target_date"].year - now.year) * 12 + (g["target_date"].month - now.month)) for g in goals
+    )
+    return max(1, nearest_goal_months // 12)
+
+
+def goal_simulation_seed(user_id: str) -> str:
+    """
+    Seed for a user's goal simulations.
+
+    It is fixed per user rather than per input fingerprint: identical inputs
+    reproduce identical probabilities, and refreshes on changed inputs reuse the
+    same random numbers, so report diffs reflect the data rather than sampling noise.
+    """
+    return f"{settings.goal_simulation_seed}:{user_id}"
+
+
+def iter_agent_pipeline(
+    profile: dict,
+    agent_inputs: dict,
+    macro_state: str,
+    goal_evaluations: list[dict] | None = None,
+    user_id: str | None = None,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Run the deterministic agents in order, yielding (stage, result) after each.
+
+    Stages are evaluated lazily, so a consumer can do work (e.g. report
+    progress) between them. Callers that already evaluated the goals (e.g. for
+    a whole batch with goal_agent.evaluate_goals_batch) can pass goal_evaluations
+    to skip that simulation. With a user_id the goal simulation is seeded per
+    user (see goal_simulation_seed) and its results are cached per goal.
+    """
+    # Compute risk metrics with monthly income
+    risk_metrics = compute_risk_metrics_from_minor_units(
+        agent_inputs["window_debits"],
+        agent_inputs["num_transactions"],
+        agent_inputs["liquid_balance"],
+        monthly_income=agent_inputs["monthly_income_minor"],
+        days_in_period=CASHFLOW_WINDOW_DAYS,
+    )
+    yield "risk", risk_metrics
+
+    if goal_evaluations is None:
+        goal_evaluations = evaluate_goals(
+            agent_inputs["goals"],
+            agent_inputs["monthly_savings"],
+            profile["base_currency"],
+            current_savings=agent_inputs["current_savings"],
+            expected_return=GOAL_EXPECTED_RETURN,
+            num_simulations=settings.goal_simulation_paths,
+            model=settings.goal_simulation_model,
+            batch_size=settings.goal_simulation_batch_size,
+            sampler=settings.goal_simulation_sampler,
+            tail_paths=settings.goal_simulation_tail_paths,
+            monthly_income=agent_inputs["monthly_income"],
+            seed=goal_simulation_seed(user_id) if user_id else None,
+            cache=goal_evaluation_cache if user_id else None,
+            user_id=user_id,
+        )
+    yield "goals", goal_evaluations
+
+    allocation = recommend_allocation(
+        risk_metrics["risk_score"],
+        profile["risk_appetite"].value,
+        goal_evaluations,
+        macro_state,
+        age=profile["age"],
+        goal_time_horizon=agent_inputs["goal_time_horizon"],
+    )
+    yield "allocation", allocation
+
+    # Run strategy agent (RL or heuristic fallback)
+    savings_rate = risk_metrics.get("savings_ratio", 0.0)
+    strategy = model_registry.get_strategy(
+        risk_metrics,
+        goal_evaluations,
+        allocation,
+        savings_rate,
+        model_path=settings.model_path,
+    )
+    yield "strategy", strategy
+
+
+def run_agent_pipeline(
+    profile: dict,
+    agent_inputs: dict,
+    macro_state: str,
+    goal_evaluations: list[dict] | None = None,
+    user_id: str | None = None,
+) -> dict:
+    """
+    Run every deterministic agent and return their results keyed by stage.
+    """
+    return dict(iter_agent_pipeline(profile, agent_inputs, macro_state, goal_evaluations, user_id))
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Shift a date by whole months, clamping the day to the end of the target month.
+    """
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    return day.replace(year=year, month=month + 1, day=min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def apply_what_if(profile: dict, agent_inputs: dict, variant: dict) -> tuple[dict, dict]:
+    """
+    Profile and agent inputs as they would be under a what-if variant.
+
+    Args:
+        variant: Dict with optional 'savings_increase_pct' (extra monthly savings
+            as a percentage of monthly income, taken out of expenses; negative
+            saves less), 'goal_delay_months' (every goal's target date moves
+            this many months later) and 'risk_appetite' (replaces the profile's)
+
+    Returns:
+        (profile, agent_inputs) copies; the originals are not modified
+    """
+    profile = dict(profile)
+    agent_inputs = dict(agent_inputs)
+
+    if variant.get("risk_appetite"):
+        profile["risk_appetite"] = RiskAppetite(variant["risk_appetite"])
+
+    if variant.get("savings_increase_pct"):
+        # Expenses cannot drop below zero, so extra savings are capped at them
+        extra = min(
+            agent_inputs["monthly_income"] * variant["savings_increase_pct"] / 100,
+            agent_inputs["monthly_expenses"],
+        )
+        agent_inputs["monthly_expenses"] -= extra
+        agent_inputs["monthly_savings"] += extra
+        # The risk window spans CASHFLOW_WINDOW_DAYS of the lower (or higher) spending
+        window_change = to_minor_units(extra * CASHFLOW_WINDOW_DAYS / MONTHLY_WINDOW_DAYS)
+        agent_inputs["window_debits"] = max(0, agent_inputs["window_debits"] - window_change)
+
+    if variant.get("goal_delay_months"):
+        agent_inputs["goals"] = [
+            {**goal, "target_date": add_months(goal["target_date"], variant["goal_delay_months"])}
+            for goal in agent_inputs["goals"]
+        ]
+        agent_inputs["goal_time_horizon"] = goal_time_horizon(agent_inputs["goals"])
+
+    return profile, agent_inputs
+
+
+def run_what_if_scenarios(
+    profile: dict,
+    agent_inputs: dict,
+    macro_state: str,
+    variants: list[dict],
+    user_id: str | None = None,
+) -> list[dict]:
+    """
+    Run the deterministic agents for many what-if variants of one user's inputs.
+
+    Each variant is applied with apply_what_if. Goals of every variant are
+    simulated in one evaluate_goals_batch pass, all with the user's seed so
+    variants share common random numbers and differ only by their parameters,
+    and strategies come from one batched inference. Results are not cached.
+
+    Returns:
+        One dict per variant with its 'monthly_savings', 'risk', 'goals', 'allocation' and 'strategy'
+    """
+    scenarios = [apply_what_if(profile, agent_inputs, variant) for variant in variants]
+
+    risk_metrics = [
+        compute_risk_metrics_from_minor_units(
+            inputs["window_debits"],
+            inputs["num_transactions"],
+            inputs["liquid_balance"],
+            monthly_income=inputs["monthly_income_minor"],
+            days_in_period=CASHFLOW_WINDOW_DAYS,
+        )
+        for _, inputs in scenarios
+    ]
+
+    goal_evaluations = evaluate_goals_batch(
+        [
+            {
+                "goals": inputs["goals"],
+                "monthly_savings": inputs["monthly_savings"],
+                "current_savings": inputs["current_savings"],
+                "monthly_income": inputs["monthly_income"],
+                "seed": goal_simulation_seed(user_id) if user_id else None,
+            }
+            for _, inputs in scenarios
+        ],
+        expected_return=GOAL_EXPECTED_RETURN,
+        num_simulations=settings.goal_simulation_paths,
+        model=settings.goal_simulation_model,
+        batch_size=settings.goal_simulation_batch_size,
+        sampler=settings.goal_simulation_sampler,
+        tail_paths=settings.goal_simulation_tail_paths,
+    )
+
+    allocations = [
+        recommend_allocation(
+            risk["risk_score"],
+            variant_profile["risk_appetite"].value,
+            goals,
+            macro_state,
+            age=variant_profile["age"],
+            goal_time_horizon=inputs["goal_time_horizon"],
+        )
+        for (variant_profile, inputs), risk, goals in zip(scenarios, risk_metrics, goal_evaluations, strict=True)
+    ]
+
+    strategies = model_registry.get_strategies(
+        risk_metrics,
+        goal_evaluations,
+        allocations,
+        [risk.get("savings_ratio", 0.0) for risk in risk_metrics],
+        model_path=settings.model_path,
+    )
+
+    return [
+        {
+            "monthly_savings": inputs["monthly_savings"],
+            "risk": risk,
+            "goals": goals,
+            "allocation": allocation,
+            "strategy": strategy,
+        }
+        for (_, inputs), risk, goals, allocation, strategy in zip(
+            scenarios, risk_metrics, goal_evaluations, allocations, strategies, strict=True
+        )
+    ]
+
+
+def build_narrator_input(
+    profile: dict,
+    agent_inputs: dict,
+    outputs: dict,
+    changes_since_last: dict | None,
+) -> dict:
+    """
+    Assemble the Narrator (LLM) input from the agent results.
+
+    Args:
+        changes_since_last: Metric delta against the previous report (see
+            report_delta.compute_report_delta), or None for a first report
+    """
+    return {
+        "profile": {
+            "age": profile["age"],
+            "base_currency": profile["base_currency"],
+            "risk_appetite": profile["risk_appetite"].value,
+        },
+        "risk": outputs["risk"],
+        "goals": outputs["goals"],
+        "allocation": outputs["allocation"],
+        "strategy": outputs["strategy"],
+        "accounts_summary": {
+            "num_accounts": agent_inputs["num_accounts"],
+            "num_transactions": agent_inputs["num_transactions"],
+            "total_balance": agent_inputs["total_balance"],
+            "monthly_income": agent_inputs["monthly_income"],
+            "monthly_expenses": agent_inputs["monthly_expenses"],
+        },
+        "changes_since_last": changes_since_last,
+    }
@@ -0,0 +1,122 @@
+import math
+
+import numpy as np
+
+# Bits of precision of the generated points (supports up to 2**32 points)
+SOBOL_BITS = 32
+
+# Coefficients of Acklam's rational approximation of the inverse normal CDF; the
+# tails are refined with one Halley step, so the whole interval is accurate to ~1e-9
+_PPF_A = (
+    -3.969683028665376e01,
+    2.209460984245205e02,
+    -2.759285104469687e02,
+    1.383577518672690e02,
+    -3.066479806614716e01,
+    2.506628277459239e00,
+)
+_PPF_B = (
+    -5.447609879822406e01,
+    1.615858368580409e02,
+    -1.556989798598866e02,
+    6.680131188771972e01,
+    -1.328068155288572e01,
+)
+_PPF_C = (
+    -7.784894002430293e-03,
+    -3.223964580411365e-01,
+    -2.400758277161838e00,
+    -2.549671010422255e00,
+    4.374664141464968e00,
+    2.938163982698783e00,
+)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e00, 3.754408661907416e00)
+_PPF_TAIL = 0.02425
+
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def _reverse_bits(values: np.ndarray) -> np.ndarray:
+    """Reverse the 32 bits of each uint32 value."""
+    values = ((values >> 1) & 0x55555555) | ((values & 0x55555555) << 1)
+    values = ((values >> 2) & 0x33333333) | ((values & 0x33333333) << 2)
+    values = ((values >> 4) & 0x0F0F0F0F) | ((values & 0x0F0F0F0F) << 4)
+    values = ((values >> 8) & 0x00FF00FF) | ((values & 0x00FF00FF) << 8)
+    return (values >> 16) | (values << 16)
+
+
+def scrambled_sobol(num_points: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    First num_points of a scrambled one-dimensional Sobol sequence in (0, 1).
+
+    The first Sobol coordinate is the base-2 van der Corput sequence (the bit
+    reversal of the point index). It is randomized with a linear matrix scramble
+    and a random digital shift, as scipy.stats.qmc.Sobol does, so estimates are
+    unbiased and independent scrambles give an error estimate. Balance is best
+    when num_points is a power of two.
+    """
+    points = _reverse_bits(np.arange(num_points, dtype=np.uint32))
+
+    # Random lower-triangular binary matrix with unit diagonal, bits numbered from the
+    # most significant: output bit j is the parity of the input bits 0..j it selects
+    scrambled = np.zeros(num_points, dtype=np.uint32)
+    for j in range(SOBOL_BITS):
+        row = np.zeros(SOBOL_BITS, dtype=np.uint32)
+        row[:j] = rng.integers(0, 2, size=j)
+        row[j] = 1
+        mask = np.uint32(np.sum(row.astype(np.uint64) << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)))
+        parity = np.bitwise_count(points & mask) & 1
+        scrambled |= parity.astype(np.uint32) << np.uint32(SOBOL_BITS - 1 - j)
+
+    scrambled ^= np.uint32(rng.integers(0, 2**SOBOL_BITS, dtype=np.uint64))
+    return (scrambled.astype(np.float64) + 0.5) / 2.0**SOBOL_BITS
+
+
+def normal_cdf(values: np.ndarray) -> np.ndarray:
+    """
+    Standard normal CDF, elementwise.
+    """
+    return 0.5 * _erfc(-np.asarray(values, dtype=np.float64) / math.sqrt(2)).astype(np.float64)
+
+
+def normal_ppf(probabilities: np.ndarray) -> np.ndarray:
+    """
+    Inverse standard normal CDF, elementwise for probabilities in (0, 1).
+    """
+    p = np.asarray(probabilities, dtype=np.float64)
+    result = np.empty_like(p)
+
+    central = (p >= _PPF_TAIL) & (p <= 1 - _PPF_TAIL)
+    q = p[central] - 0.5
+    r = q * q
+    a, b = _PPF_A, _PPF_B
+    result[central] = (
+        (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5])
+        * q
+        / (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+    )
+
+    # Tails are symmetric: solve for the smaller of p and 1 - p, then set the sign
+    tail = ~central
+    tail_p = np.minimum(p[tail], 1 - p[tail])
+    q = np.sqrt(-2 * np.log(tail_p))
+    c, d = _PPF_C, _PPF_D
+    tail_values = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / (
+        (((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1
+    )
+    tail_values = np.where(p[tail] < 0.5, tail_values, -tail_values)
+
+    # One Halley step on the tails (a few percent of the points), using the exact CDF
+    errors = normal_cdf(tail_values) - p[tail]
+    steps = errors * math.sqrt(2 * math.pi) * np.exp(tail_values * tail_values / 2)
+    result[tail] = tail_values - steps / (1 + tail_values * steps / 2)
+
+    return result
+
+
+def sobol_normals(num_points: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Standard normal draws from a freshly scrambled Sobol sequence (inverse-normal transform).
+    """
+    return normal_ppf(scrambled_sobol(num_points, rng))
@@ -0,0 +1,153 @@
+from datetime import UTC, datetime
+
+# Scalar metrics tracked between reports, with the decimals they are compared at
+SCALAR_METRICS = {
+    "risk_score": 0,
+    "savings_ratio": 2,
+    "runway_months": 1,
+    "burn_rate": 0,
+    "monthly_income": 0,
+    "monthly_expenses": 0,
+}
+
+
+def extract_key_metrics(agent_inputs: dict, outputs: dict) -> dict:
+    """
+    Pick the numbers worth comparing between reports out of one pipeline run.
+
+    Args:
+        agent_inputs: Result of pipeline.prepare_agent_inputs
+        outputs: Agent results keyed by stage ('risk', 'goals', 'allocation', ...)
+
+    Returns:
+        Dict with the scalar metrics in SCALAR_METRICS, risk_label, per-goal
+        success probability/status keyed by goal id, the recommended allocation
+        and the as_of date
+    """
+    risk = outputs["risk"]
+    return {
+        "as_of": datetime.now(UTC).date().isoformat(),
+        "risk_score": risk["risk_score"],
+        "risk_label": risk["risk_label"],
+        "savings_ratio": risk["savings_ratio"],
+        # The no-transactions path reports infinite runway, which JSON cannot store
+        "runway_months": min(risk["runway_months"], 999.9),
+        "burn_rate": risk["burn_rate"],
+        "monthly_income": agent_inputs["monthly_income"],
+        "monthly_expenses": agent_inputs["monthly_expenses"],
+        "goals": {
+            str(goal["goal_id"]): {
+                "name": goal["goal_name"],
+                "success_probability": goal["success_probability"],
+                "status": goal["status"],
+            }
+            for goal in outputs["goals"]
+        },
+        "allocation": dict(outputs["allocation"]["recommended"]),
+    }
+
+
+def compute_report_delta(previous: dict | None, current: dict) -> dict | None:
+    """
+    Compact diff between two key-metric dicts (see extract_key_metrics).
+
+    Only values that changed at their comparison precision are included, so an
+    unchanged situation yields an empty dict.
+
+    Returns:
+        None if there is no previous report to compare with, otherwise a dict
+        with any of: previous_as_of, the changed scalar metrics and risk_label
+        as {from, to[, change]}, goals as {changed, added, removed}, and
+        allocation shifts per asset class
+    """
+    if previous is None:
+        return None
+
+    delta: dict = {}
+
+    for metric, decimals in SCALAR_METRICS.items():
+        change = _numeric_change(previous.get(metric), current.get(metric), decimals)
+        if change:
+            delta[metric] = change
+
+    if previous.get("risk_label") != current.get("risk_label"):
+        delta["risk_label"] = {"from": previous.get("risk_label"), "to": current.get("risk_label")}
+
+    goals_delta = _goals_delta(previous.get("goals", {}), current.get("goals", {}))
+    if goals_delta:
+        delta["goals"] = goals_delta
+
+    allocation_delta = {}
+    previous_allocation = previous.get("allocation", {})
+    for asset, weight in current.get("allocation", {}).items():
+        change = _numeric_change(previous_allocation.get(asset, 0.0), weight, 2)
+        if change:
+            allocation_delta[asset] = change
+    if allocation_delta:
+        delta["allocation"] = allocation_delta
+
+    if delta:
+        delta["previous_as_of"] = previous.get("as_of")
+    return delta
+
+
+def compute_previous_report_delta(previous_report: dict | None, current: dict) -> dict | None:
+    """
+    Delta against a stored report (see compute_report_delta).
+
+    Reports saved before key metrics were tracked have none to compare with;
+    for those the result is {"previous_as_of", "metrics_unavailable": True}, so
+    the narrator still knows a previous report exists rather than treating this
+    one as the first.
+
+    Args:
+        previous_report: The loaded previous report ('key_metrics', 'generated_at'), or None
+    """
+    if previous_report is None:
+        return None
+    if previous_report.get("key_metrics") is None:
+        generated_at = previous_report.get("generated_at")
+        return {
+            "previous_as_of": generated_at.date().isoformat() if generated_at else None,
+            "metrics_unavailable": True,
+        }
+    return compute_report_delta(previous_report["key_metrics"], current)
+
+
+def _goals_delta(previous_goals: dict, current_goals: dict) -> dict:
+    changed = []
+    for goal_id, goal in current_goals.items():
+        previous_goal = previous_goals.get(goal_id)
+        if previous_goal is None:
+            continue
+        entry = {}
+        probability = _numeric_change(previous_goal["success_probability"], goal["success_probability"], 2)
+        if probability:
+            entry["success_probability"] = probability
+        if previous_goal["status"] != goal["status"]:
+            entry["status"] = {"from": previous_goal["status"], "to": goal["status"]}
+        if entry:
+            changed.append({"name": goal["name"], **entry})
+
+    result = {}
+    if changed:
+        result["changed"] = changed
+    added = [goal["name"] for goal_id, goal in current_goals.items() if goal_id not in previous_goals]
+    if added:
+        result["added"] = added
+    removed = [goal["name"] for goal_id, goal in previous_goals.items() if goal_id not in current_goals]
+    if removed:
+        result["removed"] = removed
+    return result
+
+
+def _numeric_change(previous: float | None, current: float | None, decimals: int) -> dict | None:
+    if previous is None or current is None:
+        return None
+    previous = round(float(previous), decimals)
+    current = round(float(current), decimals)
+    if previous == current:
+        return None
+    if decimals == 0:
+        previous, current = int(previous), int(current)
+    return {"from": previous, "to": current, "change": round(current - previous, decimals)}
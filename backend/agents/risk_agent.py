@@ -1,10 +1,29 @@
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 
+import numpy as np
+
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Amounts are stored as Numeric(18, 4), so risk totals are kept as integers in
+# 1/10,000ths of a currency unit: sums are exact without Decimal arithmetic
+AMOUNT_SCALE = 4
+MINOR_UNITS = 10**AMOUNT_SCALE
+
+
+def to_minor_units(amount: Decimal | float | int) -> int:
+    """
+    Convert an amount to integer minor units (see AMOUNT_SCALE).
+
+    Decimals convert exactly; floats are rounded to the nearest minor unit,
+    which is exact for any amount the database can store.
+    """
+    if isinstance(amount, Decimal):
+        return int(amount.scaleb(AMOUNT_SCALE).to_integral_value())
+    return round(float(amount) * MINOR_UNITS)
+
 
 def compute_risk_metrics(
     transactions: list[dict],
@@ -25,56 +44,120 @@ def compute_risk_metrics(
         Dict with burn_rate, runway_months, stability_ratio, savings_ratio, risk_score, risk_label
     """
 
-    if not transactions:
-        total_liquid = sum(Decimal(str(acc.get("balance", 0))) for acc in liquid_accounts)
+    cutoff_date = datetime.now(UTC).date() - timedelta(days=60)
+    recent_transactions = [tx for tx in transactions if tx.get("date") and tx["date"] >= cutoff_date]
+
+    # One vectorized pass over the window's amounts, in int64 minor units
+    amounts = np.array([tx.get("amount", 0) for tx in recent_transactions], dtype=np.float64)
+    is_debit = np.array([tx.get("type") == "debit" for tx in recent_transactions], dtype=bool)
+    total_debits = int(np.rint(amounts[is_debit] * MINOR_UNITS).astype(np.int64).sum())
+
+    days_in_period = min(60, (datetime.now(UTC).date() - cutoff_date).days)
+    if days_in_period == 0:
+        days_in_period = 30
+
+    return compute_risk_metrics_from_minor_units(
+        total_debits,
+        len(transactions),
+        sum(to_minor_units(acc.get("balance", 0)) for acc in liquid_accounts),
+        monthly_income=to_minor_units(monthly_income),
+        days_in_period=days_in_period,
+    )
+
+
+def compute_risk_metrics_from_totals(
+    total_debits: Decimal,
+    transaction_count: int,
+    liquid_accounts: list[dict],
+    base_currency: str,
+    monthly_income: float = 0.0,
+    days_in_period: int = 60,
+) -> dict:
+    """
+    Compute risk metrics from pre-aggregated cashflow totals.
+
+    Same metrics as compute_risk_metrics, for callers that sum debits in the
+    database instead of passing individual transactions. Converts the totals to
+    minor units and delegates to compute_risk_metrics_from_minor_units.
+
+    Args:
+        total_debits: Sum of debit amounts over the last days_in_period days
+        transaction_count: Number of transactions in that window
+        liquid_accounts: List of account dicts with 'balance' (in base currency)
+        base_currency: User's base currency
+        monthly_income: User's average monthly income
+        days_in_period: Length of the window total_debits covers
+
+    Returns:
+        Dict with burn_rate, runway_months, stability_ratio, savings_ratio, risk_score, risk_label
+    """
+
+    return compute_risk_metrics_from_minor_units(
+        to_minor_units(total_debits),
+        transaction_count,
+        sum(to_minor_units(acc.get("balance", 0)) for acc in liquid_accounts),
+        monthly_income=to_minor_units(monthly_income),
+        days_in_period=days_in_period,
+    )
+
+
+def compute_risk_metrics_from_minor_units(
+    total_debits: int,
+    transaction_count: int,
+    liquid_balance: int,
+    monthly_income: int = 0,
+    days_in_period: int = 60,
+) -> dict:
+    """
+    Compute risk metrics from totals in integer minor units (see to_minor_units).
+
+    Every ratio is a quotient of exact integer products, and Python's int / int
+    is correctly rounded, so each result is the exact ratio rounded once to a
+    float, without any Decimal or string conversions.
+
+    Args:
+        total_debits: Sum of debit amounts over the last days_in_period days
+        transaction_count: Number of transactions in that window
+        liquid_balance: Sum of liquid account balances (in base currency)
+        monthly_income: User's average monthly income
+        days_in_period: Length of the window total_debits covers
+
+    Returns:
+        Dict with burn_rate, runway_months, stability_ratio, savings_ratio, risk_score, risk_label
+    """
+
+    if not transaction_count:
         stability_ratio = 2.0 if monthly_income > 0 else 1.0
         savings_ratio = 1.0 if monthly_income > 0 else 0.0
         return {
             "burn_rate": 0.0,
-            "runway_months": float("inf") if total_liquid > 0 else 0.0,
+            "runway_months": float("inf") if liquid_balance > 0 else 0.0,
             "stability_ratio": stability_ratio,
             "savings_ratio": savings_ratio,
             "risk_score": 70,
             "risk_label": "Low",
         }
 
-    cutoff_date = datetime.now(UTC).date() - timedelta(days=60)
-    recent_transactions = [tx for tx in transactions if tx.get("date") and tx["date"] >= cutoff_date]
-
-    total_debits = Decimal("0")
-    total_credits = Decimal("0")
-
-    for tx in recent_transactions:
-        amount = Decimal(str(tx.get("amount", 0)))
-        if tx.get("type") == "debit":
-            total_debits += amount
-        elif tx.get("type") == "credit":
-            total_credits += amount
-
-    days_in_period = min(60, (datetime.now(UTC).date() - cutoff_date).days)
-    if days_in_period == 0:
-        days_in_period = 30
-
-    monthly_debits = (total_debits / Decimal(str(days_in_period))) * Decimal("30")
-    burn_rate = float(monthly_debits)
+    # Monthly debits scaled to 30 days, kept as the exact fraction monthly_debits / days_in_period
+    monthly_debits = total_debits * 30
+    burn_rate = monthly_debits / (days_in_period * MINOR_UNITS)
 
-    total_liquid = sum(Decimal(str(acc.get("balance", 0))) for acc in liquid_accounts)
-
-    if burn_rate > 0:
-        runway_months = float(total_liquid / Decimal(str(burn_rate)))
+    if monthly_debits > 0:
+        runway_months = liquid_balance * days_in_period / monthly_debits
     else:
         # Cap at 999 months instead of infinity to prevent JSON serialization issues
-        runway_months = 999.9 if total_liquid > 0 else 0.0
+        runway_months = 999.9 if liquid_balance > 0 else 0.0
 
     # Calculate stability ratio: income / expenses
-    if burn_rate > 0:
-        stability_ratio = float(Decimal(str(monthly_income)) / Decimal(str(burn_rate)))
+    if monthly_debits > 0:
+        stability_ratio = monthly_income * days_in_period / monthly_debits
     else:
         stability_ratio = 2.0 if monthly_income > 0 else 1.0
 
     # Calculate savings ratio: (income - expenses) / income
     if monthly_income > 0:
-        savings_ratio = float((Decimal(str(monthly_income)) - Decimal(str(burn_rate))) / Decimal(str(monthly_income)))
+        period_income = monthly_income * days_in_period
+        savings_ratio = (period_income - monthly_debits) / period_income
         savings_ratio = max(0.0, min(1.0, savings_ratio))  # Clamp to [0, 1]
     else:
         savings_ratio = 0.0
@@ -110,3 +193,106 @@ def compute_risk_metrics(
         "risk_score": risk_score,
         "risk_label": risk_label,
     }
+
+
+def compute_risk_metrics_batch(
+    user_index: np.ndarray,
+    amounts: np.ndarray,
+    types: np.ndarray,
+    dates: np.ndarray,
+    liquid_balances: np.ndarray,
+    monthly_incomes: np.ndarray,
+) -> list[dict]:
+    """
+    Compute risk metrics for many users at once from columnar transaction arrays.
+
+    Same numbers as compute_risk_metrics called per user: transactions are
+    grouped by user with NumPy reductions in int64 minor units, and every ratio
+    is a single float64 division of exactly represented integers (true for
+    totals below 2**53 minor units, ~900 billion currency units), so it rounds
+    like the scalar int / int. Only building the result dicts loops over users.
+
+    Args:
+        user_index: Owning user of each transaction, as an index into the per-user arrays
+        amounts: Amount of each transaction
+        types: Type of each transaction ('debit' / 'credit')
+        dates: Date of each transaction (datetime64[D] or date objects; NaT is skipped)
+        liquid_balances: Sum of each user's liquid account balances (in base currency)
+        monthly_incomes: Each user's average monthly income
+
+    Returns:
+        One dict per user (same order as liquid_balances), as compute_risk_metrics returns
+    """
+    num_users = len(liquid_balances)
+    user_index = np.asarray(user_index, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+
+    days_in_period = 60
+    cutoff_date = np.datetime64(datetime.now(UTC).date() - timedelta(days=days_in_period), "D")
+    is_window_debit = (np.asarray(types) == "debit") & (dates >= cutoff_date)
+
+    # Group-by sums: exact int64 totals per user, plus each user's transaction count
+    total_debits = np.zeros(num_users, dtype=np.int64)
+    np.add.at(
+        total_debits,
+        user_index[is_window_debit],
+        np.rint(amounts[is_window_debit] * MINOR_UNITS).astype(np.int64),
+    )
+    transaction_counts = np.bincount(user_index, minlength=num_users)
+    liquid_balance = np.rint(np.asarray(liquid_balances, dtype=np.float64) * MINOR_UNITS).astype(np.int64)
+    monthly_income = np.rint(np.asarray(monthly_incomes, dtype=np.float64) * MINOR_UNITS).astype(np.int64)
+
+    # The scalar computation on whole columns (float64 operands are the exact integers)
+    monthly_debits = (total_debits * 30).astype(np.float64)
+    period_income = (monthly_income * days_in_period).astype(np.float64)
+    has_debits = monthly_debits > 0
+    has_income = monthly_income > 0
+    has_liquid = liquid_balance > 0
+    safe_debits = np.where(has_debits, monthly_debits, 1.0)
+    safe_income = np.where(has_income, period_income, 1.0)
+
+    burn_rate = monthly_debits / float(days_in_period * MINOR_UNITS)
+    runway_months = np.where(
+        has_debits,
+        (liquid_balance * days_in_period).astype(np.float64) / safe_debits,
+        np.where(has_liquid, 999.9, 0.0),
+    )
+    stability_ratio = np.where(has_debits, period_income / safe_debits, np.where(has_income, 2.0, 1.0))
+    savings_ratio = np.where(has_income, np.clip((period_income - monthly_debits) / safe_income, 0.0, 1.0), 0.0)
+
+    runway_normalized = np.clip((np.minimum(runway_months, 12.0) - 0.0) / (12.0 - 0.0), 0.0, 1.0)
+    stability_normalized = np.clip((stability_ratio - 0.5) / (2.0 - 0.5), 0.0, 1.0)
+    risk_scores = np.clip(
+        np.trunc(40 * runway_normalized + 30 * stability_normalized + 30 * savings_ratio), 0, 100
+    ).astype(np.int64)
+
+    results = []
+    for user in range(num_users):
+        if not transaction_counts[user]:
+            results.append(
+                {
+                    "burn_rate": 0.0,
+                    "runway_months": float("inf") if has_liquid[user] else 0.0,
+                    "stability_ratio": 2.0 if has_income[user] else 1.0,
+                    "savings_ratio": 1.0 if has_income[user] else 0.0,
+                    "risk_score": 70,
+                    "risk_label": "Low",
+                }
+            )
+            continue
+
+        risk_score = int(risk_scores[user])
+        results.append(
+            {
+                "burn_rate": float(burn_rate[user]),
+                "runway_months": min(float(runway_months[user]), 999.9),
+                # Python's round, not np.round, so halves round exactly as in the scalar version
+                "stability_ratio": round(float(stability_ratio[user]), 2),
+                "savings_ratio": round(float(savings_ratio[user]), 2),
+                "risk_score": risk_score,
+                "risk_label": "Low" if risk_score >= 70 else "Moderate" if risk_score >= 40 else "High",
+            }
+        )
+
+    return results
@@ -1,7 +1,58 @@
 import random
-
+from functools import lru_cache
+
+import numpy as np
+
+from agents.market_model import (
+    DEBT_RETURN,
+    NO_SHOCK,
+    REGIMES,
+    SHOCKS,
+    simulate_market_returns,
+    simulate_regimes,
+    simulate_shocks,
+)
 from agents.state_encoder import clamp, encode_state
 
+# Growth-factor tables cover goal horizons up to this many months (20 years)
+GROWTH_TABLE_MONTHS = 240
+
+# Feasibility buckets for projections short of the target: (minimum ratio, probability)
+SHORTFALL_BUCKETS = ((0.9, 0.65), (0.75, 0.50), (0.5, 0.30))
+SHORTFALL_FLOOR = 0.15
+
+
+@lru_cache
+def _growth_tables(expected_annual_return: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (1+r)^m and the annuity factor ((1+r)^m - 1) / r for m = 0..GROWTH_TABLE_MONTHS.
+
+    Non-positive rates get the no-compounding projection used by
+    calculate_goal_feasibility: growth 1 and annuity m.
+    """
+    months = np.arange(GROWTH_TABLE_MONTHS + 1, dtype=np.float64)
+    monthly_rate = expected_annual_return / 12.0
+    if monthly_rate > 0:
+        growth = np.power(1 + monthly_rate, months)
+        return growth, (growth - 1) / monthly_rate
+    return np.ones_like(months), months
+
+
+@lru_cache
+def _growth_table_lists(expected_annual_return: float) -> tuple[list[float], list[float]]:
+    # Plain floats: indexing a list is cheaper than a numpy scalar in the per-step scalar path
+    growth, annuity = _growth_tables(expected_annual_return)
+    return growth.tolist(), annuity.tolist()
+
+
+def _projection_factors(months_remaining: float, expected_annual_return: float) -> tuple[float, float]:
+    """Growth and annuity factors computed directly, for horizons the tables do not cover."""
+    monthly_rate = expected_annual_return / 12.0
+    if monthly_rate > 0:
+        growth_factor = (1 + monthly_rate) ** months_remaining
+        return growth_factor, (growth_factor - 1) / monthly_rate
+    return 1.0, float(months_remaining)
+
 
 def calculate_goal_feasibility(
     current_balance: float,
@@ -13,7 +64,8 @@ def calculate_goal_feasibility(
     """
     Calculate goal success probability using deterministic future value projection.
     This is a lightweight version of the Monte Carlo approach in goal_agent.py,
-    suitable for RL training.
+    suitable for RL training. Growth factors come from a precomputed per-month
+    table, so an env step does no exponentiation.
 
     Returns:
         Success probability estimate in [0, 1]
@@ -21,28 +73,66 @@ def calculate_goal_feasibility(
     if months_remaining <= 0 or goal_target <= 0:
         return 1.0 if current_balance >= goal_target else 0.0
 
-    monthly_rate = expected_annual_return / 12.0
-
-    if monthly_rate > 0:
-        future_value_savings = current_balance * ((1 + monthly_rate) ** months_remaining)
-        future_value_contributions = monthly_savings * (((1 + monthly_rate) ** months_remaining - 1) / monthly_rate)
-        projected_value = future_value_savings + future_value_contributions
+    if type(months_remaining) is int and months_remaining <= GROWTH_TABLE_MONTHS:
+        growth, annuity = _growth_table_lists(expected_annual_return)
+        growth_factor, annuity_factor = growth[months_remaining], annuity[months_remaining]
     else:
-        projected_value = current_balance + (monthly_savings * months_remaining)
+        growth_factor, annuity_factor = _projection_factors(months_remaining, expected_annual_return)
+    projected_value = current_balance * growth_factor + monthly_savings * annuity_factor
 
+    ratio = projected_value / goal_target
     if projected_value >= goal_target:
-        ratio = projected_value / goal_target
         return min(1.0, 0.75 + (ratio - 1.0) * 0.1)
-    else:
-        ratio = projected_value / goal_target
-        if ratio >= 0.9:
-            return 0.65
-        elif ratio >= 0.75:
-            return 0.50
-        elif ratio >= 0.5:
-            return 0.30
+    for min_ratio, probability in SHORTFALL_BUCKETS:
+        if ratio >= min_ratio:
+            return probability
+    return SHORTFALL_FLOOR
+
+
+def calculate_goal_feasibility_batch(
+    current_balance: np.ndarray,
+    monthly_savings: np.ndarray,
+    goal_target: np.ndarray,
+    months_remaining: np.ndarray,
+    expected_annual_return: float = 0.07,
+) -> np.ndarray:
+    """
+    Vectorized calculate_goal_feasibility over arrays (e.g. a batch of environments).
+
+    Arguments broadcast against each other; months_remaining are whole months.
+    """
+    current_balance, monthly_savings, goal_target = (
+        np.asarray(values, dtype=np.float64) for values in (current_balance, monthly_savings, goal_target)
+    )
+    months_remaining = np.asarray(months_remaining, dtype=np.int64)
+
+    growth_table, annuity_table = _growth_tables(expected_annual_return)
+    table_months = np.clip(months_remaining, 0, GROWTH_TABLE_MONTHS)
+    growth_factor = growth_table[table_months]
+    annuity_factor = annuity_table[table_months]
+
+    # Horizons past the table are rare: compute those directly
+    beyond = months_remaining > GROWTH_TABLE_MONTHS
+    if beyond.any():
+        monthly_rate = expected_annual_return / 12.0
+        if monthly_rate > 0:
+            growth_factor = np.where(beyond, np.power(1 + monthly_rate, months_remaining), growth_factor)
+            annuity_factor = np.where(beyond, (growth_factor - 1) / monthly_rate, annuity_factor)
         else:
-            return 0.15
+            annuity_factor = np.where(beyond, months_remaining, annuity_factor)
+
+    projected_value = current_balance * growth_factor + monthly_savings * annuity_factor
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = projected_value / goal_target
+
+    probability = np.select(
+        [projected_value >= goal_target] + [ratio >= min_ratio for min_ratio, _ in SHORTFALL_BUCKETS],
+        [np.minimum(1.0, 0.75 + (ratio - 1.0) * 0.1)] + [probability for _, probability in SHORTFALL_BUCKETS],
+        default=SHORTFALL_FLOOR,
+    )
+
+    finished = (months_remaining <= 0) | (goal_target <= 0)
+    return np.where(finished, (current_balance >= goal_target).astype(np.float64), probability)
 
 
 class FinancialEnv:
@@ -50,7 +140,7 @@ class FinancialEnv:
     A gym-like financial simulation environment
     """
 
-    def __init__(self, initial_state: dict) -> None:
+    def __init__(self, initial_state: dict, rng: np.random.Generator | None = None) -> None:
         """
         initial_state must contain:
         balance
@@ -59,19 +149,34 @@ class FinancialEnv:
         equity_ratio
         goal_target
         goal_months_remaining
+
+        rng drives the market model; by default it is seeded from the random
+        module, so random.seed() still makes training runs reproducible.
         """
 
         self.initial_state = initial_state
         self.max_months = random.randint(60, 120)  # 5 - 10 years
         self.month = 0
+        self.rng = rng or np.random.default_rng(random.getrandbits(64))
 
         # Market regime: normal, bull, bear, recession
         self.market_regime = "normal"
-        self.months_in_regime = 0
-        self.regime_duration = random.randint(12, 36)
+        self._draw_market()
 
         self._load_initial_state()
 
+    def _draw_market(self):
+        """
+        Draw the episode's regimes, equity returns and shocks from the shared market
+        model (agents.market_model), which the goal agent's "regime" simulation uses too.
+        """
+        self.regimes = simulate_regimes(1, self.max_months, self.rng)
+        self.equity_returns = simulate_market_returns(self.regimes, self.rng)[0][0]
+        self.shock_kinds, self.shock_multipliers = (
+            values[0] for values in simulate_shocks(1, self.max_months, self.rng)
+        )
+        self.regimes = self.regimes[0]
+
     def _load_initial_state(self):
         self.balance = self.initial_state["balance"]
         self.monthly_income = self.initial_state["monthly_income"]
@@ -91,10 +196,22 @@ class FinancialEnv:
         Reset simulation and return initial state vector
         """
         self.month = 0
+        self.market_regime = "normal"
+        self._draw_market()
         self._load_initial_state()
         return self._get_state_vector()
 
-    def _get_state_vector(self) -> list[float]:
+    def _goal_success_probability(self) -> float:
+        monthly_savings = self.monthly_income * self.savings_rate
+        return calculate_goal_feasibility(
+            current_balance=self.balance,
+            monthly_savings=monthly_savings,
+            goal_target=self.goal_target,
+            months_remaining=self.goal_months_remaining,
+            expected_annual_return=0.07,
+        )
+
+    def _get_state_vector(self, success_probability: float | None = None) -> list[float]:
         runway_months = self.balance / self.monthly_expenses if self.monthly_expenses > 0 else 12
         stability = self.monthly_income / self.monthly_expenses if self.monthly_expenses > 0 else 2.0
 
@@ -113,14 +230,8 @@ class FinancialEnv:
             "risk_score": risk_score,
         }
 
-        monthly_savings = self.monthly_income * self.savings_rate
-        success_probability = calculate_goal_feasibility(
-            current_balance=self.balance,
-            monthly_savings=monthly_savings,
-            goal_target=self.goal_target,
-            months_remaining=self.goal_months_remaining,
-            expected_annual_return=0.07,
-        )
+        if success_probability is None:
+            success_probability = self._goal_success_probability()
 
         goal_evaluations = [
             {
@@ -141,7 +252,13 @@ class FinancialEnv:
         """
         Takes an action and simulates one month.
         Returns (new_state, reward, done)
+
+        The episode's market is drawn up front for max_months, so stepping
+        after done raises RuntimeError; call reset() to start a new episode.
         """
+        if self.month >= self.max_months:
+            raise RuntimeError("episode finished; call reset()")
+
         previous_balance = self.balance
 
         self._apply_action(action)
@@ -167,11 +284,13 @@ class FinancialEnv:
         self.month += 1
         self.goal_months_remaining = max(0, self.goal_months_remaining - 1)
 
-        reward = self._calculate_reward(previous_balance)
+        # The reward and the next state see the same post-step state: evaluate the goal once
+        success_probability = self._goal_success_probability()
+        reward = self._calculate_reward(previous_balance, success_probability)
 
         done = self.month >= self.max_months
 
-        return self._get_state_vector(), reward, done
+        return self._get_state_vector(success_probability), reward, done
 
     def _apply_action(self, action: int):
         """
@@ -197,75 +316,39 @@ class FinancialEnv:
             self.equity_ratio = clamp(self.equity_ratio - 0.10, 0.1, 0.8)
 
     def _update_market_regime(self):
-        """Update market regime periodically to simulate economic cycles"""
-        self.months_in_regime += 1
-
-        if self.months_in_regime >= self.regime_duration:
-            # Transition to new regime
-            regimes = ["normal", "bull", "bear", "recession"]
-            # Weighted transition probabilities
-            if self.market_regime == "normal":
-                self.market_regime = random.choices(regimes, weights=[0.5, 0.3, 0.15, 0.05])[0]
-            elif self.market_regime == "bull":
-                self.market_regime = random.choices(regimes, weights=[0.5, 0.2, 0.2, 0.1])[0]
-            elif self.market_regime == "bear":
-                self.market_regime = random.choices(regimes, weights=[0.5, 0.1, 0.3, 0.1])[0]
-            else:  # recession
-                self.market_regime = random.choices(regimes, weights=[0.6, 0.1, 0.2, 0.1])[0]
-
-            self.months_in_regime = 0
-            self.regime_duration = random.randint(12, 36)
+        """Move to this month's market regime to simulate economic cycles"""
+        self.market_regime = REGIMES[self.regimes[self.month]]
 
     def _get_market_returns(self) -> tuple[float, float]:
         """Get market returns based on current regime"""
-        regime_params = {
-            "normal": {"equity_mean": 0.07 / 12, "equity_std": 0.15 / 12, "debt": 0.04 / 12},
-            "bull": {"equity_mean": 0.12 / 12, "equity_std": 0.12 / 12, "debt": 0.035 / 12},
-            "bear": {"equity_mean": -0.05 / 12, "equity_std": 0.20 / 12, "debt": 0.045 / 12},
-            "recession": {"equity_mean": -0.15 / 12, "equity_std": 0.25 / 12, "debt": 0.03 / 12},
-        }
-
-        params = regime_params[self.market_regime]
-        monthly_equity_return = random.gauss(params["equity_mean"], params["equity_std"])
-        monthly_debt_return = params["debt"]
+        monthly_equity_return = float(self.equity_returns[self.month])
+        monthly_debt_return = float(DEBT_RETURN[self.regimes[self.month]])
 
         return monthly_equity_return, monthly_debt_return
 
     def _apply_shocks(self):
         """Apply occasional income or expense shocks"""
-        # 5% chance of income shock each month
-        if random.random() < 0.05:
-            shock_type = random.choice(["income_boost", "income_loss", "expense_spike"])
-
-            if shock_type == "income_boost":
-                # Bonus or raise: 10-30% increase for this month
-                self.monthly_income *= random.uniform(1.1, 1.3)
-            elif shock_type == "income_loss":
-                # Temporary income reduction: 20-40% decrease
-                self.monthly_income *= random.uniform(0.6, 0.8)
-            elif shock_type == "expense_spike":
-                # Unexpected expense: 20-50% increase
-                self.monthly_expenses *= random.uniform(1.2, 1.5)
+        kind = self.shock_kinds[self.month]
+        if kind != NO_SHOCK:
+            shock_type = SHOCKS[kind - 1]
+            multiplier = float(self.shock_multipliers[self.month])
+
+            if shock_type == "expense_spike":
+                self.monthly_expenses *= multiplier
+            else:
+                # Bonus/raise or temporary income reduction
+                self.monthly_income *= multiplier
 
             # Update savings rate based on new income/expenses
             if self.monthly_income > 0:
                 self.savings_rate = clamp((self.monthly_income - self.monthly_expenses) / self.monthly_income, 0.0, 0.9)
 
-    def _calculate_reward(self, previous_balance: float) -> float:
+    def _calculate_reward(self, previous_balance: float, success_probability: float) -> float:
         net_worth_change = self.balance - previous_balance
 
         runway = self.balance / self.monthly_expenses if self.monthly_expenses > 0 else 0
 
         # Use paper-faithful goal feasibility
-        monthly_savings = self.monthly_income * self.savings_rate
-        success_probability = calculate_goal_feasibility(
-            current_balance=self.balance,
-            monthly_savings=monthly_savings,
-            goal_target=self.goal_target,
-            months_remaining=self.goal_months_remaining,
-            expected_annual_return=0.07,
-        )
-
         goal_on_track = success_probability >= 0.75
 
         reward = 0.01 * net_worth_change - (2 if runway < 3 else 0) + (5 if goal_on_track else -3)
@@ -74,3 +74,28 @@ class StrategyAgent:
             action_idx = heuristic_strategy(state)
 
         return ACTION_MAP[action_idx]
+
+    def get_strategies(
+        self,
+        risk_metrics: list[dict],
+        goal_evaluations: list[list[dict]],
+        allocations: list[dict],
+        savings_rates: list[float],
+    ) -> list[dict]:
+        """
+        Strategies for many states at once: one (N x 5) forward pass through the DQN.
+        """
+        states = [
+            encode_state(risk, goals, allocation, savings_rate)
+            for risk, goals, allocation, savings_rate in zip(
+                risk_metrics, goal_evaluations, allocations, savings_rates, strict=True
+            )
+        ]
+
+        if self.dqn:
+            q_values = self.dqn.network(Tensor(states).reshape(len(states), 5))
+            action_indices = [int(index) for index in q_values.numpy().argmax(axis=1)]
+        else:
+            action_indices = [heuristic_strategy(state) for state in states]
+
+        return [ACTION_MAP[action_idx] for action_idx in action_indices]
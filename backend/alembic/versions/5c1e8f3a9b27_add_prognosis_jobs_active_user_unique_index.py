@@ -0,0 +1,52 @@
+"""add prognosis jobs active user unique index
+
+Revision ID: 5c1e8f3a9b27
+Revises: 7417ea452435
+Create Date: 2026-10-17 10:12:48.531906
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e8f3a9b27"
+down_revision: str | Sequence[str] | None = "7417ea452435"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Racy enqueues may have left several active jobs for one user; keep the
+    # newest and fail the others before enforcing uniqueness
+    op.execute(
+        """
+        UPDATE prognosis_jobs AS j
+        SET status = 'FAILED', error = 'Superseded by a newer job', finished_at = now()
+        FROM prognosis_jobs AS k
+        WHERE j.user_id = k.user_id
+          AND j.status IN ('QUEUED', 'RUNNING')
+          AND k.status IN ('QUEUED', 'RUNNING')
+          AND (j.created_at, j.id::text) < (k.created_at, k.id::text)
+        """
+    )
+    op.create_index(
+        "uq_prognosis_jobs_user_id_active",
+        "prognosis_jobs",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "uq_prognosis_jobs_user_id_active",
+        table_name="prognosis_jobs",
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+    )
@@ -0,0 +1,49 @@
+"""add prognosis usage user date unique constraint
+
+Revision ID: eda868d61c24
+Revises: 43830d174a09
+Create Date: 2026-10-16 21:11:06.955728
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "eda868d61c24"
+down_revision: str | Sequence[str] | None = "43830d174a09"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Racy read-modify-writes may have created several rows for one user and day;
+    # fold their counts into one row before enforcing uniqueness
+    op.execute(
+        """
+        UPDATE prognosis_usage AS u
+        SET count = d.total
+        FROM (
+            SELECT max(id::text) AS keep_id, sum(count) AS total
+            FROM prognosis_usage
+            GROUP BY user_id, date
+            HAVING count(*) > 1
+        ) AS d
+        WHERE u.id::text = d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM prognosis_usage AS u
+        USING prognosis_usage AS k
+        WHERE u.user_id = k.user_id AND u.date = k.date AND u.id::text < k.id::text
+        """
+    )
+    op.create_unique_constraint("uq_prognosis_usage_user_id_date", "prognosis_usage", ["user_id", "date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_prognosis_usage_user_id_date", "prognosis_usage", type_="unique")
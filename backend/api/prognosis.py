@@ -1,25 +1,45 @@
+import json
+
 from fastapi import APIRouter, Request, status
+from fastapi.responses import StreamingResponse
 
 from api.deps import CurrentUserDep, DbDep
 from core.rate_limiter import READ_LIMIT, limiter
-from schemas.prognosis import PrognosisReportOut
-from services import prognosis_service
+from schemas.prognosis import PrognosisJobOut, PrognosisReportOut, WhatIfOut, WhatIfRequest
+from services import prognosis_job_service, prognosis_service
 
 router = APIRouter(prefix="/api/prognosis", tags=["prognosis"])
 
 
-@router.post("/refresh", response_model=PrognosisReportOut, status_code=status.HTTP_201_CREATED)
+@router.post("/refresh", response_model=PrognosisJobOut, status_code=status.HTTP_202_ACCEPTED)
 @limiter.limit(READ_LIMIT)
 async def refresh_prognosis(
     request: Request,
     db: DbDep,
     current_user: CurrentUserDep,
-) -> PrognosisReportOut:
+) -> PrognosisJobOut:
     """
-    Generate a new prognosis report for the current user.
+    Queue generation of a new prognosis report for the current user.
+
+    Returns the job immediately; poll GET /api/prognosis/jobs/{job_id} for progress.
     """
-    result = await prognosis_service.generate_prognosis(db, current_user.user_id)
-    return result
+    job = await prognosis_job_service.enqueue_job(db, current_user.user_id)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=PrognosisJobOut)
+@limiter.limit(READ_LIMIT)
+async def get_prognosis_job(
+    request: Request,
+    job_id: str,
+    db: DbDep,
+    current_user: CurrentUserDep,
+) -> PrognosisJobOut:
+    """
+    Get the status and per-stage progress of a prognosis job.
+    """
+    job = await prognosis_job_service.get_job(db, job_id, current_user.user_id)
+    return job
 
 
 @router.get("/current", response_model=PrognosisReportOut | None)
@@ -34,3 +54,47 @@ async def get_current_prognosis(
     """
     result = await prognosis_service.get_cached_report(db, current_user.user_id)
     return result
+
+
+@router.post("/what-if", response_model=WhatIfOut)
+@limiter.limit(READ_LIMIT)
+async def what_if_prognosis(
+    request: Request,
+    payload: WhatIfRequest,
+    db: DbDep,
+    current_user: CurrentUserDep,
+) -> WhatIfOut:
+    """
+    Compare the current situation with up to MAX_WHAT_IF_VARIANTS what-if variants.
+
+    Returns one row per scenario (the current one first) with risk, goal and
+    allocation figures; the agents run once per variant, without a narrative.
+    """
+    result = await prognosis_service.run_what_if(
+        db, current_user.user_id, [variant.model_dump(mode="json") for variant in payload.variants]
+    )
+    return result
+
+
+@router.get("/stream")
+@limiter.limit(READ_LIMIT)
+async def stream_prognosis(
+    request: Request,
+    current_user: CurrentUserDep,
+) -> StreamingResponse:
+    """
+    Generate a new prognosis report, streamed as Server-Sent Events.
+
+    Emits 'risk', 'goals', 'allocation' and 'strategy' as each agent finishes,
+    one 'narrative' event per report section, then 'report' (or 'error').
+    """
+
+    async def event_stream():
+        async for event, data in prognosis_service.stream_prognosis(current_user.user_id):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
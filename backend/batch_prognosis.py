@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Nightly batch precompute of prognosis reports for every user with a profile.
+
+User ids are paged from the database in id order and sharded in chunks across
+a process pool. Each worker process loads the strategy model once and reuses
+the macro state computed once by the parent. For every chunk it loads all
+inputs in one query, converts them to base currency (one rate table per base
+currency), simulates all goals in one vectorized pass, runs the remaining
+agents, and upserts the chunk's reports in one statement. Users whose input
+fingerprint matches their stored report are skipped, unless this run uses the
+LLM and the stored narrative is the template fallback. Template reports record
+their narrative source, so online refreshes with the LLM configured regenerate
+them instead of returning them.
+
+Progress is checkpointed to a state file after every chunk; --resume continues
+after the last contiguous completed chunk.
+
+Usage:
+    cd backend
+    python batch_prognosis.py --workers 4 --chunk-size 200
+    python batch_prognosis.py --resume
+    python batch_prognosis.py --llm   # narrative via the LLM instead of the template report
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy import select
+
+from agents.goal_agent import evaluate_goals_batch
+from agents.model_registry import model_registry
+from agents.pipeline import (
+    GOAL_EXPECTED_RETURN,
+    build_narrator_input,
+    goal_simulation_seed,
+    prepare_agent_inputs,
+    run_agent_pipeline,
+)
+from agents.report_delta import compute_previous_report_delta, extract_key_metrics
+from core.config import BASE_DIR, settings
+from core.logging import get_logger, setup_logging
+from db import SessionLocal, engine
+from integrations.llm_client import generate_prognosis_report
+from integrations.market_client import get_macro_state
+from models import Profile
+from services.prognosis_service import (
+    build_inputs_snapshot,
+    compute_inputs_fingerprint,
+    convert_bundles_to_base,
+    is_reusable_report,
+    load_prognosis_inputs_bulk,
+    save_reports,
+)
+
+logger = get_logger("batch_prognosis")
+
+DEFAULT_STATE_FILE = BASE_DIR / ".batch_prognosis_state.json"
+
+# ── Worker process ────────────────────────────────────────────────────────────
+
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_worker_macro_state = "sideways"
+_worker_use_llm = False
+
+
+def _init_worker(macro_state: str, use_llm: bool) -> None:
+    """
+    Per-process setup: one event loop, one loaded model, one macro state.
+    """
+    global _worker_loop, _worker_macro_state, _worker_use_llm
+
+    setup_logging()
+    _worker_loop = asyncio.new_event_loop()
+    _worker_macro_state = macro_state
+    _worker_use_llm = use_llm
+    model_registry.load(settings.model_path)
+
+
+def process_chunk(user_ids: list[str]) -> dict:
+    """
+    Generate and save reports for a chunk of users. Runs in a worker process.
+    """
+    return _worker_loop.run_until_complete(_process_chunk(user_ids))
+
+
+async def _process_chunk(user_ids: list[str]) -> dict:
+    generated = skipped = failed = 0
+
+    async with SessionLocal() as db:
+        bundles = await convert_bundles_to_base(db, await load_prognosis_inputs_bulk(db, user_ids))
+        reports = []
+
+        pending = []  # (user_id, inputs, fingerprint, agent_inputs)
+        for user_id, inputs in bundles.items():
+            if not inputs["profile"]:
+                skipped += 1
+                continue
+
+            fingerprint = compute_inputs_fingerprint(inputs, _worker_macro_state, model_registry.version)
+            if is_reusable_report(inputs["previous_report"], fingerprint, use_llm=_worker_use_llm):
+                skipped += 1
+                continue
+
+            try:
+                pending.append((user_id, inputs, fingerprint, prepare_agent_inputs(inputs)))
+            except Exception as e:
+                logger.error(f"Batch prognosis failed for user {user_id}: {e}")
+                failed += 1
+
+        goal_evaluations = _evaluate_goals(pending)
+
+        for (user_id, inputs, fingerprint, agent_inputs), goals in zip(pending, goal_evaluations, strict=True):
+            profile = inputs["profile"]
+            previous_report = inputs["previous_report"]
+            if goals is None:
+                failed += 1
+                continue
+            try:
+                outputs = run_agent_pipeline(profile, agent_inputs, _worker_macro_state, goal_evaluations=goals)
+                key_metrics = extract_key_metrics(agent_inputs, outputs)
+                changes = compute_previous_report_delta(previous_report, key_metrics)
+                narrator_input = build_narrator_input(profile, agent_inputs, outputs, changes)
+                report_json, narrative_source = await generate_prognosis_report(narrator_input, use_llm=_worker_use_llm)
+            except Exception as e:
+                logger.error(f"Batch prognosis failed for user {user_id}: {e}")
+                failed += 1
+                continue
+
+            reports.append(
+                {
+                    "user_id": user_id,
+                    "report_json": report_json,
+                    "inputs_snapshot": build_inputs_snapshot(inputs, fingerprint, key_metrics, narrative_source),
+                }
+            )
+
+        if reports:
+            await save_reports(db, reports)
+            await db.commit()
+        generated = len(reports)
+
+    return {"generated": generated, "skipped": skipped, "failed": failed}
+
+
+def _evaluate_goals(pending: list[tuple]) -> list[list[dict] | None]:
+    """
+    Simulate every pending user's goals in one vectorized pass.
+
+    If the pass fails (e.g. one user's bad goal data), users are evaluated one
+    by one, so only the offending users get None. Seeded results do not depend
+    on the other users in a pass, so the retry gives the same figures.
+    """
+    users = [
+        {
+            "goals": agent_inputs["goals"],
+            "monthly_savings": agent_inputs["monthly_savings"],
+            "current_savings": agent_inputs["current_savings"],
+            "monthly_income": agent_inputs["monthly_income"],
+            "seed": goal_simulation_seed(user_id),
+        }
+        for user_id, _, _, agent_inputs in pending
+    ]
+    options = {
+        "expected_return": GOAL_EXPECTED_RETURN,
+        "num_simulations": settings.goal_simulation_paths,
+        "model": settings.goal_simulation_model,
+        "batch_size": settings.goal_simulation_batch_size,
+        "sampler": settings.goal_simulation_sampler,
+        "tail_paths": settings.goal_simulation_tail_paths,
+    }
+
+    try:
+        return evaluate_goals_batch(users, **options)
+    except Exception as e:
+        logger.warning(f"Batch goal simulation failed, retrying per user: {e}")
+
+    evaluations: list[list[dict] | None] = []
+    for (user_id, _, _, _), user in zip(pending, users, strict=True):
+        try:
+            evaluations.append(evaluate_goals_batch([user], **options)[0])
+        except Exception as e:
+            logger.error(f"Batch prognosis failed for user {user_id}: {e}")
+            evaluations.append(None)
+    return evaluations
+
+
+# ── Parent process ────────────────────────────────────────────────────────────
+
+
+class BatchProgress:
+    """
+    Tracks completed chunks and persists a resumable watermark.
+
+    Chunks finish out of order, so the watermark only advances past the
+    contiguous prefix of completed chunks; it stops before a failed chunk, so a
+    resumed run retries from there. A resumed run restores only the counts of
+    chunks up to the watermark, since every chunk after it is processed (and
+    counted) again.
+    """
+
+    def __init__(self, state_file: Path, resume: bool):
+        self.state_file = state_file
+        self.watermark: str | None = None
+        # Counts of the chunks up to the watermark, and of every chunk finished in this run on top
+        self.watermark_totals = {"generated": 0, "skipped": 0, "failed": 0}
+        self.totals = dict(self.watermark_totals)
+        self.started_at = datetime.now(UTC).isoformat()
+
+        if resume and state_file.exists():
+            state = json.loads(state_file.read_text())
+            self.watermark = state.get("watermark")
+            self.watermark_totals.update(state.get("watermark_totals", {}))
+            self.totals = dict(self.watermark_totals)
+            self.started_at = state.get("started_at", self.started_at)
+            logger.info(f"Resuming after user {self.watermark}")
+
+        self._chunk_last_ids: dict[int, str] = {}
+        self._completed: dict[int, dict] = {}
+        self._next_contiguous = 0
+
+    def register(self, index: int, user_ids: list[str]) -> None:
+        self._chunk_last_ids[index] = user_ids[-1]
+
+    def complete(self, index: int, counts: dict) -> None:
+        for key, value in counts.items():
+            self.totals[key] += value
+        self._completed[index] = counts
+        self._advance()
+        self._save()
+
+    def fail(self, index: int, size: int) -> None:
+        # Never marked completed, so the watermark stops just before this chunk
+        self.totals["failed"] += size
+        self._save()
+
+    def _advance(self) -> None:
+        while self._next_contiguous in self._completed:
+            for key, value in self._completed.pop(self._next_contiguous).items():
+                self.watermark_totals[key] += value
+            self.watermark = self._chunk_last_ids.pop(self._next_contiguous)
+            self._next_contiguous += 1
+
+    def _save(self) -> None:
+        state = {
+            "started_at": self.started_at,
+            "updated_at": datetime.now(UTC).isoformat(),
+            "watermark": self.watermark,
+            "watermark_totals": self.watermark_totals,
+            "totals": self.totals,
+        }
+        self.state_file.write_text(json.dumps(state, indent=2))
+
+
+async def page_user_ids(after: str | None, chunk_size: int):
+    """
+    Yield chunks of user ids with a profile, in id order, using keyset paging.
+    """
+    while True:
+        async with SessionLocal() as db:
+            stmt = select(Profile.user_id).order_by(Profile.user_id).limit(chunk_size)
+            if after:
+                stmt = stmt.where(Profile.user_id > after)
+            result = await db.execute(stmt)
+            user_ids = [str(user_id) for user_id in result.scalars().all()]
+
+        if not user_ids:
+            return
+        yield user_ids
+        after = user_ids[-1]
+
+
+async def run_batch(args: argparse.Namespace) -> None:
+    progress = BatchProgress(Path(args.state_file), resume=args.resume)
+    macro_state = await get_macro_state()
+    logger.info(f"Batch prognosis starting: workers={args.workers} chunk_size={args.chunk_size} macro={macro_state}")
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    processed = 0
+    max_in_flight = args.workers * 2
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(macro_state, args.llm),
+    ) as pool:
+        in_flight: dict[asyncio.Future, tuple[int, int]] = {}
+
+        async def drain(return_when: str) -> None:
+            nonlocal processed
+            done, _ = await asyncio.wait(in_flight, return_when=return_when)
+            for future in done:
+                index, size = in_flight.pop(future)
+                processed += size
+                try:
+                    progress.complete(index, future.result())
+                except Exception as e:
+                    logger.error(f"Batch chunk {index} failed: {e}")
+                    progress.fail(index, size)
+
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Processed {processed} users in {elapsed:.1f}s "
+                f"({processed / elapsed:.1f} users/sec) totals={progress.totals}"
+            )
+
+        index = 0
+        async for user_ids in page_user_ids(progress.watermark, args.chunk_size):
+            progress.register(index, user_ids)
+            future = loop.run_in_executor(pool, process_chunk, user_ids)
+            in_flight[future] = (index, len(user_ids))
+            index += 1
+
+            if len(in_flight) >= max_in_flight:
+                await drain(asyncio.FIRST_COMPLETED)
+
+        while in_flight:
+            await drain(asyncio.FIRST_COMPLETED)
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    logger.info(f"Batch prognosis finished: {processed} users in {elapsed:.1f}s ({rate:.1f} users/sec)")
+    logger.info(f"Totals: {progress.totals}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute prognosis reports for all users.")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--state-file", default=str(DEFAULT_STATE_FILE))
+    parser.add_argument("--resume", action="store_true", help="Continue after the last checkpointed user")
+    parser.add_argument("--llm", action="store_true", help="Generate narratives with the LLM")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(run_batch(args))
+
+
+if __name__ == "__main__":
+    main()
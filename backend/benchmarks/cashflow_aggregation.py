@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark prognosis cashflow inputs: hydrating 60 days of Transaction ORM rows
+and summing them in Python vs. the daily_cashflow rollup aggregation in
+prognosis_service.build_cashflow_query.
+
+Reports latency (mean/p50/p95) and peak Python memory (tracemalloc) per
+approach, and checks both produce the same risk metrics and monthly figures.
+Without --user-id a throwaway user with --transactions rows in the window is
+created (with its rollup backfilled) and deleted afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.cashflow_aggregation --transactions 10000 --iterations 20
+    python -m benchmarks.cashflow_aggregation --user-id <uuid>
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.pipeline import CASHFLOW_WINDOW_DAYS, MONTHLY_WINDOW_DAYS
+from agents.risk_agent import compute_risk_metrics, compute_risk_metrics_from_totals
+from db import SessionLocal, engine
+from models import Account, Transaction, User
+from models.enums import AccountType, TransactionType
+from services.cashflow_service import backfill_daily_cashflow
+from services.prognosis_service import build_cashflow_query
+
+LIQUID_ACCOUNTS = [{"id": "bench", "balance": 250000.0, "currency": "INR"}]
+
+
+async def hydrate_and_sum(db: AsyncSession, user_id: str) -> dict:
+    """
+    The original pattern: load every recent Transaction, convert to dicts, loop in Python.
+    """
+    today = datetime.now(UTC).date()
+    stmt = select(Transaction).where(
+        Transaction.user_id == user_id,
+        Transaction.date >= today - timedelta(days=CASHFLOW_WINDOW_DAYS),
+    )
+    transactions = list((await db.execute(stmt)).scalars().all())
+
+    transaction_dicts = [
+        {
+            "id": tx.id,
+            "amount": float(tx.amount),
+            "type": tx.type.value,
+            "date": tx.date,
+            "currency": tx.currency,
+        }
+        for tx in transactions
+    ]
+
+    monthly_debits = Decimal("0")
+    monthly_credits = Decimal("0")
+    last_30_days = today - timedelta(days=MONTHLY_WINDOW_DAYS)
+    for tx in transactions:
+        if tx.date >= last_30_days:
+            if tx.type == TransactionType.DEBIT:
+                monthly_debits += tx.amount
+            elif tx.type == TransactionType.CREDIT:
+                monthly_credits += tx.amount
+
+    monthly_income = float(monthly_credits)
+    risk = compute_risk_metrics(transaction_dicts, LIQUID_ACCOUNTS, "INR", monthly_income=monthly_income)
+    return {"monthly_income": monthly_income, "monthly_expenses": float(monthly_debits), "risk": risk}
+
+
+async def aggregate_in_sql(db: AsyncSession, user_id: str) -> dict:
+    """
+    The aggregated pattern: per-day rollup rows summed to one row per window and currency.
+    """
+    result = await db.execute(build_cashflow_query([user_id], datetime.now(UTC).date()))
+
+    monthly_debits = Decimal("0")
+    monthly_credits = Decimal("0")
+    window_debits = Decimal("0")
+    count = 0
+    for _, _, payload in result.all():
+        debits = Decimal(payload["debits"])
+        window_debits += debits
+        count += payload["count"]
+        if payload["window_days"] == MONTHLY_WINDOW_DAYS:
+            monthly_debits += debits
+            monthly_credits += Decimal(payload["credits"])
+
+    monthly_income = float(monthly_credits)
+    risk = compute_risk_metrics_from_totals(
+        window_debits,
+        count,
+        LIQUID_ACCOUNTS,
+        "INR",
+        monthly_income=monthly_income,
+        days_in_period=CASHFLOW_WINDOW_DAYS,
+    )
+    return {"monthly_income": monthly_income, "monthly_expenses": float(monthly_debits), "risk": risk}
+
+
+async def measure(loader, user_id: str, iterations: int) -> tuple[list[float], int, dict]:
+    """
+    Time the loader over fresh sessions, then take one tracemalloc peak measurement.
+    """
+    timings = []
+    result = {}
+    for _ in range(iterations):
+        async with SessionLocal() as db:
+            await db.connection()
+            start = time.perf_counter()
+            result = await loader(db, user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    async with SessionLocal() as db:
+        await db.connection()
+        tracemalloc.start()
+        await loader(db, user_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return timings, peak, result
+
+
+async def seed_user(transactions: int) -> str:
+    """
+    Create a throwaway user with `transactions` rows spread over the cashflow window.
+    """
+    rng = random.Random(42)
+    today = datetime.now(UTC).date()
+    async with SessionLocal() as db:
+        user = User(id=str(uuid.uuid4()), email=f"bench-{time.time_ns()}@example.com")
+        db.add(user)
+        await db.flush()
+        account = Account(user_id=user.id, name="Bench", type=AccountType.BANK, currency="INR", balance=0)
+        db.add(account)
+        await db.flush()
+
+        rows = [
+            {
+                "user_id": user.id,
+                "account_id": account.id,
+                "label": "bench",
+                "date": today - timedelta(days=rng.randint(0, CASHFLOW_WINDOW_DAYS - 1)),
+                "amount": Decimal(rng.randint(100, 500000)) / 100,
+                "type": TransactionType.CREDIT if i % 20 == 0 else TransactionType.DEBIT,
+                "currency": "INR",
+            }
+            for i in range(transactions)
+        ]
+        for start in range(0, len(rows), 2000):
+            await db.execute(insert(Transaction), rows[start : start + 2000])
+        # Raw inserts bypass transaction_service, so build the user's rollup rows
+        await backfill_daily_cashflow(db, [user.id])
+        await db.commit()
+        return user.id
+
+
+def summarize(name: str, timings: list[float], peak: int) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name:<10} mean={statistics.mean(timings):8.2f}ms  p50={statistics.median(timings):8.2f}ms  "
+        f"p95={p95:8.2f}ms  peak_mem={peak / 1024:9.1f}KiB"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id")
+    parser.add_argument("--transactions", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    user_id = args.user_id or await seed_user(args.transactions)
+    try:
+        # One untimed pass each to prime statement caches
+        await measure(hydrate_and_sum, user_id, 1)
+        await measure(aggregate_in_sql, user_id, 1)
+
+        hydrate_timings, hydrate_peak, hydrate_result = await measure(hydrate_and_sum, user_id, args.iterations)
+        aggregate_timings, aggregate_peak, aggregate_result = await measure(aggregate_in_sql, user_id, args.iterations)
+
+        summarize("hydrate", hydrate_timings, hydrate_peak)
+        summarize("aggregate", aggregate_timings, aggregate_peak)
+        print(f"speedup (p50): {statistics.median(hydrate_timings) / statistics.median(aggregate_timings):.2f}x")
+        print(f"memory reduction: {hydrate_peak / max(aggregate_peak, 1):.1f}x")
+        print(f"results match: {hydrate_result == aggregate_result}")
+    finally:
+        if not args.user_id:
+            async with SessionLocal() as db:
+                await db.execute(delete(User).where(User.id == user_id))
+                await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
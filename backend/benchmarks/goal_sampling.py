@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Convergence of goal success probabilities: pseudo-random vs. scrambled Sobol draws.
+
+For a few representative goals (annual model), estimates the success probability
+with n paths per sampler over independent replications and reports the RMS
+error against a 2**22-point Sobol reference, per path count. Pseudo-random error
+shrinks like 1/sqrt(n); Sobol error should shrink close to 1/n.
+
+Also checks the analytic (break-even return) probabilities against the
+reference and times them per goal, and compares the relative error of plain
+and importance sampling on tail goals (exact analytic value as reference).
+
+Usage:
+    cd backend
+    python -m benchmarks.goal_sampling --replications 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from agents.monte_carlo import (
+    analytic_success_probabilities,
+    importance_success_probabilities,
+    simulate_success_probabilities,
+)
+from agents.qmc import sobol_normals
+
+EXPECTED_RETURN = 0.07
+
+# (current savings, monthly savings, target amount, months): comfortable, borderline and stretch goals
+GOALS = np.array(
+    [
+        [250_000.0, 20_000.0, 1_500_000.0, 48],
+        [100_000.0, 15_000.0, 2_600_000.0, 96],
+        [500_000.0, 30_000.0, 9_000_000.0, 120],
+        [50_000.0, 5_000.0, 2_500_000.0, 180],
+    ]
+)
+
+# Near-certain and near-impossible goals (success or failure probability well under 1%)
+TAIL_GOALS = np.array(
+    [
+        [400_000.0, 25_000.0, 600_000.0, 36],
+        [100_000.0, 10_000.0, 3_600_000.0, 60],
+        [50_000.0, 8_000.0, 30_000_000.0, 120],
+    ]
+)
+TAIL_PATHS = 2_000
+
+
+def estimate(standard_normals: np.ndarray) -> np.ndarray:
+    current, monthly, targets, months = GOALS.T
+    return simulate_success_probabilities(
+        current,
+        monthly,
+        targets,
+        months,
+        expected_return=EXPECTED_RETURN,
+        standard_normals=standard_normals[None, :],
+        normals_index=np.zeros(len(GOALS), dtype=np.int64),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replications", type=int, default=50)
+    parser.add_argument("--max-log2-paths", type=int, default=14)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    reference = estimate(sobol_normals(2**22, rng))
+    print("reference probabilities:", ", ".join(f"{p:.4f}" for p in reference))
+
+    analytic = analytic_success_probabilities(*GOALS.T, EXPECTED_RETURN)
+    # Timed on a 1,000-goal batch, as in a batch precompute (a single call is dominated by overhead)
+    batch = np.tile(GOALS, (250, 1))
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        analytic_success_probabilities(*batch.T, EXPECTED_RETURN)
+    per_goal_us = (time.perf_counter() - start) / repeats / len(batch) * 1e6
+    print("analytic probabilities: ", ", ".join(f"{p:.4f}" for p in analytic))
+    print(f"max |analytic - reference|: {np.max(np.abs(analytic - reference)):.6f}  ({per_goal_us:.1f}us per goal)")
+    print(f"{'paths':>8}  {'pseudo rmse':>12}  {'sobol rmse':>12}  {'ratio':>6}")
+
+    for log2_paths in range(8, args.max_log2_paths + 1):
+        paths = 2**log2_paths
+        errors = {"pseudo": [], "sobol": []}
+        for _ in range(args.replications):
+            errors["pseudo"].append(estimate(rng.standard_normal(paths)) - reference)
+            errors["sobol"].append(estimate(sobol_normals(paths, rng)) - reference)
+
+        pseudo, sobol = (float(np.sqrt(np.mean(np.square(errors[name])))) for name in ("pseudo", "sobol"))
+        print(f"{paths:8d}  {pseudo:12.5f}  {sobol:12.5f}  {pseudo / sobol:6.1f}x")
+
+    exact = analytic_success_probabilities(*TAIL_GOALS.T, EXPECTED_RETURN)
+    rare = np.minimum(exact, 1 - exact)
+    current, monthly, targets, months = TAIL_GOALS.T
+    errors = {"plain": [], "importance": []}
+    for _ in range(args.replications):
+        plain = simulate_success_probabilities(
+            current, monthly, targets, months, EXPECTED_RETURN, num_simulations=TAIL_PATHS, rng=rng
+        )
+        importance, _ = importance_success_probabilities(
+            current, monthly, targets, months, EXPECTED_RETURN, num_simulations=TAIL_PATHS, rng=rng
+        )
+        errors["plain"].append(np.abs(plain - exact) / rare)
+        errors["importance"].append(np.abs(importance - exact) / rare)
+
+    print(f"\ntail goals, {TAIL_PATHS} paths: mean relative error of the rare-outcome probability")
+    print(f"{'rare p':>10}  {'plain':>8}  {'importance':>10}")
+    for goal in range(len(TAIL_GOALS)):
+        plain, importance = (float(np.mean(np.array(errors[name])[:, goal])) for name in ("plain", "importance"))
+        print(f"{rare[goal]:10.2e}  {plain:8.3f}  {importance:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
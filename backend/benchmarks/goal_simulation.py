@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark goal Monte Carlo: the original pure-Python loop (500 random.gauss draws
+per goal) vs. the vectorized NumPy engine in agents.monte_carlo.
+
+Reports simulated paths/sec per engine and path count, and the largest
+probability difference between the legacy loop and the engine, which should
+be within sampling noise. For the monthly-step model it compares one shared
+(paths x max_months) return matrix per user against a fresh matrix per goal.
+
+Usage:
+    cd backend
+    python -m benchmarks.goal_simulation --goals 5 --repeats 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from agents.monte_carlo import simulate_monthly_success_probabilities, simulate_success_probabilities
+
+CURRENT_SAVINGS = 250_000.0
+MONTHLY_SAVINGS = 20_000.0
+EXPECTED_RETURN = 0.07
+
+
+def legacy_probability(target_amount: float, months: int, num_simulations: int = 500) -> float:
+    """
+    The original goal_agent loop: one annual return per run, compounded in Python.
+    """
+    successful_runs = 0
+    for _ in range(num_simulations):
+        simulated_monthly_rate = random.gauss(EXPECTED_RETURN, 0.15) / 12.0
+        if simulated_monthly_rate > -0.05:
+            sim_fv_savings = CURRENT_SAVINGS * ((1 + simulated_monthly_rate) ** months)
+            if simulated_monthly_rate != 0:
+                sim_fv_contributions = MONTHLY_SAVINGS * (
+                    ((1 + simulated_monthly_rate) ** months - 1) / simulated_monthly_rate
+                )
+            else:
+                sim_fv_contributions = MONTHLY_SAVINGS * months
+            if sim_fv_savings + sim_fv_contributions >= target_amount:
+                successful_runs += 1
+    return successful_runs / num_simulations
+
+
+def time_call(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--goals", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    months = rng.integers(6, 240, size=args.goals).astype(np.float64)
+    # Targets near each goal's expected future value, so probabilities are informative
+    targets = (CURRENT_SAVINGS + MONTHLY_SAVINGS * months) * rng.uniform(0.9, 1.6, size=args.goals)
+    current = np.full(args.goals, CURRENT_SAVINGS)
+    monthly = np.full(args.goals, MONTHLY_SAVINGS)
+
+    def run_legacy() -> list[float]:
+        return [legacy_probability(t, int(m)) for t, m in zip(targets, months, strict=True)]
+
+    seconds = time_call(run_legacy, args.repeats)
+    print(f"{'legacy loop':<18} paths={500:6d}  {args.goals * 500 / seconds:14,.0f} paths/sec  {seconds * 1000:8.2f}ms")
+
+    for num_simulations in (500, 10_000):
+
+        def run_vectorized(n: int = num_simulations) -> np.ndarray:
+            return simulate_success_probabilities(current, monthly, targets, months, EXPECTED_RETURN, num_simulations=n)
+
+        seconds = time_call(run_vectorized, args.repeats)
+        print(
+            f"{'numpy':<18} paths={num_simulations:6d}  "
+            f"{args.goals * num_simulations / seconds:14,.0f} paths/sec  {seconds * 1000:8.2f}ms"
+        )
+
+    legacy = np.array([legacy_probability(t, int(m), 20_000) for t, m in zip(targets, months, strict=True)])
+    vectorized = simulate_success_probabilities(
+        current, monthly, targets, months, EXPECTED_RETURN, num_simulations=20_000
+    )
+    print(f"max |legacy - numpy| probability at 20k paths: {np.max(np.abs(legacy - vectorized)):.4f}")
+
+    def run_monthly_shared() -> np.ndarray:
+        return simulate_monthly_success_probabilities(
+            CURRENT_SAVINGS, MONTHLY_SAVINGS, targets, months, EXPECTED_RETURN
+        )
+
+    def run_monthly_per_goal() -> list[np.ndarray]:
+        return [
+            simulate_monthly_success_probabilities(
+                CURRENT_SAVINGS, MONTHLY_SAVINGS, targets[i : i + 1], months[i : i + 1]
+            )
+            for i in range(args.goals)
+        ]
+
+    for name, fn in (("monthly shared", run_monthly_shared), ("monthly per goal", run_monthly_per_goal)):
+        seconds = time_call(fn, max(1, args.repeats // 4))
+        print(f"{name:<18} paths={10_000:6d}  {seconds * 1000:8.2f}ms per user ({args.goals} goals)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Compare Narrator prompt size with the full previous report embedded (the
+original prompt) vs. the compact metric delta from agents.report_delta.
+
+Needs a user with a stored report; token counts are estimated at ~4 chars/token.
+
+Usage:
+    cd backend
+    python -m benchmarks.narrator_prompt --user-id <uuid>
+"""
+
+import argparse
+import asyncio
+import json
+
+from agents.model_registry import model_registry
+from agents.pipeline import build_narrator_input, prepare_agent_inputs, run_agent_pipeline
+from agents.report_delta import compute_report_delta, extract_key_metrics
+from core.config import settings
+from db import SessionLocal, engine
+from integrations.llm_client import build_narrator_prompt
+from integrations.market_client import get_macro_state
+from services.prognosis_service import load_prognosis_inputs
+
+CHARS_PER_TOKEN = 4
+
+
+def legacy_prompt(narrator_input: dict, previous_report_json: dict) -> str:
+    """
+    The original prompt: the previous report_json pretty-printed in full.
+    """
+    prompt = build_narrator_prompt({**narrator_input, "changes_since_last": None})
+    head, _, tail = prompt.partition("CHANGES SINCE LAST REPORT")
+    tail = tail[tail.index("\n\nGenerate") :]
+    return f"{head}PREVIOUS REPORT (for comparison):\n{json.dumps(previous_report_json, indent=2)}{tail}"
+
+
+def summarize(name: str, prompt: str) -> None:
+    print(f"{name:<8} {len(prompt):7d} chars  ~{len(prompt) // CHARS_PER_TOKEN:6d} tokens")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True)
+    args = parser.parse_args()
+
+    async with SessionLocal() as db:
+        inputs = await load_prognosis_inputs(db, args.user_id)
+    await engine.dispose()
+
+    previous_report = inputs["previous_report"]
+    if not inputs["profile"] or not previous_report:
+        raise SystemExit("User needs a profile and a stored prognosis report")
+
+    model_registry.load(settings.model_path)
+    agent_inputs = prepare_agent_inputs(inputs)
+    outputs = run_agent_pipeline(inputs["profile"], agent_inputs, await get_macro_state())
+    key_metrics = extract_key_metrics(agent_inputs, outputs)
+    # Reports stored before key metrics were tracked compare as a first report
+    changes = compute_report_delta(previous_report["key_metrics"], key_metrics)
+    narrator_input = build_narrator_input(inputs["profile"], agent_inputs, outputs, changes)
+
+    legacy = legacy_prompt(narrator_input, previous_report["report_json"])
+    delta = build_narrator_prompt(narrator_input)
+
+    summarize("legacy", legacy)
+    summarize("delta", delta)
+    print(f"reduction: {1 - len(delta) / len(legacy):.1%}")
+    print(f"changes_since_last: {json.dumps(changes, separators=(',', ':'))}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark prognosis input loading: sequential per-table selects vs. the single
+UNION ALL round trip used by prognosis_service.load_prognosis_inputs.
+
+Round-trip latency dominates on a remote database, so point
+PROGNOSIS_DATABASE_URL at the real (remote) Postgres instance when running.
+
+Usage:
+    cd backend
+    python -m benchmarks.prognosis_loading --user-id <uuid> --iterations 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import SessionLocal, engine
+from models import Account, Goal, Profile, PrognosisReport, Transaction
+from services.prognosis_service import load_prognosis_inputs
+
+
+async def load_sequential(db: AsyncSession, user_id: str) -> dict:
+    """
+    The original loading pattern: one select per table, awaited in turn.
+    """
+    profile = (await db.execute(select(Profile).where(Profile.user_id == user_id))).scalar_one_or_none()
+    accounts = list((await db.execute(select(Account).where(Account.user_id == user_id))).scalars().all())
+
+    cutoff_date = datetime.now(UTC).date() - timedelta(days=60)
+    stmt = select(Transaction).where(Transaction.user_id == user_id, Transaction.date >= cutoff_date)
+    transactions = list((await db.execute(stmt)).scalars().all())
+
+    goals = list((await db.execute(select(Goal).where(Goal.user_id == user_id))).scalars().all())
+    stmt = select(PrognosisReport).where(PrognosisReport.user_id == user_id)
+    previous_report = (await db.execute(stmt)).scalar_one_or_none()
+
+    return {
+        "profile": profile,
+        "accounts": accounts,
+        "transactions": transactions,
+        "goals": goals,
+        "previous_report": previous_report,
+    }
+
+
+async def time_loader(loader, user_id: str, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        async with SessionLocal() as db:
+            # Warm the connection so pool checkout is not part of the measurement
+            await db.connection()
+            start = time.perf_counter()
+            await loader(db, user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name:<12} mean={statistics.mean(timings):8.2f}ms  "
+        f"p50={statistics.median(timings):8.2f}ms  p95={p95:8.2f}ms  min={ordered[0]:8.2f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    # One untimed pass each to prime statement caches
+    await time_loader(load_sequential, args.user_id, 1)
+    await time_loader(load_prognosis_inputs, args.user_id, 1)
+
+    sequential = await time_loader(load_sequential, args.user_id, args.iterations)
+    single = await time_loader(load_prognosis_inputs, args.user_id, args.iterations)
+
+    summarize("sequential", sequential)
+    summarize("union_all", single)
+    print(f"speedup (p50): {statistics.median(sequential) / statistics.median(single):.2f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark risk metrics: the original Decimal arithmetic (every float amount
+rebuilt with Decimal(str(amount))) vs. the integer minor-unit path in
+agents.risk_agent.
+
+Times compute_risk_metrics over a window of --transactions transaction dicts
+and the per-user totals path used by the pipeline, then checks equivalence on
+--cases random users (amounts with up to 4 decimals, as stored): risk score and
+label must match exactly, burn rate and runway to within 1e-12 relative, and the
+2-decimal ratios exactly or, when the exact ratio is a half-cent tie, by one
+cent (the Decimal path divides by the float-rounded burn rate, so it can land
+just off the tie; those cases are counted separately). Exits non-zero on any
+other mismatch.
+
+Finally times compute_risk_metrics_batch on --users users against calling
+compute_risk_metrics per user, and requires identical results.
+
+Usage:
+    cd backend
+    python -m benchmarks.risk_metrics --transactions 10000 --cases 100000 --users 10000
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from agents.risk_agent import compute_risk_metrics, compute_risk_metrics_batch, compute_risk_metrics_from_totals
+
+EXACT_FIELDS = ("risk_score", "risk_label")
+FLOAT_FIELDS = ("burn_rate", "runway_months")
+ROUNDED_FIELDS = ("stability_ratio", "savings_ratio")
+
+
+def legacy_risk_metrics(
+    transactions: list[dict],
+    liquid_accounts: list[dict],
+    monthly_income: float = 0.0,
+    days_in_period: int = 60,
+    total_debits: Decimal | None = None,
+) -> dict:
+    """
+    The original risk_agent arithmetic: Decimal(str(...)) on every amount and ratio.
+    """
+    if total_debits is None:
+        cutoff_date = datetime.now(UTC).date() - timedelta(days=60)
+        total_debits = Decimal("0")
+        for tx in transactions:
+            if tx.get("date") and tx["date"] >= cutoff_date and tx.get("type") == "debit":
+                total_debits += Decimal(str(tx.get("amount", 0)))
+        transaction_count = len(transactions)
+    else:
+        transaction_count = 1
+
+    total_liquid = sum(Decimal(str(acc.get("balance", 0))) for acc in liquid_accounts)
+    if not transaction_count:
+        return {
+            "burn_rate": 0.0,
+            "runway_months": float("inf") if total_liquid > 0 else 0.0,
+            "stability_ratio": 2.0 if monthly_income > 0 else 1.0,
+            "savings_ratio": 1.0 if monthly_income > 0 else 0.0,
+            "risk_score": 70,
+            "risk_label": "Low",
+        }
+
+    burn_rate = float((total_debits / Decimal(str(days_in_period))) * Decimal("30"))
+    if burn_rate > 0:
+        runway_months = float(total_liquid / Decimal(str(burn_rate)))
+        stability_ratio = float(Decimal(str(monthly_income)) / Decimal(str(burn_rate)))
+    else:
+        runway_months = 999.9 if total_liquid > 0 else 0.0
+        stability_ratio = 2.0 if monthly_income > 0 else 1.0
+
+    if monthly_income > 0:
+        savings_ratio = float((Decimal(str(monthly_income)) - Decimal(str(burn_rate))) / Decimal(str(monthly_income)))
+        savings_ratio = max(0.0, min(1.0, savings_ratio))
+    else:
+        savings_ratio = 0.0
+
+    runway_normalized = max(0.0, min(1.0, min(runway_months, 12.0) / 12.0))
+    stability_normalized = max(0.0, min(1.0, (stability_ratio - 0.5) / 1.5))
+    risk_score = max(0, min(100, int(40 * runway_normalized + 30 * stability_normalized + 30 * savings_ratio)))
+    risk_label = "Low" if risk_score >= 70 else "Moderate" if risk_score >= 40 else "High"
+
+    return {
+        "burn_rate": burn_rate,
+        "runway_months": min(runway_months, 999.9),
+        "stability_ratio": round(stability_ratio, 2),
+        "savings_ratio": round(savings_ratio, 2),
+        "risk_score": risk_score,
+        "risk_label": risk_label,
+    }
+
+
+def random_amount(rng: random.Random, high: int) -> float:
+    return rng.randint(0, high * 10_000) / 10_000
+
+
+def random_transactions(rng: random.Random, count: int) -> list[dict]:
+    today = datetime.now(UTC).date()
+    return [
+        {
+            "amount": random_amount(rng, 50_000),
+            "type": "credit" if rng.random() < 0.1 else "debit",
+            "date": today - timedelta(days=rng.randint(0, 89)),
+        }
+        for _ in range(count)
+    ]
+
+
+def time_call(function, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def mismatches(expected: dict, actual: dict) -> tuple[list[str], list[str]]:
+    """
+    Fields that differ, split into (mismatches, one-cent differences of the rounded ratios).
+    """
+    fields = [field for field in EXACT_FIELDS if expected[field] != actual[field]]
+    fields += [
+        field
+        for field in FLOAT_FIELDS
+        if not (expected[field] == actual[field] or math.isclose(expected[field], actual[field], rel_tol=1e-12))
+    ]
+    cents = [field for field in ROUNDED_FIELDS if expected[field] != actual[field]]
+    fields += [field for field in cents if round(abs(expected[field] - actual[field]), 6) > 0.01]
+    return fields, [field for field in cents if field not in fields]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    transactions = random_transactions(rng, args.transactions)
+    accounts = [{"balance": random_amount(rng, 500_000)} for _ in range(3)]
+    income = random_amount(rng, 300_000)
+
+    legacy_us = time_call(lambda: legacy_risk_metrics(transactions, accounts, income), args.repeats)
+    minor_us = time_call(lambda: compute_risk_metrics(transactions, accounts, "INR", income), args.repeats)
+    print(f"compute_risk_metrics, {args.transactions} transactions:")
+    print(f"  decimal {legacy_us:10.1f}us  minor units {minor_us:10.1f}us  speedup {legacy_us / minor_us:.1f}x")
+
+    debits = Decimal(random_amount(rng, 1_000_000)).quantize(Decimal("0.0001"))
+    legacy_us = time_call(lambda: legacy_risk_metrics([], accounts, income, total_debits=debits), 20_000)
+    minor_us = time_call(lambda: compute_risk_metrics_from_totals(debits, 1, accounts, "INR", income), 20_000)
+    print("compute_risk_metrics_from_totals:")
+    print(f"  decimal {legacy_us:10.2f}us  minor units {minor_us:10.2f}us  speedup {legacy_us / minor_us:.1f}x")
+
+    failures = 0
+    ties = 0
+    for case in range(args.cases):
+        accounts = [{"balance": random_amount(rng, 10 ** rng.randint(0, 7))} for _ in range(rng.randint(0, 3))]
+        income = random_amount(rng, 10 ** rng.randint(0, 6)) if rng.random() < 0.9 else 0.0
+        if case % 100 == 0:
+            transactions = random_transactions(rng, rng.randint(0, 50))
+            expected = legacy_risk_metrics(transactions, accounts, income)
+            actual = compute_risk_metrics(transactions, accounts, "INR", income)
+        else:
+            debits = Decimal(rng.randint(0, 10 ** rng.randint(1, 12))).scaleb(-4)
+            days = rng.choice((30, 60, 90))
+            expected = legacy_risk_metrics([], accounts, income, days, total_debits=debits)
+            actual = compute_risk_metrics_from_totals(debits, 1, accounts, "INR", income, days)
+        fields, cents = mismatches(expected, actual)
+        ties += bool(cents) and not fields
+        if fields:
+            failures += 1
+            if failures <= 10:
+                print(f"mismatch in {fields}: decimal={expected} minor units={actual}")
+
+    print(f"equivalence: {args.cases - failures}/{args.cases} cases match ({ties} differ by a cent at a rounding tie)")
+
+    users = [random_transactions(rng, rng.randint(0, 40)) for _ in range(args.users)]
+    balances = [random_amount(rng, 10 ** rng.randint(0, 7)) if rng.random() < 0.95 else 0.0 for _ in users]
+    incomes = [random_amount(rng, 10 ** rng.randint(0, 6)) if rng.random() < 0.9 else 0.0 for _ in users]
+    rows = [(user, tx) for user, transactions in enumerate(users) for tx in transactions]
+    columns = (
+        np.array([user for user, _ in rows], dtype=np.int64),
+        np.array([tx["amount"] for _, tx in rows]),
+        np.array([tx["type"] for _, tx in rows]),
+        np.array([tx["date"] for _, tx in rows], dtype="datetime64[D]"),
+        np.array(balances),
+        np.array(incomes),
+    )
+
+    start = time.perf_counter()
+    scalar = [
+        compute_risk_metrics(transactions, [{"balance": balance}], "INR", income)
+        for transactions, balance, income in zip(users, balances, incomes, strict=True)
+    ]
+    scalar_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    batch = compute_risk_metrics_batch(*columns)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    batch_failures = sum(expected != actual for expected, actual in zip(scalar, batch, strict=True))
+    print(f"compute_risk_metrics_batch, {args.users} users / {len(rows)} transactions:")
+    print(f"  per user {scalar_ms:8.1f}ms  batch {batch_ms:8.1f}ms  speedup {scalar_ms / batch_ms:.1f}x")
+    print(f"  identical to per-user results: {args.users - batch_failures}/{args.users}")
+
+    if failures or batch_failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,35 @@ class Settings(BaseSettings):
     prognosis_rate_limit_enabled: bool = False
     prognosis_max_requests_per_day: int = 5
 
+    # In-process job workers started with the app (0 = rely on standalone workers)
+    prognosis_job_workers: int = 1
+    prognosis_job_poll_interval: float = 1.0
+    # Running jobs refresh heartbeat_at every heartbeat interval; a job whose heartbeat
+    # is older than stale_after (its worker died) is reclaimed by another worker
+    prognosis_job_heartbeat_interval: float = 30.0
+    prognosis_job_stale_after_seconds: int = 300
+    prognosis_job_max_attempts: int = 3
+
+    # Monte Carlo paths per goal in the goal feasibility agent, and the return
+    # model: "monthly" (path-dependent monthly returns), "annual" (one constant rate
+    # per path), "regime" (the RL env's market regimes and income/expense shocks) or
+    # "analytic" (the "annual" model's exact probability, no sampling)
+    goal_simulation_paths: int = 10_000
+    goal_simulation_model: str = "monthly"
+    # Combined with the user id to seed each user's goal simulations; change it to redraw all paths
+    goal_simulation_seed: int = 0
+    # Paths per sequential batch: a goal stops sampling once its 95% interval no longer
+    # crosses a status threshold, with goal_simulation_paths as the cap (0 = no early stop)
+    goal_simulation_batch_size: int = 1_000
+    # Normal draw sampler: "pseudo" or "sobol" (quasi-Monte Carlo, annual model only)
+    goal_simulation_sampler: str = "pseudo"
+    # Importance-sampling paths for near-certain / near-impossible goals (0 disables)
+    goal_simulation_tail_paths: int = 2_000
+
+    # Per-goal simulation result cache for interactive refreshes (0 entries or TTL disables it)
+    goal_cache_max_entries: int = 10_000
+    goal_cache_ttl_seconds: int = 3600
+
     fx_api_key: str | None = None
     fx_api_url: str = "https://api.exchangerate-api.com/v4/latest"
 
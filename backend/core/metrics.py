@@ -0,0 +1,121 @@
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+
+# Upper bounds (ms) for latency buckets; the last bucket is unbounded
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Memory stays constant regardless of traffic; percentiles are estimated by
+    linear interpolation inside the bucket that contains the requested rank.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = Lock()
+
+    def observe(self, value_ms: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets_ms, value_ms)] += 1
+            self._count += 1
+            self._sum_ms += value_ms
+            self._max_ms = max(self._max_ms, value_ms)
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Estimate the p-th percentile (0-1) from the bucket counts.
+        """
+        if not self._count:
+            return None
+
+        rank = p * self._count
+        cumulative = 0
+        for i, count in enumerate(self._counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets_ms[i - 1] if i > 0 else 0.0
+                upper = self.buckets_ms[i] if i < len(self.buckets_ms) else self._max_ms
+                fraction = (rank - cumulative) / count
+                return round(min(lower + (upper - lower) * fraction, self._max_ms), 3)
+            cumulative += count
+        return round(self._max_ms, 3)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip((*self.buckets_ms, "+Inf"), self._counts, strict=True):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+
+            return {
+                "count": self._count,
+                "sum_ms": round(self._sum_ms, 3),
+                "max_ms": round(self._max_ms, 3),
+                "p50": self.percentile(0.50),
+                "p95": self.percentile(0.95),
+                "p99": self.percentile(0.99),
+                "buckets": buckets,
+            }
+
+
+class HistogramRegistry:
+    """
+    Named histograms, created on first observation.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._histograms: dict[str, Histogram] = {}
+
+    def observe(self, name: str, value_ms: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms.setdefault(name, Histogram(self.buckets_ms))
+        histogram.observe(value_ms)
+
+    def snapshot(self) -> dict:
+        return {name: histogram.snapshot() for name, histogram in self._histograms.items()}
+
+
+class StageTimer:
+    """
+    Collects wall-clock timings for the named stages of one run.
+
+    Each measured stage is also observed in the given registry, so per-run
+    timings and process-wide distributions come from the same measurement.
+    """
+
+    def __init__(self, registry: HistogramRegistry | None = None):
+        self.registry = registry
+        self.timings_ms: dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        self.timings_ms[stage] = round(self.timings_ms.get(stage, 0.0) + elapsed_ms, 3)
+        if self.registry:
+            self.registry.observe(stage, elapsed_ms)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+
+# Per-stage latency of prognosis generation, exported via /api/health/prognosis
+prognosis_stage_histograms = HistogramRegistry()
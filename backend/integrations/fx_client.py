@@ -85,3 +85,33 @@ async def convert_currency(
         logger.error(f"Failed to convert currency from {from_currency} to {to_currency}: {e}")
         # Return original amount as fallback
         return amount
+
+
+async def get_rates_to_base(db: AsyncSession, base_currency: str, currencies: set[str]) -> dict[str, Decimal]:
+    """
+    Rates for converting each of the currencies into base_currency, from one rate table.
+
+    Reads the cached table of base_currency (1 unit of base = rate units of the
+    other currency), so an amount is amount / rate in base currency, and a whole
+    bundle of rows needs one lookup instead of one convert_currency call per row.
+    Currencies without a rate, or all of them if the table cannot be fetched,
+    get rate 1 (left unconverted), as convert_currency falls back.
+    """
+    rates = {base_currency: Decimal("1")}
+    foreign = currencies - {base_currency}
+    if not foreign:
+        return rates
+
+    try:
+        table = await get_cached_rates(db, base_currency)
+    except Exception as e:
+        logger.error(f"Failed to load FX rates for {base_currency}, leaving amounts unconverted: {e}")
+        table = {}
+
+    for currency in sorted(foreign):
+        if table.get(currency):
+            rates[currency] = Decimal(str(table[currency]))
+        else:
+            logger.warning(f"Currency {currency} not found in rates for {base_currency}, leaving amounts unconverted")
+            rates[currency] = Decimal("1")
+    return rates
@@ -1,25 +1,21 @@
 import json
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 from core.config import settings
 from core.logging import get_logger
+from schemas.prognosis import NarratorOutput
 
 logger = get_logger(__name__)
 
+SectionCallback = Callable[[str, Any], Awaitable[None]]
 
-async def generate_prognosis_report(input_data: dict) -> dict:
-    """
-    Generate a prognosis report using LLM (Narrator agent).
-
-    Uses actual user financial data to provide personalized insights and recommendations.
-    """
+# Where a report's narrative came from: the LLM, or the template fallback
+NARRATIVE_LLM = "llm"
+NARRATIVE_FALLBACK = "fallback"
 
-    try:
-        if settings.llm_provider == "gemini" and settings.llm_api_key:
-            from google import genai
 
-            client = genai.Client(api_key=settings.llm_api_key)
-
-            system_instruction = """You are an expert financial advisor AI analyzing a user's financial situation. 
+NARRATOR_INSTRUCTION = """You are an expert financial advisor AI analyzing a user's financial situation. 
 Your role is to provide clear, actionable insights based on their accounts, transactions, goals, and risk profile.
 
 IMPORTANT: You must return ONLY a valid JSON object with NO additional text, markdown formatting, or code blocks.
@@ -33,8 +29,9 @@ Analyze the provided financial data and generate a comprehensive report with the
     and recommendations",
   "allocation_section": "2-3 paragraph explanation of recommended asset allocation 
     and investment strategy",
-  "changes_since_last": "1-2 paragraphs comparing to previous report 
-    (or 'This is your first prognosis report.' if no previous data)",
+  "changes_since_last": "1-2 paragraphs explaining the metric changes since the previous report 
+    (or 'This is your first prognosis report.' if there is no previous report; if the previous report
+    has no stored metrics, say a detailed comparison is not available and describe the current position)",
   "disclaimer": "Standard disclaimer that this is informational only, not financial advice",
   "markdown_body": "Full detailed markdown report with sections: ## Financial Overview, ## Cash Flow Analysis,
   ## Goal Progress, ## Investment Strategy, ## Action Items"
@@ -48,7 +45,15 @@ Guidelines:
 - If data is limited (no transactions/accounts), acknowledge this and provide general guidance
 - Focus on wealth-building strategies aligned with their risk appetite and goals"""
 
-            user_prompt = f"""{system_instruction}
+
+def build_narrator_prompt(input_data: dict) -> str:
+    """
+    Render the Narrator prompt from the agent results.
+
+    The previous report is represented only by the compact metric delta in
+    'changes_since_last', which keeps the prompt a fraction of its former size.
+    """
+    return f"""{NARRATOR_INSTRUCTION}
 
 Analyze this financial data and generate a personalized report:
 
@@ -72,18 +77,125 @@ RL STRATEGY RECOMMENDATION:
 ACCOUNTS & TRANSACTIONS:
 {json.dumps(input_data.get("accounts_summary", {}), indent=2)}
 
-PREVIOUS REPORT (for comparison):
-{json.dumps(input_data.get("previous_report", "None - First report"), indent=2)}
+CHANGES SINCE LAST REPORT (metric deltas as from/to/change; null means first report, {{}} means no changes,
+"metrics_unavailable": true means a previous report exists but its metrics were not recorded):
+{json.dumps(input_data.get("changes_since_last"), separators=(",", ":"))}
 
 Generate the JSON report now:"""
 
+
+class _SectionStreamParser:
+    """
+    Incrementally extract completed top-level members from a streamed JSON object.
+
+    Tracks string/escape state and nesting depth across chunks, so a member is
+    emitted as soon as the ',' or closing '}' that ends it arrives.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start = 0
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        self.buffer += text
+        members: list[tuple[str, Any]] = []
+
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.member_start = self.pos + 1
+            elif ch in "}]":
+                if self.depth == 1:
+                    members.extend(self._complete(self.pos))
+                self.depth -= 1
+            elif ch == "," and self.depth == 1:
+                members.extend(self._complete(self.pos))
+                self.member_start = self.pos + 1
+            self.pos += 1
+
+        return members
+
+    def _complete(self, end: int) -> list[tuple[str, Any]]:
+        member = self.buffer[self.member_start : end].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except json.JSONDecodeError:
+            logger.warning("Skipping unparseable streamed report section")
+            return []
+
+
+async def generate_prognosis_report(
+    input_data: dict,
+    on_section: SectionCallback | None = None,
+    use_llm: bool = True,
+) -> tuple[dict, str]:
+    """
+    Generate a prognosis report using LLM (Narrator agent).
+
+    Uses actual user financial data to provide personalized insights and recommendations.
+    If on_section is given, the response is streamed and on_section is awaited with
+    (field, value) for each top-level report field as soon as it is complete.
+    With use_llm=False the template report is produced without calling the LLM
+    (used by batch precompute).
+
+    Returns:
+        Tuple of (report, narrative source): NARRATIVE_LLM, or NARRATIVE_FALLBACK
+        when the template filled in any part of the report
+    """
+
+    if not use_llm:
+        return await _fallback_report(input_data, on_section), NARRATIVE_FALLBACK
+
+    # Sections already sent to on_section, kept if the stream fails part way
+    streamed: dict = {}
+    try:
+        if llm_configured():
+            from google import genai
+
+            client = genai.Client(api_key=settings.llm_api_key)
+
+            user_prompt = build_narrator_prompt(input_data)
+            logger.info(f"Narrator prompt size: {len(user_prompt)} chars")
+
+            config = {
+                "temperature": 0.7,
+                "response_mime_type": "application/json",
+            }
+
+            if on_section:
+                parser = _SectionStreamParser()
+                stream = await client.aio.models.generate_content_stream(
+                    model=settings.llm_model,
+                    contents=user_prompt,
+                    config=config,
+                )
+                async for chunk in stream:
+                    for section, content in parser.feed(chunk.text or ""):
+                        streamed[section] = content
+                        await on_section(section, content)
+                return _validate_report(streamed), NARRATIVE_LLM
+
             response = client.models.generate_content(
                 model=settings.llm_model,
                 contents=user_prompt,
-                config={
-                    "temperature": 0.7,
-                    "response_mime_type": "application/json",
-                },
+                config=config,
             )
 
             report_text = response.text.strip()
@@ -93,14 +205,120 @@ Generate the JSON report now:"""
                     report_text = report_text[4:]
                 report_text = report_text.strip()
 
-            return json.loads(report_text)
+            return _validate_report(json.loads(report_text)), NARRATIVE_LLM
         else:
             logger.warning("LLM not configured, using enhanced fallback report generator")
-            return _generate_enhanced_report(input_data)
+            return await _fallback_report(input_data, on_section), NARRATIVE_FALLBACK
 
     except Exception as e:
         logger.error(f"Failed to generate LLM report: {e}")
-        return _generate_enhanced_report(input_data)
+        return await _fallback_report(input_data, on_section, streamed), NARRATIVE_FALLBACK
+
+
+def llm_configured() -> bool:
+    """
+    Whether the Narrator LLM is configured, i.e. reports can get an LLM narrative.
+    """
+    return settings.llm_provider == "gemini" and bool(settings.llm_api_key)
+
+
+def _validate_report(report: dict) -> dict:
+    """
+    Check an LLM report has every NarratorOutput field with the right type.
+
+    Raises:
+        ValueError: If a field is missing or invalid
+    """
+    missing = NarratorOutput.model_fields.keys() - report.keys()
+    if missing:
+        raise ValueError(f"LLM report is missing fields: {', '.join(sorted(missing))}")
+    NarratorOutput.model_validate(report)
+    return report
+
+
+async def _fallback_report(
+    input_data: dict,
+    on_section: SectionCallback | None,
+    streamed: dict | None = None,
+) -> dict:
+    """
+    Build the fallback report, emitting its sections to on_section if streaming.
+
+    Sections the LLM already streamed (streamed) are kept and not emitted again,
+    so the client never sees two versions of a section and the saved report
+    matches what it was shown; the fallback fills in the rest.
+    """
+    streamed = streamed or {}
+    report = {**_generate_enhanced_report(input_data), **streamed}
+    if on_section:
+        for section, content in report.items():
+            if section not in streamed:
+                await on_section(section, content)
+    return report
+
+
+def _describe_changes(changes: dict | None, currency: str) -> str:
+    """
+    Render the metric delta from report_delta.compute_report_delta as prose.
+    """
+    if changes is None:
+        return "This is your first prognosis report."
+    if changes.get("metrics_unavailable"):
+        since = f" from {changes['previous_as_of']}" if changes.get("previous_as_of") else ""
+        return (
+            f"Your previous report{since} predates metric tracking, so a detailed comparison is not available. "
+            "Future reports will highlight what changed from this one."
+        )
+    if not changes:
+        return "No material changes since your previous report - your key metrics are where they were."
+
+    sentences = []
+    if "risk_score" in changes:
+        risk_change = changes["risk_score"]
+        label = (
+            f" ({changes['risk_label']['from']} to {changes['risk_label']['to']})" if "risk_label" in changes else ""
+        )
+        sentences.append(f"Your risk score moved from {risk_change['from']} to {risk_change['to']}{label}.")
+    if "savings_ratio" in changes:
+        savings_change = changes["savings_ratio"]
+        sentences.append(
+            f"Your savings rate went from {int(savings_change['from'] * 100)}% to {int(savings_change['to'] * 100)}%."
+        )
+    for metric, label in (("monthly_income", "Monthly income"), ("monthly_expenses", "Monthly expenses")):
+        if metric in changes:
+            sentences.append(f"{label} changed by {changes[metric]['change']:+,} {currency}.")
+    if "runway_months" in changes:
+        sentences.append(f"Your emergency runway is now {changes['runway_months']['to']:.1f} months.")
+
+    goals = changes.get("goals", {})
+    for goal in goals.get("changed", []):
+        if "status" in goal:
+            status_change = goal["status"]
+            sentences.append(
+                f"'{goal['name']}' moved from {status_change['from'].replace('_', ' ')} "
+                f"to {status_change['to'].replace('_', ' ')}."
+            )
+        elif "success_probability" in goal:
+            probability = goal["success_probability"]
+            sentences.append(
+                f"'{goal['name']}' success probability went from {int(probability['from'] * 100)}% "
+                f"to {int(probability['to'] * 100)}%."
+            )
+    if goals.get("added"):
+        sentences.append(f"New goals: {', '.join(goals['added'])}.")
+    if goals.get("removed"):
+        sentences.append(f"Goals no longer tracked: {', '.join(goals['removed'])}.")
+
+    if "allocation" in changes:
+        shifts = ", ".join(
+            f"{asset} {int(change['from'] * 100)}% to {int(change['to'] * 100)}%"
+            for asset, change in changes["allocation"].items()
+        )
+        sentences.append(f"Recommended allocation shifted: {shifts}.")
+
+    if not sentences:
+        return "Only minor changes since your previous report."
+    return " ".join(sentences)
 
 
 def _generate_enhanced_report(input_data: dict) -> dict:
@@ -291,14 +509,7 @@ def _generate_enhanced_report(input_data: dict) -> dict:
         )
 
     # Changes section
-    has_previous = input_data.get("previous_report") is not None
-    if has_previous:
-        changes_since_last = (
-            "This report reflects your updated financial situation. "
-            "Compare key metrics with your previous report to track progress over time."
-        )
-    else:
-        changes_since_last = "This is your first prognosis report."
+    changes_since_last = _describe_changes(input_data.get("changes_since_last"), currency)
 
     # Build markdown body
     markdown_body = f"""## Financial Overview
@@ -1,11 +1,17 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Annotated
 
-from fastapi import Depends, FastAPI, Query
+from fastapi import Depends, FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from agents.goal_cache import goal_evaluation_cache
+from agents.model_registry import model_registry
 from api.accounts import router as accounts_router
 from api.goals import router as goals_router
 from api.profile import router as profile_router
@@ -13,18 +19,37 @@ from api.prognosis import router as prognosis_router
 from api.transactions import router as transactions_router
 from api.user import router as user_router
 from core.config import settings
-from core.logging import setup_logging
+from core.logging import request_id_var, setup_logging
+from core.metrics import prognosis_stage_histograms
 from core.rate_limiter import limiter
 from db import get_db
 from integrations.fx_client import get_cached_rates
+from services.prognosis_job_service import start_workers
 
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Load the strategy model once per process before serving requests,
+    and run the in-process prognosis job workers alongside the app.
+    """
+    model_registry.load(settings.model_path)
+    goal_evaluation_cache.configure(settings.goal_cache_max_entries, settings.goal_cache_ttl_seconds)
+    workers = start_workers(settings.prognosis_job_workers)
+    yield
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+
 app = FastAPI(
     title="Prognosis AI API",
     version="0.2.0",
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 # Add rate limiter
@@ -40,6 +65,21 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """
+    Tag each request with an id (client-supplied X-Request-ID or a new one) for log correlation.
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.get("/api/health")
 async def health_check() -> dict:
     """
@@ -52,6 +92,30 @@ async def health_check() -> dict:
     }
 
 
+@app.get("/api/health/model")
+async def model_health() -> dict:
+    """
+    Strategy model version, load time and recent inference latency.
+    """
+    return model_registry.stats()
+
+
+@app.get("/api/health/prognosis")
+async def prognosis_health() -> dict:
+    """
+    Per-stage prognosis generation latency histograms with p50/p95/p99.
+    """
+    return prognosis_stage_histograms.snapshot()
+
+
+@app.get("/api/health/goal-cache")
+async def goal_cache_health() -> dict:
+    """
+    Goal evaluation cache size and hit/miss counters.
+    """
+    return goal_evaluation_cache.stats()
+
+
 @app.get("/api/fx-rates")
 async def get_fx_rates(
     base: Annotated[str, Query(min_length=3, max_length=3)] = "USD",
@@ -1,12 +1,14 @@
 from models.account import Account
 from models.audit_log import AuditLog
 from models.base import Base
+from models.daily_cashflow import DailyCashflow
 from models.enums import (
     AccountType,
     AuditAction,
     AuditResourceType,
     GoalPriority,
     GoalStatus,
+    JobStatus,
     RecurrenceFrequency,
     RiskAppetite,
     TransactionType,
@@ -15,6 +17,7 @@ from models.fx_rate import FXRate
 from models.goal import Goal
 from models.profile import Profile
 from models.prognosis import PrognosisReport, PrognosisUsage
+from models.prognosis_job import PrognosisJob
 from models.recurrence_rule import RecurrenceRule
 from models.transaction import Transaction
 from models.user import User
@@ -25,11 +28,13 @@ __all__ = [
     "Profile",
     "Account",
     "Transaction",
+    "DailyCashflow",
     "RecurrenceRule",
     "Goal",
     "FXRate",
     "PrognosisReport",
     "PrognosisUsage",
+    "PrognosisJob",
     "AuditLog",
     "AccountType",
     "TransactionType",
@@ -39,4 +44,5 @@ __all__ = [
     "RiskAppetite",
     "AuditAction",
     "AuditResourceType",
+    "JobStatus",
 ]
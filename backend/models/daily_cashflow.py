@@ -0,0 +1,32 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, ForeignKey, Numeric, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+
+class DailyCashflow(Base):
+    """
+    Per-user, per-day and per-currency debit/credit totals of transactions.
+
+    Maintained by delta upserts in the same database transaction as every
+    transaction write (see services.cashflow_service), so cashflow windows read
+    one small row per day instead of scanning raw transactions.
+    """
+
+    __tablename__ = "daily_cashflow"
+
+    user_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+
+    debits: Mapped[Decimal] = mapped_column(Numeric(18, 4), nullable=False, default=0)
+    credits: Mapped[Decimal] = mapped_column(Numeric(18, 4), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
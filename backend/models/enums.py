@@ -47,3 +47,10 @@ class AuditResourceType(StrEnum):
     TRANSACTION = "transaction"
     GOAL = "goal"
     PROFILE = "profile"
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey
+from sqlalchemy import Date, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -37,6 +37,8 @@ class PrognosisUsage(Base):
     """
 
     __tablename__ = "prognosis_usage"
+    # One counter row per user and day, so usage can be upserted atomically
+    __table_args__ = (UniqueConstraint("user_id", "date", name="uq_prognosis_usage_user_id_date"),)
 
     id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
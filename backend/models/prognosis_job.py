@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, generate_uuid
+from models.enums import JobStatus
+
+
+class PrognosisJob(Base):
+    """
+    Queued prognosis generation, claimed by workers with FOR UPDATE SKIP LOCKED.
+
+    A user has at most one queued or running job (partial unique index).
+    """
+
+    __tablename__ = "prognosis_jobs"
+    __table_args__ = (
+        Index("ix_prognosis_jobs_status_created_at", "status", "created_at"),
+        Index(
+            "uq_prognosis_jobs_user_id_active",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status IN ('QUEUED', 'RUNNING')"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=generate_uuid,
+    )
+    user_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus, native_enum=False, length=20),
+        nullable=False,
+        default=JobStatus.QUEUED,
+    )
+    stage: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    progress: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    rate_limited: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,7 +1,7 @@
 from datetime import date
 from decimal import Decimal
 
-from sqlalchemy import Boolean, Date, Enum, ForeignKey, Numeric, String, Text
+from sqlalchemy import Boolean, Date, Enum, ForeignKey, Index, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -15,6 +15,15 @@ class Transaction(Base, TimestampMixin):
     """
 
     __tablename__ = "transactions"
+    # Covers per-user date-range scans (transaction listing, the daily_cashflow backfill) as an index-only scan
+    __table_args__ = (
+        Index(
+            "ix_transactions_user_id_date",
+            "user_id",
+            "date",
+            postgresql_include=["type", "amount", "currency"],
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
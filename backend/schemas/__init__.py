@@ -5,6 +5,7 @@ from schemas.prognosis import (
     AllocationRecommendation,
     GoalEvaluation,
     NarratorOutput,
+    PrognosisJobOut,
     PrognosisReportOut,
     RiskMetrics,
 )
@@ -24,6 +25,7 @@ __all__ = [
     "GoalUpdate",
     "GoalOut",
     "PrognosisReportOut",
+    "PrognosisJobOut",
     "RiskMetrics",
     "GoalEvaluation",
     "AllocationRecommendation",
@@ -1,6 +1,11 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from models.enums import JobStatus, RiskAppetite
+
+# Most variants evaluated by one what-if request
+MAX_WHAT_IF_VARIANTS = 10
 
 
 class PrognosisReportOut(BaseModel):
@@ -12,6 +17,21 @@ class PrognosisReportOut(BaseModel):
         from_attributes = True
 
 
+class PrognosisJobOut(BaseModel):
+    id: str
+    status: JobStatus
+    stage: str | None = None
+    progress: dict[str, str]
+    error: str | None = None
+    rate_limited: bool = False
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
 class RiskMetrics(BaseModel):
     burn_rate: float
     runway_months: float
@@ -27,6 +47,9 @@ class GoalEvaluation(BaseModel):
     status: str
     projected_value: float
     success_probability: float
+    success_interval: list[float] | None = None
+    tail_probability: float | None = None
+    simulations: int | None = None
     goal_pressure: float
     required_monthly_savings: float
     actual_monthly_savings: float
@@ -45,3 +68,36 @@ class NarratorOutput(BaseModel):
     changes_since_last: str
     disclaimer: str
     markdown_body: str | None = None
+
+
+class WhatIfVariant(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    savings_increase_pct: float = Field(
+        default=0.0, ge=-100, le=100, description="Extra monthly savings as a % of monthly income"
+    )
+    goal_delay_months: int = Field(default=0, ge=-120, le=360, description="Move every goal's target date by this")
+    risk_appetite: RiskAppetite | None = None
+
+
+class WhatIfRequest(BaseModel):
+    variants: list[WhatIfVariant] = Field(min_length=1, max_length=MAX_WHAT_IF_VARIANTS)
+
+
+class WhatIfScenario(BaseModel):
+    name: str
+    monthly_savings: float
+    risk_score: int
+    risk_label: str
+    runway_months: float
+    savings_ratio: float
+    goals_on_track: int
+    mean_success_probability: float | None = None
+    allocation: dict[str, float]
+    strategy_action: str
+    goals: list[GoalEvaluation]
+
+
+class WhatIfOut(BaseModel):
+    base_currency: str
+    # The first scenario is the user's current situation ("current"), then the variants in request order
+    scenarios: list[WhatIfScenario]
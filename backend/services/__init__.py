@@ -2,6 +2,7 @@ from services import (
     account_service,
     goal_service,
     profile_service,
+    prognosis_job_service,
     prognosis_service,
     transaction_service,
     user_service,
@@ -13,5 +14,6 @@ __all__ = [
     "transaction_service",
     "goal_service",
     "prognosis_service",
+    "prognosis_job_service",
     "user_service",
 ]
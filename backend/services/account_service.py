@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from agents.goal_cache import goal_evaluation_cache
 from models import Account, AuditAction, AuditResourceType, Transaction
 from schemas.account import AccountCreate, AccountUpdate
 from services.audit_service import log_audit
@@ -65,6 +66,8 @@ async def create_account(db: AsyncSession, user_id: str, payload: AccountCreate)
     )
     await db.commit()
     await db.refresh(account)
+    # Liquid balances feed current savings: the user's goal evaluations are stale
+    goal_evaluation_cache.invalidate_user(user_id)
 
     return account
 
@@ -99,6 +102,8 @@ async def update_account(db: AsyncSession, account_id: str, user_id: str, payloa
 
     await db.commit()
     await db.refresh(account)
+    # Liquid balances feed current savings: the user's goal evaluations are stale
+    goal_evaluation_cache.invalidate_user(user_id)
 
     return account
 
@@ -132,3 +137,4 @@ async def delete_account(db: AsyncSession, account_id: str, user_id: str) -> Non
     )
     await db.delete(account)
     await db.commit()
+    goal_evaluation_cache.invalidate_user(user_id)
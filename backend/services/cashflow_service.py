@@ -0,0 +1,124 @@
+"""
+Daily cashflow rollup: per-user, per-day and per-currency debit/credit totals.
+
+Transaction writes apply their delta to the daily_cashflow row of the
+transaction's user, date and currency in the same database transaction, so the
+prognosis cashflow windows read a few dozen rollup rows instead of every raw
+transaction. The backfill rebuilds rows from the transactions table, e.g. for
+data written outside transaction_service.
+
+Backfill usage:
+    cd backend
+    python -m services.cashflow_service
+    python -m services.cashflow_service --user-id <uuid>
+"""
+
+import argparse
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.logging import get_logger, setup_logging
+from db import SessionLocal, engine
+from models import DailyCashflow, Transaction
+from models.enums import TransactionType
+
+logger = get_logger(__name__)
+
+
+async def apply_cashflow_delta(
+    db: AsyncSession,
+    user_id: str,
+    day: date,
+    currency: str,
+    transaction_type: TransactionType,
+    amount: Decimal,
+    is_reversal: bool = False,
+) -> None:
+    """
+    Add a transaction to (or, with is_reversal, remove it from) its daily rollup row.
+
+    A single INSERT ... ON CONFLICT DO UPDATE adding the delta, so concurrent
+    writes to the same day are summed exactly. Caller is responsible for committing.
+    """
+    sign = -1 if is_reversal else 1
+    debits = amount * sign if transaction_type == TransactionType.DEBIT else Decimal("0")
+    credits = amount * sign if transaction_type == TransactionType.CREDIT else Decimal("0")
+
+    stmt = insert(DailyCashflow).values(
+        user_id=user_id,
+        date=day,
+        currency=currency,
+        debits=debits,
+        credits=credits,
+        count=sign,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyCashflow.user_id, DailyCashflow.date, DailyCashflow.currency],
+        set_={
+            "debits": DailyCashflow.debits + stmt.excluded.debits,
+            "credits": DailyCashflow.credits + stmt.excluded.credits,
+            "count": DailyCashflow.count + stmt.excluded.count,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def backfill_daily_cashflow(db: AsyncSession, user_ids: list[str] | None = None) -> int:
+    """
+    Rebuild the rollup rows of the given users (all users if None) from their transactions.
+
+    Locks daily_cashflow against concurrent deltas first: writers that already
+    applied a delta are committed (and so counted) before the rebuild reads the
+    transactions, and later ones wait and apply theirs on top of it.
+    Caller is responsible for committing, which releases the lock.
+
+    Returns:
+        Number of rollup rows written
+    """
+    await db.execute(text("LOCK TABLE daily_cashflow IN EXCLUSIVE MODE"))
+
+    stale = delete(DailyCashflow)
+    totals = select(
+        Transaction.user_id,
+        Transaction.date,
+        Transaction.currency,
+        func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == TransactionType.DEBIT), 0),
+        func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == TransactionType.CREDIT), 0),
+        func.count(),
+    ).group_by(Transaction.user_id, Transaction.date, Transaction.currency)
+    if user_ids is not None:
+        stale = stale.where(DailyCashflow.user_id.in_(user_ids))
+        totals = totals.where(Transaction.user_id.in_(user_ids))
+
+    await db.execute(stale)
+    result = await db.execute(
+        insert(DailyCashflow).from_select(
+            ["user_id", "date", "currency", "debits", "credits", "count"],
+            totals,
+        )
+    )
+    return result.rowcount
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the daily_cashflow rollup from transactions.")
+    parser.add_argument("--user-id", action="append", dest="user_ids", help="Only this user (repeatable)")
+    args = parser.parse_args()
+
+    try:
+        async with SessionLocal() as db:
+            rows = await backfill_daily_cashflow(db, args.user_ids)
+            await db.commit()
+        logger.info(f"Backfilled {rows} daily cashflow rows")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(_main())
@@ -2,6 +2,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from agents.goal_cache import goal_evaluation_cache
 from models import AuditAction, AuditResourceType, Goal
 from schemas.goal import GoalCreate, GoalUpdate
 from services.audit_service import log_audit
@@ -97,6 +98,7 @@ async def update_goal(db: AsyncSession, goal_id: str, user_id: str, payload: Goa
 
     await db.commit()
     await db.refresh(goal)
+    goal_evaluation_cache.invalidate_goal(goal_id)
 
     return goal
 
@@ -116,3 +118,4 @@ async def delete_goal(db: AsyncSession, goal_id: str, user_id: str) -> None:
     )
     await db.delete(goal)
     await db.commit()
+    goal_evaluation_cache.invalidate_goal(goal_id)
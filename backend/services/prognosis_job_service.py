@@ -0,0 +1,305 @@
+"""
+Postgres-backed job queue for prognosis generation.
+
+Refresh requests enqueue a row in prognosis_jobs and return immediately.
+Workers claim jobs with FOR UPDATE SKIP LOCKED, so any number of workers
+(in-process or standalone) can share the table without a broker.
+
+Standalone worker usage:
+    cd backend
+    python -m services.prognosis_job_service --workers 2
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.logging import get_logger, request_id_var, setup_logging
+from db import SessionLocal
+from models import JobStatus, PrognosisJob
+from services.prognosis_service import PROGNOSIS_STAGES, generate_prognosis
+
+logger = get_logger(__name__)
+
+
+def _stale_cutoff() -> datetime:
+    return datetime.now(UTC) - timedelta(seconds=settings.prognosis_job_stale_after_seconds)
+
+
+async def _active_job(db: AsyncSession, user_id: str) -> PrognosisJob | None:
+    stmt = select(PrognosisJob).where(
+        PrognosisJob.user_id == user_id,
+        PrognosisJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def enqueue_job(db: AsyncSession, user_id: str) -> PrognosisJob:
+    """
+    Queue a prognosis job for a user.
+
+    If the user already has a queued or running job, that job is returned
+    instead of queueing a duplicate (a running job whose worker died is
+    reclaimed by the next worker). A partial unique index enforces this for
+    concurrent requests: the insert is skipped on conflict and the job that
+    won is returned.
+    """
+    existing = await _active_job(db, user_id)
+    if existing:
+        return existing
+
+    stmt = (
+        insert(PrognosisJob)
+        .values(
+            user_id=user_id,
+            status=JobStatus.QUEUED,
+            progress={stage: "pending" for stage in PROGNOSIS_STAGES},
+            created_at=datetime.now(UTC),
+        )
+        .on_conflict_do_nothing(
+            index_elements=[PrognosisJob.user_id],
+            index_where=text("status IN ('QUEUED', 'RUNNING')"),
+        )
+        .returning(PrognosisJob.id)
+    )
+    result = await db.execute(stmt)
+    job_id = result.scalar_one_or_none()
+    await db.commit()
+
+    if job_id is None:
+        return await _active_job(db, user_id)
+    return await db.get(PrognosisJob, job_id)
+
+
+async def get_job(db: AsyncSession, job_id: str, user_id: str) -> PrognosisJob:
+    """
+    Get a specific job, ensuring it belongs to the user.
+    """
+    stmt = select(PrognosisJob).where(PrognosisJob.id == job_id, PrognosisJob.user_id == user_id)
+    result = await db.execute(stmt)
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    return job
+
+
+async def claim_next_job(db: AsyncSession) -> tuple[str, str, int] | None:
+    """
+    Atomically claim the oldest runnable job.
+
+    Runnable means queued, or running with a stale heartbeat (its worker died).
+    Rows locked by other workers are skipped rather than waited on.
+
+    Returns:
+        Tuple of (job_id, user_id, attempts) or None if the queue is empty
+    """
+    now = datetime.now(UTC)
+    next_job = (
+        select(PrognosisJob.id)
+        .where(
+            or_(
+                PrognosisJob.status == JobStatus.QUEUED,
+                (PrognosisJob.status == JobStatus.RUNNING) & (PrognosisJob.heartbeat_at < _stale_cutoff()),
+            )
+        )
+        .order_by(PrognosisJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(PrognosisJob)
+        .where(PrognosisJob.id == next_job)
+        .values(
+            status=JobStatus.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=PrognosisJob.attempts + 1,
+        )
+        .returning(PrognosisJob.id, PrognosisJob.user_id, PrognosisJob.attempts)
+    )
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+    await db.commit()
+
+    return tuple(row) if row else None
+
+
+class JobReclaimedError(Exception):
+    """
+    The job was reclaimed by another worker while this one was still running it.
+    """
+
+
+async def _update_job(db: AsyncSession, job_id: str, attempts: int, **values) -> bool:
+    """
+    Update a job only while this worker's claim (attempts) still holds it running.
+
+    Returns:
+        False if another worker reclaimed the job meanwhile; nothing is written then
+    """
+    result = await db.execute(
+        update(PrognosisJob)
+        .where(
+            PrognosisJob.id == job_id,
+            PrognosisJob.status == JobStatus.RUNNING,
+            PrognosisJob.attempts == attempts,
+        )
+        .values(**values)
+    )
+    await db.commit()
+    if result.rowcount == 0:
+        logger.warning(f"Prognosis job {job_id} attempt {attempts} was reclaimed by another worker, skipping update")
+        return False
+    return True
+
+
+async def _send_heartbeats(job_id: str, attempts: int) -> None:
+    """
+    Refresh a running job's heartbeat every prognosis_job_heartbeat_interval seconds until cancelled.
+
+    Keeps long stages (e.g. the LLM call) from looking stale to other workers.
+    Uses its own session, since stage updates use the job session concurrently,
+    and only refreshes this claim (attempts), not a later reclaim of the job.
+    """
+    async with SessionLocal() as db:
+        while True:
+            await asyncio.sleep(settings.prognosis_job_heartbeat_interval)
+            try:
+                if not await _update_job(db, job_id, attempts, heartbeat_at=datetime.now(UTC)):
+                    return
+            except Exception as e:
+                logger.warning(f"Prognosis job {job_id} heartbeat failed: {e}")
+                await db.rollback()
+
+
+async def process_job(job_id: str, user_id: str, attempts: int) -> None:
+    """
+    Run the prognosis pipeline for a claimed job, recording per-stage progress.
+
+    Every job update is scoped to this claim (attempts): if another worker
+    reclaimed the job, this one stops at the next stage boundary, and a
+    result it already produced is not written over the newer attempt's status.
+    """
+    # Jobs run outside any HTTP request, so correlate their logs by job id
+    request_id_var.set(f"job-{job_id}")
+    async with SessionLocal() as job_db, SessionLocal() as db:
+        if attempts > settings.prognosis_job_max_attempts:
+            await _update_job(
+                job_db,
+                job_id,
+                attempts,
+                status=JobStatus.FAILED,
+                error="Exceeded maximum attempts",
+                finished_at=datetime.now(UTC),
+            )
+            return
+
+        progress = {stage: "pending" for stage in PROGNOSIS_STAGES}
+
+        async def on_stage(stage: str) -> None:
+            for done in PROGNOSIS_STAGES[: PROGNOSIS_STAGES.index(stage)]:
+                progress[done] = "done"
+            progress[stage] = "running"
+            updated = await _update_job(
+                job_db, job_id, attempts, stage=stage, progress=dict(progress), heartbeat_at=datetime.now(UTC)
+            )
+            if not updated:
+                # Stop before the next stage; generate_prognosis releases its usage slot
+                raise JobReclaimedError(job_id)
+
+        heartbeat = asyncio.create_task(_send_heartbeats(job_id, attempts))
+        try:
+            result = await generate_prognosis(db, user_id, on_stage=on_stage)
+        except JobReclaimedError:
+            return
+        except HTTPException as e:
+            await _update_job(
+                job_db,
+                job_id,
+                attempts,
+                status=JobStatus.FAILED,
+                error=str(e.detail),
+                finished_at=datetime.now(UTC),
+            )
+            return
+        except Exception as e:
+            logger.error(f"Prognosis job {job_id} failed: {e}")
+            await _update_job(
+                job_db,
+                job_id,
+                attempts,
+                status=JobStatus.FAILED,
+                error="Prognosis generation failed",
+                finished_at=datetime.now(UTC),
+            )
+            return
+        finally:
+            heartbeat.cancel()
+
+        if not result["rate_limited"]:
+            progress = {stage: "done" for stage in PROGNOSIS_STAGES}
+
+        await _update_job(
+            job_db,
+            job_id,
+            attempts,
+            status=JobStatus.SUCCEEDED,
+            stage=None,
+            progress=progress,
+            rate_limited=result["rate_limited"],
+            finished_at=datetime.now(UTC),
+        )
+
+
+async def run_worker(worker_id: int = 0) -> None:
+    """
+    Poll the job table forever, processing one job at a time.
+    """
+    logger.info(f"Prognosis worker {worker_id} started")
+    while True:
+        try:
+            async with SessionLocal() as db:
+                claimed = await claim_next_job(db)
+        except Exception as e:
+            logger.error(f"Prognosis worker {worker_id} failed to claim a job: {e}")
+            claimed = None
+
+        if not claimed:
+            await asyncio.sleep(settings.prognosis_job_poll_interval)
+            continue
+
+        job_id, user_id, attempts = claimed
+        await process_job(job_id, user_id, attempts)
+
+
+def start_workers(count: int) -> list[asyncio.Task]:
+    """
+    Start in-process worker tasks on the running event loop.
+    """
+    return [asyncio.create_task(run_worker(i)) for i in range(count)]
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Run standalone prognosis job workers.")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    await asyncio.gather(*start_workers(args.workers))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(_main())
@@ -1,72 +1,92 @@
-from datetime import UTC, datetime, timedelta
+import asyncio
+import hashlib
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
+from typing import Any
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Integer, String, case, cast, func, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from agents.goal_agent import evaluate_goals
-from agents.investment_agent import recommend_allocation
-from agents.risk_agent import compute_risk_metrics
-from agents.strategy_agent import StrategyAgent
+from agents.model_registry import model_registry
+from agents.pipeline import (
+    AGENT_STAGES,
+    CASHFLOW_WINDOW_DAYS,
+    MONTHLY_WINDOW_DAYS,
+    build_narrator_input,
+    iter_agent_pipeline,
+    prepare_agent_inputs,
+    run_what_if_scenarios,
+)
+from agents.report_delta import compute_previous_report_delta, extract_key_metrics
 from core.config import settings
-from core.logging import get_logger
-from integrations.llm_client import generate_prognosis_report
+from core.logging import get_logger, request_id_var
+from core.metrics import StageTimer, prognosis_stage_histograms
+from db import SessionLocal
+from integrations.fx_client import get_rates_to_base
+from integrations.llm_client import NARRATIVE_FALLBACK, generate_prognosis_report, llm_configured
 from integrations.market_client import get_macro_state
-from models import Account, Goal, Profile, PrognosisReport, PrognosisUsage, Transaction
-from models.enums import AccountType, TransactionType
+from models import Account, DailyCashflow, Goal, Profile, PrognosisReport, PrognosisUsage
+from models.enums import AccountType, GoalPriority, RiskAppetite
 
 logger = get_logger(__name__)
 
+# Pipeline stages reported to progress callbacks, in execution order
+PROGNOSIS_STAGES = (*AGENT_STAGES, "narrative")
 
-async def check_rate_limit(db: AsyncSession, user_id: str) -> tuple[bool, int]:
-    """
-    Check if user has exceeded rate limit for prognosis generation.
-
-    Returns:
-        Tuple of (is_limited, current_count)
-    """
-    if not settings.prognosis_rate_limit_enabled:
-        return False, 0
+# Converted amounts keep the scale of the Numeric(18, 4) columns they come from
+FX_AMOUNT_QUANTUM = Decimal("0.0001")
 
-    today = datetime.now(UTC).date()
+StageCallback = Callable[[str], Awaitable[None]]
+ResultCallback = Callable[[str, Any], Awaitable[None]]
 
-    stmt = select(PrognosisUsage).where(
-        PrognosisUsage.user_id == user_id,
-        PrognosisUsage.date == today,
-    )
-    result = await db.execute(stmt)
-    usage = result.scalar_one_or_none()
-
-    if not usage:
-        return False, 0
 
-    return usage.count >= settings.prognosis_max_requests_per_day, usage.count
+async def reserve_usage(db: AsyncSession, user_id: str, day: date) -> tuple[bool, int]:
+    """
+    Count a prognosis generation against a day's limit in a single statement.
 
+    Runs INSERT ... ON CONFLICT (user_id, date) DO UPDATE ... RETURNING count,
+    where the update only applies while the count is below the daily limit; no
+    returned row means the limit is already reached. The usage row stays locked
+    until the caller commits, so concurrent refreshes are counted exactly; commit
+    right away and undo a failed generation with release_usage, rather than
+    holding the lock through it.
 
-async def increment_usage(db: AsyncSession, user_id: str) -> None:
+    Returns:
+        Tuple of (is_limited, current_count)
     """
-    Increment the prognosis usage count for today.
+    stmt = insert(PrognosisUsage).values(user_id=user_id, date=day, count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PrognosisUsage.user_id, PrognosisUsage.date],
+        set_={"count": PrognosisUsage.count + 1},
+        where=(
+            PrognosisUsage.count < settings.prognosis_max_requests_per_day
+            if settings.prognosis_rate_limit_enabled
+            else None
+        ),
+    ).returning(PrognosisUsage.count)
+
+    count = (await db.execute(stmt)).scalar_one_or_none()
+    if count is None:
+        return True, settings.prognosis_max_requests_per_day
+    return False, count
+
+
+async def release_usage(db: AsyncSession, user_id: str, day: date) -> None:
     """
-    today = datetime.now(UTC).date()
+    Give back a slot claimed (and committed) by reserve_usage, e.g. when generation failed.
 
-    stmt = select(PrognosisUsage).where(
-        PrognosisUsage.user_id == user_id,
-        PrognosisUsage.date == today,
+    A compensating decrement in its own transaction, so it also applies after
+    the generation's transaction was rolled back.
+    """
+    await db.execute(
+        update(PrognosisUsage)
+        .where(PrognosisUsage.user_id == user_id, PrognosisUsage.date == day, PrognosisUsage.count > 0)
+        .values(count=PrognosisUsage.count - 1)
     )
-    result = await db.execute(stmt)
-    usage = result.scalar_one_or_none()
-
-    if usage:
-        usage.count += 1
-    else:
-        usage = PrognosisUsage(
-            user_id=user_id,
-            date=today,
-            count=1,
-        )
-        db.add(usage)
-
     await db.commit()
 
 
@@ -88,192 +108,658 @@ async def get_cached_report(db: AsyncSession, user_id: str) -> dict | None:
     }
 
 
-async def generate_prognosis(db: AsyncSession, user_id: str) -> dict:
+def build_cashflow_query(user_ids: list[str], today: date):
     """
-    Generate a new prognosis report for a user.
+    Build the query that aggregates the users' recent cashflow in the database.
+
+    Reads the daily_cashflow rollup (at most CASHFLOW_WINDOW_DAYS rows per user
+    and currency) rather than the raw transactions. Yields one
+    (user_id, 'cashflow', payload) row per user, window and currency, where the
+    window is MONTHLY_WINDOW_DAYS for the most recent month and
+    CASHFLOW_WINDOW_DAYS for the older remainder of the risk window. Payload
+    holds debit and credit sums (as text, to keep exact Decimals) and the
+    transaction count.
     """
-    is_limited, count = await check_rate_limit(db, user_id)
-    if is_limited:
-        cached = await get_cached_report(db, user_id)
-        if cached:
-            cached["rate_limited"] = True
-            return cached
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=(f"Rate limit exceeded. Maximum {settings.prognosis_max_requests_per_day} reports per day."),
+    recent_cutoff = today - timedelta(days=MONTHLY_WINDOW_DAYS)
+    windowed = (
+        select(
+            DailyCashflow.user_id,
+            DailyCashflow.currency,
+            DailyCashflow.debits,
+            DailyCashflow.credits,
+            DailyCashflow.count,
+            case(
+                (DailyCashflow.date >= recent_cutoff, MONTHLY_WINDOW_DAYS),
+                else_=CASHFLOW_WINDOW_DAYS,
+            ).label("window_days"),
         )
-
-    stmt = select(Profile).where(Profile.user_id == user_id)
-    result = await db.execute(stmt)
-    profile = result.scalar_one_or_none()
-
-    if not profile:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Profile not found. Please create a profile first.",
+        .where(
+            DailyCashflow.user_id.in_(user_ids),
+            DailyCashflow.date >= today - timedelta(days=CASHFLOW_WINDOW_DAYS),
         )
+        .subquery()
+    )
 
-    stmt = select(Account).where(Account.user_id == user_id)
-    result = await db.execute(stmt)
-    accounts = list(result.scalars().all())
-
-    cutoff_date = datetime.now(UTC).date() - timedelta(days=60)
-    stmt = select(Transaction).where(
-        Transaction.user_id == user_id,
-        Transaction.date >= cutoff_date,
+    return (
+        select(
+            windowed.c.user_id.label("user_id"),
+            literal("cashflow").label("kind"),
+            func.jsonb_build_object(
+                "window_days",
+                cast(windowed.c.window_days, Integer),
+                "currency",
+                windowed.c.currency,
+                "debits",
+                cast(func.sum(windowed.c.debits), String),
+                "credits",
+                cast(func.sum(windowed.c.credits), String),
+                "count",
+                cast(func.sum(windowed.c.count), Integer),
+                type_=JSONB,
+            ).label("payload"),
+        )
+        .group_by(windowed.c.user_id, windowed.c.window_days, windowed.c.currency)
+        # Days whose transactions were all deleted keep an all-zero row
+        .having(func.sum(windowed.c.count) > 0)
     )
-    result = await db.execute(stmt)
-    transactions = list(result.scalars().all())
 
-    stmt = select(Goal).where(Goal.user_id == user_id)
-    result = await db.execute(stmt)
-    goals = list(result.scalars().all())
 
-    liquid_accounts = [
-        {
-            "id": str(acc.id),
-            "balance": float(acc.balance),
-            "currency": acc.currency,
-        }
-        for acc in accounts
-        if acc.type in [AccountType.BANK, AccountType.CASH]
-    ]
-
-    transaction_dicts = [
-        {
-            "id": str(tx.id),
-            "amount": float(tx.amount),
-            "type": tx.type.value,
-            "date": tx.date,
-            "currency": tx.currency,
-        }
-        for tx in transactions
-    ]
-
-    # Calculate monthly income and savings first
-    monthly_debits = Decimal("0")
-    monthly_credits = Decimal("0")
-    last_30_days = datetime.now(UTC).date() - timedelta(days=30)
-
-    for tx in transactions:
-        if tx.date >= last_30_days:
-            if tx.type == TransactionType.DEBIT:
-                monthly_debits += tx.amount
-            elif tx.type == TransactionType.CREDIT:
-                monthly_credits += tx.amount
-
-    monthly_income = float(monthly_credits)
-    monthly_savings = float(monthly_credits - monthly_debits)
-
-    # Compute risk metrics with monthly income
-    risk_metrics = compute_risk_metrics(
-        transaction_dicts,
-        liquid_accounts,
-        profile.base_currency,
-        monthly_income=monthly_income,
-    )
+def _build_inputs_query(user_ids: list[str], today: date):
+    """
+    Build the UNION ALL query that fetches every prognosis input for the given users.
 
-    goal_dicts = [
-        {
-            "id": str(g.id),
-            "name": g.name,
-            "target_amount": float(g.target_amount),
-            "target_date": g.target_date,
-            "priority": g.priority.value,
-        }
-        for g in goals
-    ]
-
-    # Calculate total current savings (sum of liquid accounts)
-    total_current_savings = sum(acc.get("balance", 0) for acc in liquid_accounts)
-
-    goal_evaluations = evaluate_goals(
-        goal_dicts,
-        monthly_savings,
-        profile.base_currency,
-        current_savings=total_current_savings,
-        expected_return=0.07,  # 7% default annual return
-    )
+    Each branch yields (user_id, kind, payload) where payload is a JSONB object, so
+    rows of different shapes can travel in a single result set. Numeric
+    columns are cast to text to keep their exact Decimal value.
+    """
+    profile_q = select(
+        Profile.user_id.label("user_id"),
+        literal("profile").label("kind"),
+        func.jsonb_build_object(
+            "age",
+            Profile.age,
+            "base_currency",
+            Profile.base_currency,
+            "risk_appetite",
+            cast(Profile.risk_appetite, String),
+            type_=JSONB,
+        ).label("payload"),
+    ).where(Profile.user_id.in_(user_ids))
+
+    account_q = select(
+        Account.user_id.label("user_id"),
+        literal("account").label("kind"),
+        func.jsonb_build_object(
+            "id",
+            Account.id,
+            "type",
+            cast(Account.type, String),
+            "balance",
+            cast(Account.balance, String),
+            "currency",
+            Account.currency,
+            type_=JSONB,
+        ).label("payload"),
+    ).where(Account.user_id.in_(user_ids))
+
+    cashflow_q = build_cashflow_query(user_ids, today)
+
+    goal_q = select(
+        Goal.user_id.label("user_id"),
+        literal("goal").label("kind"),
+        func.jsonb_build_object(
+            "id",
+            Goal.id,
+            "name",
+            Goal.name,
+            "target_amount",
+            cast(Goal.target_amount, String),
+            "target_currency",
+            Goal.target_currency,
+            "target_date",
+            Goal.target_date,
+            "priority",
+            cast(Goal.priority, String),
+            type_=JSONB,
+        ).label("payload"),
+    ).where(Goal.user_id.in_(user_ids))
+
+    report_q = select(
+        PrognosisReport.user_id.label("user_id"),
+        literal("previous_report").label("kind"),
+        func.jsonb_build_object(
+            "report_json",
+            PrognosisReport.report_json,
+            "fingerprint",
+            PrognosisReport.inputs_snapshot["fingerprint"],
+            "key_metrics",
+            PrognosisReport.inputs_snapshot["key_metrics"],
+            "narrative_source",
+            PrognosisReport.inputs_snapshot["narrative_source"],
+            "generated_at",
+            PrognosisReport.generated_at,
+            type_=JSONB,
+        ).label("payload"),
+    ).where(PrognosisReport.user_id.in_(user_ids))
+
+    return union_all(profile_q, account_q, cashflow_q, goal_q, report_q)
+
+
+def _empty_inputs() -> dict:
+    return {
+        "profile": None,
+        "accounts": [],
+        "cashflow": [],
+        "goals": [],
+        "previous_report": None,
+    }
 
-    macro_state = await get_macro_state()
 
-    # Calculate goal time horizon (years to nearest goal)
-    goal_time_horizon = 10  # Default
-    if goals:
-        nearest_goal_months = min(
-            max(
-                1,
-                (g.target_date.year - datetime.now(UTC).year) * 12 + (g.target_date.month - datetime.now(UTC).month),
+async def load_prognosis_inputs_bulk(db: AsyncSession, user_ids: list[str]) -> dict[str, dict]:
+    """
+    Load the prognosis input bundles for many users in one round trip.
+
+    Returns:
+        Dict mapping each user id to its bundle (see load_prognosis_inputs)
+    """
+    result = await db.execute(_build_inputs_query(user_ids, datetime.now(UTC).date()))
+
+    bundles = {user_id: _empty_inputs() for user_id in user_ids}
+
+    for user_id, kind, payload in result.all():
+        inputs = bundles[str(user_id)]
+        if kind == "profile":
+            inputs["profile"] = {
+                "age": payload["age"],
+                "base_currency": payload["base_currency"],
+                "risk_appetite": RiskAppetite[payload["risk_appetite"]],
+            }
+        elif kind == "account":
+            inputs["accounts"].append(
+                {
+                    "id": str(payload["id"]),
+                    "type": AccountType[payload["type"]],
+                    "balance": Decimal(payload["balance"]),
+                    "currency": payload["currency"],
+                }
+            )
+        elif kind == "cashflow":
+            inputs["cashflow"].append(
+                {
+                    "window_days": payload["window_days"],
+                    "currency": payload["currency"],
+                    "debits": Decimal(payload["debits"]),
+                    "credits": Decimal(payload["credits"]),
+                    "count": payload["count"],
+                }
             )
-            for g in goals
+        elif kind == "goal":
+            inputs["goals"].append(
+                {
+                    "id": str(payload["id"]),
+                    "name": payload["name"],
+                    "target_amount": Decimal(payload["target_amount"]),
+                    "target_currency": payload["target_currency"],
+                    "target_date": date.fromisoformat(payload["target_date"]),
+                    "priority": GoalPriority[payload["priority"]],
+                }
+            )
+        elif kind == "previous_report":
+            inputs["previous_report"] = {
+                "report_json": payload["report_json"],
+                "fingerprint": payload["fingerprint"],
+                "key_metrics": payload["key_metrics"],
+                "narrative_source": payload["narrative_source"],
+                "generated_at": datetime.fromisoformat(payload["generated_at"]),
+            }
+
+    return bundles
+
+
+async def load_prognosis_inputs(db: AsyncSession, user_id: str) -> dict:
+    """
+    Load the full per-user input bundle for the prognosis pipeline in one round trip.
+
+    Returns:
+        Dict with 'profile' (or None), 'accounts', 'cashflow' (debit/credit
+        totals of the last 60 days, see build_cashflow_query), 'goals' and
+        'previous_report' (the cached report's report_json, input fingerprint,
+        key_metrics and generated_at, or None).
+        Amounts are Decimals in their own currencies (see convert_inputs_to_base),
+        dates are date objects and enum columns are mapped back to their enum
+        members, mirroring the ORM attributes.
+    """
+    bundles = await load_prognosis_inputs_bulk(db, [user_id])
+    return bundles[user_id]
+
+
+def convert_inputs_to_base(inputs: dict, rates: dict[str, Decimal]) -> dict:
+    """
+    Copy of an input bundle with every amount in the profile's base currency.
+
+    Account balances, cashflow totals and goal targets are divided by their
+    currency's rate (see fx_client.get_rates_to_base) and rounded to
+    FX_AMOUNT_QUANTUM. Cashflow rows of one window are merged into a single
+    base-currency row, so the agents sum like amounts only.
+    """
+    base_currency = inputs["profile"]["base_currency"]
+
+    def to_base(amount: Decimal, currency: str) -> Decimal:
+        if currency == base_currency:
+            return amount
+        return (amount / rates[currency]).quantize(FX_AMOUNT_QUANTUM)
+
+    cashflow: dict[int, dict] = {}
+    for row in inputs["cashflow"]:
+        window = cashflow.setdefault(
+            row["window_days"],
+            {
+                "window_days": row["window_days"],
+                "currency": base_currency,
+                "debits": Decimal("0"),
+                "credits": Decimal("0"),
+                "count": 0,
+            },
         )
-        goal_time_horizon = max(1, nearest_goal_months // 12)
-
-    allocation = recommend_allocation(
-        risk_metrics["risk_score"],
-        profile.risk_appetite.value,
-        goal_evaluations,
-        macro_state,
-        age=profile.age,
-        goal_time_horizon=goal_time_horizon,
-    )
+        window["debits"] += to_base(row["debits"], row["currency"])
+        window["credits"] += to_base(row["credits"], row["currency"])
+        window["count"] += row["count"]
 
-    # Run strategy agent (RL or heuristic fallback)
-    strategy_agent = StrategyAgent(model_path=settings.model_path)
-    savings_rate = risk_metrics.get("savings_ratio", 0.0)
-    strategy = strategy_agent.get_strategy(risk_metrics, goal_evaluations, allocation, savings_rate)
+    return {
+        **inputs,
+        "accounts": [
+            {**acc, "balance": to_base(acc["balance"], acc["currency"]), "currency": base_currency}
+            for acc in inputs["accounts"]
+        ],
+        "cashflow": list(cashflow.values()),
+        "goals": [
+            {
+                **goal,
+                "target_amount": to_base(goal["target_amount"], goal["target_currency"]),
+                "target_currency": base_currency,
+            }
+            for goal in inputs["goals"]
+        ],
+    }
 
-    stmt = select(PrognosisReport).where(PrognosisReport.user_id == user_id)
-    result = await db.execute(stmt)
-    previous_report = result.scalar_one_or_none()
 
-    narrator_input = {
-        "profile": {
-            "age": profile.age,
-            "base_currency": profile.base_currency,
-            "risk_appetite": profile.risk_appetite.value,
-        },
-        "risk": risk_metrics,
-        "goals": goal_evaluations,
-        "allocation": allocation,
-        "strategy": strategy,
-        "accounts_summary": {
-            "num_accounts": len(accounts),
-            "num_transactions": len(transactions),
-            "total_balance": float(sum(acc.balance for acc in accounts)),
-            "monthly_income": monthly_income,
-            "monthly_expenses": float(monthly_debits),
+async def convert_bundles_to_base(db: AsyncSession, bundles: dict[str, dict]) -> dict[str, dict]:
+    """
+    Convert loaded input bundles to each user's base currency.
+
+    The rate table of every distinct base currency is fetched once for all the
+    bundles, rather than once per converted row. Bundles without a profile
+    (no base currency) are returned unchanged.
+    """
+    currencies: dict[str, set[str]] = {}
+    for inputs in bundles.values():
+        if inputs["profile"]:
+            needed = currencies.setdefault(inputs["profile"]["base_currency"], set())
+            needed.update(acc["currency"] for acc in inputs["accounts"])
+            needed.update(row["currency"] for row in inputs["cashflow"])
+            needed.update(goal["target_currency"] for goal in inputs["goals"])
+
+    rate_tables = {base: await get_rates_to_base(db, base, needed) for base, needed in currencies.items()}
+
+    return {
+        user_id: convert_inputs_to_base(inputs, rate_tables[inputs["profile"]["base_currency"]])
+        if inputs["profile"]
+        else inputs
+        for user_id, inputs in bundles.items()
+    }
+
+
+def compute_inputs_fingerprint(inputs: dict, macro_state: str, model_version: str | None) -> str:
+    """
+    Canonical SHA-256 of everything that determines a report's content.
+
+    Covers the profile, accounts and goals (sorted by id so row order does not
+    matter), the cashflow totals, the macro state, the strategy model version, the
+    goal simulation settings and today's date, since goal horizons and cashflow
+    windows are date-relative. The previous report is deliberately excluded.
+    """
+    canonical = {
+        "date": datetime.now(UTC).date(),
+        "profile": inputs["profile"],
+        "accounts": sorted(inputs["accounts"], key=lambda acc: acc["id"]),
+        "cashflow": sorted(inputs["cashflow"], key=lambda row: (row["window_days"], row["currency"])),
+        "goals": sorted(inputs["goals"], key=lambda g: g["id"]),
+        "macro_state": macro_state,
+        "model_version": model_version,
+        "goal_simulation": {
+            "model": settings.goal_simulation_model,
+            "paths": settings.goal_simulation_paths,
+            "sampler": settings.goal_simulation_sampler,
+            "seed": settings.goal_simulation_seed,
+            "batch_size": settings.goal_simulation_batch_size,
+            "tail_paths": settings.goal_simulation_tail_paths,
         },
-        "previous_report": previous_report.report_json if previous_report else None,
     }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
 
-    report_json = await generate_prognosis_report(narrator_input)
 
-    inputs_snapshot = {
-        "accounts_count": len(accounts),
-        "transactions_count": len(transactions),
-        "goals_count": len(goals),
+def is_reusable_report(previous_report: dict | None, fingerprint: str, use_llm: bool = True) -> bool:
+    """
+    Whether a stored report can be returned as-is instead of generating a new one.
+
+    Its input fingerprint must match. A template (fallback) narrative is only
+    final while no LLM narrative can be had: with use_llm and the LLM configured,
+    the next refresh tries the LLM again. Reports saved before the narrative
+    source was recorded count as final.
+    """
+    if not previous_report or previous_report["fingerprint"] != fingerprint:
+        return False
+    return not (use_llm and llm_configured() and previous_report.get("narrative_source") == NARRATIVE_FALLBACK)
+
+
+def build_inputs_snapshot(
+    inputs: dict,
+    fingerprint: str,
+    key_metrics: dict,
+    narrative_source: str,
+    timings_ms: dict | None = None,
+) -> dict:
+    """
+    Summary of the inputs a report was generated from, stored alongside it.
+
+    Args:
+        key_metrics: Metrics the next report is compared against (see report_delta)
+        narrative_source: llm_client.NARRATIVE_LLM or NARRATIVE_FALLBACK (see is_reusable_report)
+        timings_ms: Optional per-stage durations of the run that produced the report
+    """
+    snapshot = {
+        "accounts_count": len(inputs["accounts"]),
+        "transactions_count": sum(row["count"] for row in inputs["cashflow"]),
+        "goals_count": len(inputs["goals"]),
         "generated_at": datetime.now(UTC).isoformat(),
+        "fingerprint": fingerprint,
+        "key_metrics": key_metrics,
+        "narrative_source": narrative_source,
     }
+    if timings_ms is not None:
+        snapshot["timings_ms"] = timings_ms
+    return snapshot
+
+
+def _log_timings(user_id: str, timer: StageTimer, outcome: str) -> None:
+    stages = " ".join(f"{stage}={ms:.1f}" for stage, ms in timer.timings_ms.items())
+    logger.info(
+        f"Prognosis timings request_id={request_id_var.get()} user={user_id} outcome={outcome} "
+        f"total_ms={timer.total_ms():.1f} {stages}"
+    )
+
+
+async def save_reports(db: AsyncSession, reports: list[dict]) -> datetime:
+    """
+    Insert or replace cached prognosis reports in a single statement.
+
+    Args:
+        reports: Dicts with 'user_id', 'report_json' and 'inputs_snapshot'
+
+    Uses the unique user_id constraint so the write needs no prior read.
+    Caller is responsible for committing.
+
+    Returns:
+        The generated_at timestamp written for every report
+    """
+    generated_at = datetime.now(UTC)
+    stmt = insert(PrognosisReport).values(
+        [
+            {
+                "user_id": report["user_id"],
+                "report_json": report["report_json"],
+                "inputs_snapshot": report["inputs_snapshot"],
+                "generated_at": generated_at,
+            }
+            for report in reports
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PrognosisReport.user_id],
+        set_={
+            "report_json": stmt.excluded.report_json,
+            "inputs_snapshot": stmt.excluded.inputs_snapshot,
+            "generated_at": stmt.excluded.generated_at,
+        },
+    )
+    await db.execute(stmt)
+    return generated_at
 
-    if previous_report:
-        previous_report.report_json = report_json
-        previous_report.inputs_snapshot = inputs_snapshot
-        previous_report.generated_at = datetime.now(UTC)
-    else:
-        new_report = PrognosisReport(
-            user_id=user_id,
-            report_json=report_json,
-            inputs_snapshot=inputs_snapshot,
-            generated_at=datetime.now(UTC),
+
+async def save_report(db: AsyncSession, user_id: str, report_json: dict, inputs_snapshot: dict) -> datetime:
+    """
+    Insert or replace the cached prognosis report for a user.
+
+    Caller is responsible for committing.
+    """
+    return await save_reports(
+        db,
+        [{"user_id": user_id, "report_json": report_json, "inputs_snapshot": inputs_snapshot}],
+    )
+
+
+async def generate_prognosis(
+    db: AsyncSession,
+    user_id: str,
+    on_stage: StageCallback | None = None,
+    on_result: ResultCallback | None = None,
+) -> dict:
+    """
+    Generate a new prognosis report for a user.
+
+    If given, on_stage is awaited with each name in PROGNOSIS_STAGES as that
+    stage starts, so callers (e.g. the job worker) can report progress.
+    If given, on_result is awaited with (stage, result) as each deterministic
+    stage finishes, and with ("narrative", {"section", "content"}) for each
+    narrative section as the LLM produces it.
+
+    Per-stage wall-clock timings (load, fx, each agent, narrative, save) are
+    logged with the request id, observed in prognosis_stage_histograms and
+    stored in the report's inputs_snapshot (all stages up to the save).
+    """
+    timer = StageTimer(prognosis_stage_histograms)
+
+    async def enter_stage(stage: str) -> None:
+        if on_stage:
+            await on_stage(stage)
+
+    async def emit_result(stage: str, result: Any) -> None:
+        if on_result:
+            await on_result(stage, result)
+
+    async def emit_section(section: str, content: Any) -> None:
+        await emit_result("narrative", {"section": section, "content": content})
+
+    with timer.measure("load"):
+        inputs, macro_state = await asyncio.gather(
+            load_prognosis_inputs(db, user_id),
+            get_macro_state(),
         )
-        db.add(new_report)
 
-    await increment_usage(db, user_id)
+    profile = inputs["profile"]
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Profile not found. Please create a profile first.",
+        )
+
+    # Accounts, cashflow and goals may be in any currency; the agents need base-currency totals
+    with timer.measure("fx"):
+        inputs = (await convert_bundles_to_base(db, {user_id: inputs}))[user_id]
+
+    # Unchanged inputs reproduce the stored report, so skip the pipeline, the
+    # LLM call and the rate-limit slot entirely (unless it has a fallback narrative
+    # the LLM can now replace)
+    model_registry.get_agent(settings.model_path)
+    fingerprint = compute_inputs_fingerprint(inputs, macro_state, model_registry.version)
+    previous_report = inputs["previous_report"]
+    if is_reusable_report(previous_report, fingerprint):
+        logger.info(f"Prognosis inputs unchanged for user {user_id}, returning stored report")
+        _log_timings(user_id, timer, "unchanged")
+        return {
+            "report_json": previous_report["report_json"],
+            "generated_at": previous_report["generated_at"],
+            "rate_limited": False,
+        }
+
+    # Claims today's usage slot up front and commits it at once, so a concurrent
+    # refresh is counted without waiting on the usage row through the LLM call
+    usage_day = datetime.now(UTC).date()
+    is_limited, count = await reserve_usage(db, user_id, usage_day)
     await db.commit()
+    if is_limited:
+        if previous_report:
+            return {
+                "report_json": previous_report["report_json"],
+                "generated_at": previous_report["generated_at"],
+                "rate_limited": True,
+            }
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(f"Rate limit exceeded. Maximum {settings.prognosis_max_requests_per_day} reports per day."),
+        )
+
+    try:
+        agent_inputs = prepare_agent_inputs(inputs)
+
+        outputs = {}
+        pipeline = iter_agent_pipeline(profile, agent_inputs, macro_state, user_id=user_id)
+        for stage in AGENT_STAGES:
+            await enter_stage(stage)
+            # The pipeline is lazy, so each next() runs exactly one agent
+            with timer.measure(stage):
+                _, outputs[stage] = next(pipeline)
+            await emit_result(stage, outputs[stage])
+
+        # The narrator sees only what changed since the last report, not the whole report
+        key_metrics = extract_key_metrics(agent_inputs, outputs)
+        changes = compute_previous_report_delta(previous_report, key_metrics)
+        narrator_input = build_narrator_input(profile, agent_inputs, outputs, changes)
+
+        await enter_stage("narrative")
+        with timer.measure("narrative"):
+            report_json, narrative_source = await generate_prognosis_report(
+                narrator_input, on_section=emit_section if on_result else None
+            )
+
+        inputs_snapshot = build_inputs_snapshot(
+            inputs, fingerprint, key_metrics, narrative_source, timings_ms=dict(timer.timings_ms)
+        )
+
+        with timer.measure("save"):
+            generated_at = await save_report(db, user_id, report_json, inputs_snapshot)
+            await db.commit()
+    except BaseException:
+        # Including cancellation (a stream client went away): nothing was saved, so give the slot back
+        try:
+            await db.rollback()
+            await release_usage(db, user_id, usage_day)
+        except Exception as e:
+            logger.error(f"Failed to release prognosis usage slot for user {user_id}: {e}")
+        raise
+
+    prognosis_stage_histograms.observe("total", timer.total_ms())
+    _log_timings(user_id, timer, "generated")
 
     return {
         "report_json": report_json,
-        "generated_at": datetime.now(UTC),
+        "generated_at": generated_at,
         "rate_limited": False,
     }
+
+
+async def run_what_if(db: AsyncSession, user_id: str, variants: list[dict]) -> dict:
+    """
+    Compare the user's current situation with what-if variants (see pipeline.apply_what_if).
+
+    Inputs are loaded and converted to base currency once, and every variant
+    plus the unchanged baseline ("current") runs through the deterministic
+    agents in one batched pass. There is no narrative, so no LLM call, no
+    rate-limit slot and nothing is saved.
+
+    Returns:
+        Dict with base_currency and one comparison row per scenario, baseline first
+    """
+    inputs, macro_state = await asyncio.gather(
+        load_prognosis_inputs(db, user_id),
+        get_macro_state(),
+    )
+
+    profile = inputs["profile"]
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Profile not found. Please create a profile first.",
+        )
+
+    inputs = (await convert_bundles_to_base(db, {user_id: inputs}))[user_id]
+    agent_inputs = prepare_agent_inputs(inputs)
+
+    variants = [{"name": "current"}, *variants]
+    outputs = run_what_if_scenarios(profile, agent_inputs, macro_state, variants, user_id=user_id)
+
+    scenarios = []
+    for variant, output in zip(variants, outputs, strict=True):
+        risk, goals = output["risk"], output["goals"]
+        scenarios.append(
+            {
+                "name": variant["name"],
+                "monthly_savings": round(output["monthly_savings"], 2),
+                "risk_score": risk["risk_score"],
+                "risk_label": risk["risk_label"],
+                # The no-transactions path reports infinite runway, which JSON cannot store
+                "runway_months": min(risk["runway_months"], 999.9),
+                "savings_ratio": risk["savings_ratio"],
+                "goals_on_track": sum(goal["status"] == "on_track" for goal in goals),
+                "mean_success_probability": (
+                    round(sum(goal["success_probability"] for goal in goals) / len(goals), 2) if goals else None
+                ),
+                "allocation": output["allocation"]["recommended"],
+                "strategy_action": output["strategy"]["action"],
+                "goals": goals,
+            }
+        )
+
+    return {"base_currency": profile["base_currency"], "scenarios": scenarios}
+
+
+async def stream_prognosis(user_id: str) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Run generate_prognosis and yield (event, data) pairs as results become available.
+
+    Events are the deterministic stages ('risk', 'goals', 'allocation', 'strategy'),
+    one 'narrative' event per report section, then a final 'report' event with
+    the persisted report, or an 'error' event with the failure detail.
+
+    Uses its own session, since the stream outlives the request handler.
+    """
+    queue: asyncio.Queue[tuple[str, Any] | None] = asyncio.Queue()
+
+    async def on_result(stage: str, result: Any) -> None:
+        if stage == "risk":
+            # The no-transactions path reports infinite runway, which JSON cannot encode
+            result = {**result, "runway_months": min(result["runway_months"], 999.9)}
+        await queue.put((stage, result))
+
+    async def run() -> None:
+        try:
+            async with SessionLocal() as db:
+                report = await generate_prognosis(db, user_id, on_result=on_result)
+            await queue.put(("report", report))
+        except HTTPException as e:
+            await queue.put(("error", {"status_code": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            logger.error(f"Prognosis stream failed for user {user_id}: {e}")
+            await queue.put(("error", {"status_code": 500, "detail": "Prognosis generation failed"}))
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+    finally:
+        # Client went away before the end of the stream
+        if not task.done():
+            task.cancel()
@@ -5,10 +5,12 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from agents.goal_cache import goal_evaluation_cache
 from models import Account, AuditAction, AuditResourceType, RecurrenceRule, Transaction
 from models.enums import RecurrenceFrequency, TransactionType
 from schemas.transaction import TransactionCreate, TransactionUpdate
 from services.audit_service import log_audit
+from services.cashflow_service import apply_cashflow_delta
 
 
 async def list_transactions(
@@ -79,7 +81,7 @@ async def _update_account_balance(
 
 async def create_transaction(db: AsyncSession, user_id: str, payload: TransactionCreate) -> Transaction:
     """
-    Create a new transaction and update account balance atomically.
+    Create a new transaction and update account balance and daily cashflow atomically.
     """
     stmt = select(Account).where(Account.id == payload.account_id, Account.user_id == user_id)
     result = await db.execute(stmt)
@@ -124,6 +126,9 @@ async def create_transaction(db: AsyncSession, user_id: str, payload: Transactio
         transaction.recurrence_rule_id = recurrence_rule.id
 
     await _update_account_balance(db, account, payload.amount, payload.type)
+    await apply_cashflow_delta(
+        db, user_id, transaction.date, transaction.currency, transaction.type, transaction.amount
+    )
 
     db.add(transaction)
     await log_audit(
@@ -141,6 +146,8 @@ async def create_transaction(db: AsyncSession, user_id: str, payload: Transactio
     )
     await db.commit()
     await db.refresh(transaction)
+    # Savings and balances changed: the user's goal evaluations are stale
+    goal_evaluation_cache.invalidate_user(user_id)
 
     return transaction
 
@@ -149,7 +156,7 @@ async def update_transaction(
     db: AsyncSession, transaction_id: str, user_id: str, payload: TransactionUpdate
 ) -> Transaction:
     """
-    Update a transaction and adjust account balances accordingly.
+    Update a transaction and adjust account balances and daily cashflow accordingly.
     Uses row-level locking to prevent race conditions.
     """
     transaction = await get_transaction(db, transaction_id, user_id)
@@ -166,6 +173,7 @@ async def update_transaction(
         )
 
     await _update_account_balance(db, old_account, transaction.amount, transaction.type, is_reversal=True)
+    old_cashflow = (transaction.date, transaction.currency, transaction.type, transaction.amount)
 
     # Track changes for audit
     changes = {}
@@ -203,6 +211,11 @@ async def update_transaction(
     else:
         await _update_account_balance(db, old_account, transaction.amount, transaction.type)
 
+    new_cashflow = (transaction.date, transaction.currency, transaction.type, transaction.amount)
+    if new_cashflow != old_cashflow:
+        await apply_cashflow_delta(db, user_id, *old_cashflow, is_reversal=True)
+        await apply_cashflow_delta(db, user_id, *new_cashflow)
+
     if changes:
         await log_audit(
             db,
@@ -215,13 +228,15 @@ async def update_transaction(
 
     await db.commit()
     await db.refresh(transaction)
+    # Savings and balances changed: the user's goal evaluations are stale
+    goal_evaluation_cache.invalidate_user(user_id)
 
     return transaction
 
 
 async def delete_transaction(db: AsyncSession, transaction_id: str, user_id: str) -> None:
     """
-    Delete a transaction and revert its effect on account balance.
+    Delete a transaction and revert its effect on account balance and daily cashflow.
     """
     transaction = await get_transaction(db, transaction_id, user_id)
 
@@ -231,6 +246,9 @@ async def delete_transaction(db: AsyncSession, transaction_id: str, user_id: str
 
     if account:
         await _update_account_balance(db, account, transaction.amount, transaction.type, is_reversal=True)
+    await apply_cashflow_delta(
+        db, user_id, transaction.date, transaction.currency, transaction.type, transaction.amount, is_reversal=True
+    )
 
     await log_audit(
         db,
@@ -242,3 +260,4 @@ async def delete_transaction(db: AsyncSession, transaction_id: str, user_id: str
     )
     await db.delete(transaction)
     await db.commit()
+    goal_evaluation_cache.invalidate_user(user_id)
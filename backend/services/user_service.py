@@ -4,7 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
-from models import Account, AuditLog, Goal, Profile, PrognosisReport, PrognosisUsage, Transaction, User
+from models import Account, AuditLog, Goal, Profile, PrognosisJob, PrognosisReport, PrognosisUsage, Transaction, User
 
 
 async def verify_password_with_supabase(email: str, password: str) -> bool:
@@ -46,7 +46,7 @@ async def delete_user_account(db: AsyncSession, user_id: str, user_email: str, p
     - All accounts
     - All goals
     - Profile
-    - Prognosis reports and usage records
+    - Prognosis reports, usage records and jobs
     - Audit logs
     - User record
 
@@ -123,14 +123,21 @@ async def delete_user_account(db: AsyncSession, user_id: str, user_email: str, p
         for usage in usages:
             await db.delete(usage)
 
-        # 7. Delete audit logs
+        # 7. Delete prognosis jobs
+        stmt = select(PrognosisJob).where(PrognosisJob.user_id == user_id)
+        result = await db.execute(stmt)
+        jobs = result.scalars().all()
+        for job in jobs:
+            await db.delete(job)
+
+        # 8. Delete audit logs
         stmt = select(AuditLog).where(AuditLog.user_id == user_id)
         result = await db.execute(stmt)
         audit_logs = result.scalars().all()
         for log in audit_logs:
             await db.delete(log)
 
-        # 8. Finally, delete the user record
+        # 9. Finally, delete the user record
         await db.delete(user)
 
         # Commit all deletions
@@ -192,10 +192,45 @@ export interface PrognosisReport {
   rate_limited: boolean
 }
 
+export type PrognosisJobStatus = 'queued' | 'running' | 'succeeded' | 'failed'
+
+export interface PrognosisJob {
+  id: string
+  status: PrognosisJobStatus
+  stage: string | null
+  progress: Record<string, 'pending' | 'running' | 'done'>
+  error: string | null
+  rate_limited: boolean
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
+
+const JOB_POLL_INTERVAL_MS = 1000
+
 export const prognosisApi = {
   current: () =>
     request<PrognosisReport | null>('GET', '/api/prognosis/current'),
-  generate: () => request<PrognosisReport>('POST', '/api/prognosis/refresh'),
+  refresh: () => request<PrognosisJob>('POST', '/api/prognosis/refresh'),
+  job: (id: string) =>
+    request<PrognosisJob>('GET', `/api/prognosis/jobs/${id}`),
+  // Queue a refresh, poll the job until it finishes, then load the report
+  generate: async (
+    onProgress?: (job: PrognosisJob) => void
+  ): Promise<PrognosisReport> => {
+    let job = await prognosisApi.refresh()
+    while (job.status === 'queued' || job.status === 'running') {
+      onProgress?.(job)
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+      job = await prognosisApi.job(job.id)
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Prognosis generation failed')
+    }
+    const report = await prognosisApi.current()
+    if (!report) throw new Error('Prognosis report not found')
+    return { ...report, rate_limited: job.rate_limited }
+  },
 }
 
 // ─── FX Rates ─────────────────────────────────────────────────────────────────